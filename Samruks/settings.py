@@ -56,7 +56,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.middleware.StaticFilesMiddleware',  # WhiteNoise + варианты .zst
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',  # обязательно сразу после SessionMiddleware
     'django.middleware.common.CommonMiddleware',
@@ -101,9 +101,29 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD", "123"),
         "HOST": os.getenv("DB_HOST", "127.0.0.1"),
         "PORT": os.getenv("DB_PORT", "5432"),
+        # Постоянные соединения: держать соединение между запросами (секунды, None — без ограничения).
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        # Проверять соединение перед повторным использованием, чтобы не получить ошибку после рестарта БД.
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1",
+        "OPTIONS": {},
     }
 }
 
+# DB_POOL=1 — встроенный пул соединений Django 5.1+ (нужен psycopg 3: pip install "psycopg[binary,pool]").
+# Пул и CONN_MAX_AGE несовместимы, поэтому постоянные соединения в этом режиме выключаются.
+if os.getenv("DB_POOL", "0") == "1":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+
+# DB_PGBOUNCER=1 — работа через PgBouncer в режиме transaction pooling:
+# серверные курсоры (.iterator()) не переживают смену серверного соединения.
+if os.getenv("DB_PGBOUNCER", "0") == "1":
+    DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -160,7 +180,17 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, "static"),
 ]
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Django 5.1+ читает только STORAGES (STATICFILES_STORAGE больше не действует).
+# collectstatic уменьшает свои CSS/JS, хеширует имена и пишет .gz/.br/.zst (main/staticfiles.py).
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "main.staticfiles.OptimizedStaticFilesStorage"},
+}
+# STATIC_MINIFY=0 — копировать свои CSS/JS как есть (например, чтобы отладить минификатор).
+STATIC_MINIFY = os.getenv("STATIC_MINIFY", "1") == "1"
+# Без DEBUG {% static %} для файла не из манифеста падает: выкладка без collectstatic
+# не должна отдавать имена без хеша.
+WHITENOISE_MANIFEST_STRICT = os.getenv("WHITENOISE_MANIFEST_STRICT", "1") == "1"
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
@@ -190,15 +220,65 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ],
 }
+# API_FAST_JSON=0 — стандартный JSONRenderer/JSONParser DRF вместо orjson/msgspec.
+if os.getenv("API_FAST_JSON", "1") == "1":
+    REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"] = [
+        "main.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ]
+    REST_FRAMEWORK["DEFAULT_PARSER_CLASSES"] = [
+        "main.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ]
 SPECTACULAR_SETTINGS = {"TITLE": "Samruks API", "VERSION": "1.0.0"}
 
-# Cache (local memory; for production consider Redis backend)
-CACHES = {
-    "default": {
+# Cache: CACHE_BACKEND=locmem|file|redis.
+# locmem — отдельный кеш в каждом процессе (разработка);
+# file — общий кеш для всех воркеров на одной машине;
+# redis — общий кеш для всех воркеров и серверов (нужен пакет redis).
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_BACKENDS = {
+    "locmem": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
         "LOCATION": "samruks-cache",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "/var/tmp/samruks-cache"),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+    },
+}
+CACHES = {
+    "default": {
+        **CACHE_BACKENDS[CACHE_BACKEND],
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "samruks"),
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", "300")),
+        # Для locmem и file: по умолчанию 300 записей, а у каждой карточки товара — своя.
+        "OPTIONS": (
+            {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "20000"))}
+            if CACHE_BACKEND in ("locmem", "file")
+            else {}
+        ),
     }
 }
+# Сколько секунд держится блокировка заполнения кеша и сколько ждут остальные воркеры.
+CACHE_FILL_LOCK_TIMEOUT = int(os.getenv("CACHE_FILL_LOCK_TIMEOUT", "30"))
+CACHE_FILL_WAIT = float(os.getenv("CACHE_FILL_WAIT", "5"))
+# Пересобирать снимок главной страницы в фоне сразу после изменения контента.
+HOMEPAGE_SNAPSHOT_BACKGROUND = os.getenv("HOMEPAGE_SNAPSHOT_BACKGROUND", "1") == "1"
+# Кодировать варианты загруженных изображений в фоне после коммита, а не в запросе админки.
+IMAGE_VARIANTS_BACKGROUND = os.getenv("IMAGE_VARIANTS_BACKGROUND", "1") == "1"
+# Асинхронные варианты страниц (главная, каталог, карточка, «О нас»); Samruks/asgi.py включает их сам.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "0") == "1"
+# Потоки процесса, в которых параллельно собираются секции асинхронных страниц (у каждого своё соединение с БД).
+# 0 — секции собираются по очереди в потоке запроса.
+ASYNC_SECTION_THREADS = int(os.getenv("ASYNC_SECTION_THREADS", "4"))
+# Входит в ETag страниц: после выкладки новых шаблонов старые ответы перестают считаться актуальными.
+RELEASE_VERSION = os.getenv("RELEASE_VERSION", "")
 
 # --- Jazzmin: русские заголовки админки ---
 JAZZMIN_SETTINGS = {
@@ -217,3 +297,11 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 TELEGRAM_BOT_TOKEN = os.getenv('8281238479:AAFpptxxRGeOUs3YO3hQRdqF5cGzdpimQpM', '')
 TELEGRAM_CHAT_ID = os.getenv('758761122', '')
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+TELEGRAM_TIMEOUT = float(os.getenv("TELEGRAM_TIMEOUT", "10"))
+
+# Очередь уведомлений Telegram (python manage.py deliver_notifications)
+TELEGRAM_OUTBOX_BATCH_SIZE = int(os.getenv("TELEGRAM_OUTBOX_BATCH_SIZE", "20"))
+TELEGRAM_OUTBOX_MAX_ATTEMPTS = int(os.getenv("TELEGRAM_OUTBOX_MAX_ATTEMPTS", "8"))
+TELEGRAM_OUTBOX_BACKOFF_BASE = int(os.getenv("TELEGRAM_OUTBOX_BACKOFF_BASE", "30"))
+TELEGRAM_OUTBOX_BACKOFF_MAX = int(os.getenv("TELEGRAM_OUTBOX_BACKOFF_MAX", "3600"))
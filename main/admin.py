@@ -1,19 +1,39 @@
 from django.contrib import admin
 from django.db import models as django_models
 from django.forms import Textarea
+from django.utils import timezone
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from parler.admin import TranslatableAdmin, TranslatableTabularInline
 
 from . import models
+from .product_pages import warm_product_pages
+from .translations import load_translations
 
 admin.site.site_header = _("Samruks — Панель управления")
 admin.site.site_title = _("Админка Samruks")
 admin.site.index_title = _("Управление сайтом")
 
 
+class CachedTranslationsMixin:
+    """Changelist rows read their translations from parler's cache in bulk, not one by one."""
+
+    # Внешние ключи из list_display, у которых __str__ тоже переводится.
+    translated_related = ()
+
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        load_translations(changelist.result_list, *self.translated_related)
+        return changelist
+
+
+class CachedTranslatableAdmin(CachedTranslationsMixin, TranslatableAdmin):
+    pass
+
+
 @admin.action(description=_("Включить выбранные"))
 def make_active(modeladmin, request, queryset):
+    # update() сообщает об изменении в main.changes: кеши и счётчики обновятся сами.
     queryset.update(is_active=True)
 
 
@@ -36,31 +56,38 @@ class ProductImageInline(TranslatableTabularInline):
     preview.short_description = _("Превью")
 
 
+@admin.action(description=_("Прогреть кеш карточек"))
+def warm_product_page_cache(modeladmin, request, queryset):
+    count = warm_product_pages(queryset)
+    modeladmin.message_user(request, _("Подготовлено карточек: %(count)d") % {"count": count})
+
+
 @admin.register(models.Category)
-class CategoryAdmin(TranslatableAdmin):
+class CategoryAdmin(CachedTranslatableAdmin):
     search_fields = ("translations__name", "slug")
-    list_display = ("__str__", "slug")
+    list_display = ("__str__", "slug", "active_products_count")
 
 
 @admin.register(models.Product)
-class ProductAdmin(TranslatableAdmin):
+class ProductAdmin(CachedTranslatableAdmin):
     search_fields = ("translations__name", "slug", "translations__description")
     list_display = ("__str__", "category", "price", "is_active", "is_main", "created_at")
+    translated_related = ("category",)
     list_filter = ("is_active", "is_main", "category")
     list_editable = ("is_main",)
-    actions = [make_active, make_inactive]
+    actions = [make_active, make_inactive, warm_product_page_cache]
     inlines = [ProductImageInline]
 
 
 @admin.register(models.CarouselItem)
-class CarouselItemAdmin(TranslatableAdmin):
+class CarouselItemAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "ordering", "is_active")
     list_filter = ("is_active",)
     actions = [make_active, make_inactive]
 
 
 @admin.register(models.SectionHeader)
-class SectionHeaderAdmin(TranslatableAdmin):
+class SectionHeaderAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "slug", "is_active")
     list_filter = ("is_active",)
     search_fields = ("translations__title", "slug")
@@ -68,20 +95,21 @@ class SectionHeaderAdmin(TranslatableAdmin):
 
 
 @admin.register(models.ProductImage)
-class ProductImageAdmin(TranslatableAdmin):
+class ProductImageAdmin(CachedTranslatableAdmin):
     list_display = ("product", "ordering", "is_primary")
+    translated_related = ("product",)
     list_filter = ("is_primary",)
 
 
 @admin.register(models.Advantage)
-class AdvantageAdmin(TranslatableAdmin):
+class AdvantageAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "ordering", "is_active")
     list_filter = ("is_active",)
     actions = [make_active, make_inactive]
 
 
 @admin.register(models.Metric)
-class MetricAdmin(TranslatableAdmin):
+class MetricAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "value", "ordering", "is_active")
     list_filter = ("is_active",)
     search_fields = ("translations__name", "translations__value")
@@ -89,7 +117,7 @@ class MetricAdmin(TranslatableAdmin):
 
 
 @admin.register(models.TeamMember)
-class TeamMemberAdmin(TranslatableAdmin):
+class TeamMemberAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "role", "ordering", "is_active")
     list_filter = ("is_active",)
     search_fields = ("translations__full_name", "translations__role")
@@ -97,7 +125,7 @@ class TeamMemberAdmin(TranslatableAdmin):
 
 
 @admin.register(models.Value)
-class ValueAdmin(TranslatableAdmin):
+class ValueAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "ordering", "is_active")
     list_filter = ("is_active",)
     search_fields = ("translations__title",)
@@ -105,7 +133,7 @@ class ValueAdmin(TranslatableAdmin):
 
 
 @admin.register(models.Video)
-class VideoAdmin(TranslatableAdmin):
+class VideoAdmin(CachedTranslatableAdmin):
     list_display = ("id", "__str__", "page", "is_active", "order", "created_at")
     list_filter = ("page", "is_active")
     search_fields = ("translations__title", "youtube_url")
@@ -113,7 +141,7 @@ class VideoAdmin(TranslatableAdmin):
 
 
 @admin.register(models.CompanyInfo)
-class CompanyInfoAdmin(TranslatableAdmin):
+class CompanyInfoAdmin(CachedTranslatableAdmin):
     def has_add_permission(self, request):
         if models.CompanyInfo.objects.exists():
             return False
@@ -135,7 +163,7 @@ class SocialMapAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.ContactAddress)
-class ContactAddressAdmin(TranslatableAdmin):
+class ContactAddressAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "order", "is_active")
     list_filter = ("is_active",)
     ordering = ("order", "id")
@@ -144,7 +172,7 @@ class ContactAddressAdmin(TranslatableAdmin):
 
 
 @admin.register(models.ContactPhone)
-class ContactPhoneAdmin(TranslatableAdmin):
+class ContactPhoneAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "order", "is_active")
     list_filter = ("is_active",)
     ordering = ("order", "id")
@@ -153,7 +181,7 @@ class ContactPhoneAdmin(TranslatableAdmin):
 
 
 @admin.register(models.ContactEmail)
-class ContactEmailAdmin(TranslatableAdmin):
+class ContactEmailAdmin(CachedTranslatableAdmin):
     list_display = ("__str__", "order", "is_active")
     list_filter = ("is_active",)
     ordering = ("order", "id")
@@ -162,7 +190,7 @@ class ContactEmailAdmin(TranslatableAdmin):
 
 
 @admin.register(models.ContactWorkingHours)
-class ContactWorkingHoursAdmin(TranslatableAdmin):
+class ContactWorkingHoursAdmin(CachedTranslatableAdmin):
     list_display = ("weekdays", "saturday", "sunday", "is_active")
     list_filter = ("is_active",)
     search_fields = ("translations__weekdays", "translations__saturday", "translations__sunday")
@@ -174,14 +202,35 @@ class ContactWorkingHoursAdmin(TranslatableAdmin):
 
 
 @admin.register(models.ContactTopic)
-class ContactTopicAdmin(TranslatableAdmin):
+class ContactTopicAdmin(CachedTranslatableAdmin):
     search_fields = ("translations__name", "slug")
     ordering = ("slug",)
 
 
 @admin.register(models.ContactRequest)
-class ContactRequestAdmin(admin.ModelAdmin):
+class ContactRequestAdmin(CachedTranslationsMixin, admin.ModelAdmin):
     list_display = ("name", "phone", "topic", "created_at")
+    translated_related = ("topic",)
     readonly_fields = ("created_at", "ip", "user_agent")
     list_filter = ("topic", "created_at")
     search_fields = ("name", "phone", "email")
+
+
+@admin.action(description=_("Повторить отправку"))
+def retry_notifications(modeladmin, request, queryset):
+    # Только ошибочные: отправленное повторно ушло бы в чат второй раз.
+    # Счётчик попыток с нуля: иначе уже исчерпавшее попытки сообщение снова упадёт после первой ошибки.
+    queryset.filter(status=models.TelegramNotification.Status.FAILED).update(
+        status=models.TelegramNotification.Status.PENDING,
+        next_attempt_at=timezone.now(),
+        attempts=0,
+        last_error="",
+    )
+
+
+@admin.register(models.TelegramNotification)
+class TelegramNotificationAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    list_filter = ("status",)
+    readonly_fields = ("text", "attempts", "next_attempt_at", "last_error", "created_at", "sent_at")
+    actions = [retry_notifications]
@@ -6,3 +6,8 @@ class MainConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "main"
     verbose_name = _("Контент сайта")
+
+    def ready(self):
+        from . import signals
+
+        signals.connect()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import importlib
+import json
+import statistics
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import clear_url_caches
+
+
+def client_host() -> str:
+    """A host from ``ALLOWED_HOSTS`` for the test ``Client`` used by the management commands.
+
+    The client's default ``testserver`` is only allowed inside the test runner.
+    """
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != "*" and not host.startswith(".")]
+    # Пустой ALLOWED_HOSTS при DEBUG пропускает localhost.
+    return hosts[0] if hosts else "localhost"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict:
+    """Timing summary in milliseconds for a list of durations in seconds."""
+    ms = [sample * 1000 for sample in samples]
+    return {
+        "runs": len(ms),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+def measure(func: Callable[[], object], runs: int, warmup: int = 1) -> list[float]:
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def write_report(report: dict, output: str | None, stdout) -> None:
+    """Write ``report`` as JSON to ``output`` (or ``stdout`` when it is ``None``/``-``)."""
+    payload = json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True, default=str)
+    if output and output != "-":
+        Path(output).write_text(payload + "\n", encoding="utf-8")
+    else:
+        stdout.write(payload)
+
+
+class QueryCounter:
+    """``execute_wrapper`` that counts statements; unlike ``connection.queries``
+    it survives the per-request reconnects done when ``CONN_MAX_AGE`` is 0."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def count_queries(func) -> int:
+    """Run ``func`` and return the number of SQL statements it executed."""
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        func()
+    return counter.count
+
+
+class StatementRecorder:
+    """``execute_wrapper`` that keeps the SQL and parameters of statements reading ``tables``."""
+
+    def __init__(self, tables):
+        self.markers = [f"FROM {connection.ops.quote_name(table)}" for table in tables]
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and any(marker in sql for marker in self.markers):
+            self.statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def _value_size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    return len(str(value))
+
+
+def result_size(statements) -> tuple[int, int]:
+    """Re-run ``statements`` and return (rows, payload bytes) the database sends back."""
+    rows = size = 0
+    with connection.cursor() as cursor:
+        for sql, params in statements:
+            cursor.execute(sql, params)
+            for row in cursor.fetchall():
+                rows += 1
+                size += sum(_value_size(value) for value in row)
+    return rows, size
+
+
+# Сценарии для benchmark_views и тестов бюджета запросов:
+# имя -> (путь, максимальное число SQL-запросов при прогретом кеше).
+# {product} и {category} подставляются из текущего каталога.
+VIEW_SCENARIOS = {
+    "index": ("/", 1),
+    "catalog": ("/catalog/", 9),
+    "catalog_q": ("/catalog/?q=Product", 10),
+    "catalog_category": ("/catalog/?category={category}", 9),
+    "catalog_partial": ("/catalog/?partial=1", 3),
+    "catalog_partial_q_category": ("/catalog/?partial=1&q=Product&category={category}", 4),
+    "product_detail": ("/product/{product}/", 1),
+    "about": ("/about/", 13),
+    "contact": ("/contact/", 10),
+    "api_products": ("/api/catalog/products/", 1),
+    "api_products_search": ("/api/catalog/products/?search=Product", 2),
+    "api_product_detail": ("/api/catalog/products/{product}/", 5),
+    "api_categories": ("/api/catalog/categories/", 3),
+    "api_carousel": ("/api/home/carousel/", 3),
+    "api_company": ("/api/about/company/", 3),
+}
+
+
+def scenario_urls(product_slug: str, category_slug: str) -> dict[str, tuple[str, int]]:
+    return {
+        name: (path.format(product=product_slug, category=category_slug), budget)
+        for name, (path, budget) in VIEW_SCENARIOS.items()
+    }
+
+
+def _reload_urlconfs() -> None:
+    importlib.reload(importlib.import_module("main.urls"))
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+@contextmanager
+def page_views(asynchronous: bool):
+    """Route the HTML pages to their sync or async views regardless of ``ASYNC_VIEWS``."""
+    try:
+        with override_settings(ASYNC_VIEWS=asynchronous):
+            _reload_urlconfs()
+            yield
+    finally:
+        _reload_urlconfs()
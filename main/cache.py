@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = "samruks"
+DEFAULT_TIMEOUT = 60 * 60 * 24
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _version_key(namespace: str) -> str:
+    return f"{KEY_PREFIX}:version:{namespace}"
+
+
+def _new_version() -> int:
+    # Версия на основе времени: после вытеснения ключа из кеша новая версия
+    # не совпадёт ни с одной из старых, и устаревшие записи не всплывут.
+    return time.time_ns() // 1000
+
+
+def get_version(namespace: str) -> int:
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def has_version(namespace: str) -> bool:
+    """Whether ``namespace`` already has a version; unlike :func:`get_version` does not create one."""
+    return cache.get(_version_key(namespace)) is not None
+
+
+async def ahas_version(namespace: str) -> bool:
+    return await cache.aget(_version_key(namespace)) is not None
+
+
+def bump_version(namespace: str) -> None:
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def versioned_key(namespace: str, *parts: Any) -> str:
+    suffix = ":".join(str(part) for part in parts)
+    return f"{KEY_PREFIX}:{namespace}:v{get_version(namespace)}:{suffix}"
+
+
+def get_or_build(namespace: str, parts: tuple, builder: Callable[[], Any], timeout: int = DEFAULT_TIMEOUT):
+    """Return the cached value for ``parts`` in ``namespace`` or build and store it.
+
+    Only one worker rebuilds a missing value at a time: the others wait for it
+    to appear for up to ``CACHE_FILL_WAIT`` seconds before building it themselves.
+    """
+    key = versioned_key(namespace, *parts)
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, settings.CACHE_FILL_LOCK_TIMEOUT):
+        try:
+            value = builder()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + settings.CACHE_FILL_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return builder()
+
+
+async def aget_or_build(
+    namespace: str, parts: tuple, builder: Callable[[], Awaitable[Any]], timeout: int = DEFAULT_TIMEOUT
+):
+    """:func:`get_or_build` for async views: ``builder`` returns an awaitable,
+    and waiting for another worker's fill does not block the event loop."""
+    key = versioned_key(namespace, *parts)
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if await cache.aadd(lock_key, 1, settings.CACHE_FILL_LOCK_TIMEOUT):
+        try:
+            value = await builder()
+            await cache.aset(key, value, timeout)
+        finally:
+            await cache.adelete(lock_key)
+        return value
+
+    deadline = time.monotonic() + settings.CACHE_FILL_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        value = await cache.aget(key)
+        if value is not None:
+            return value
+    return await builder()
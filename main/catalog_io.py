@@ -0,0 +1,434 @@
+"""Streaming catalog import/export in CSV or JSON Lines.
+
+One record per product::
+
+    {"slug": "divan-1", "category": "divany", "price": "120000.00",
+     "is_active": true, "is_main": false,
+     "translations": {"ru": {"name": "...", "description": "..."}},
+     "images": ["products/divan-1.jpg"]}
+
+In CSV the translations become ``name_<lang>``/``description_<lang>`` columns
+and the images are joined with ``|``.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import changes
+from .images import run_in_pool, store_image
+from .models import PRIMARY_FIRST, Category, Product, ProductImage
+from .slugs import next_free_slug
+
+FORMATS = ("csv", "jsonl")
+IMAGE_SEPARATOR = "|"
+# bulk_update строит CASE по всем строкам пачки; длинные CASE дороже нескольких коротких.
+BULK_UPDATE_BATCH = 500
+TRUE_VALUES = {"1", "true", "yes", "y", "on", "да"}
+FALSE_VALUES = {"0", "false", "no", "n", "off", "нет", ""}
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def csv_columns(languages: list[str]) -> list[str]:
+    columns = ["slug", "category", "price", "is_active", "is_main", "images"]
+    for code in languages:
+        columns += [f"name_{code}", f"description_{code}"]
+    return columns
+
+
+# ----------------- Чтение -----------------
+
+
+def _parse_bool(value, default: bool) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise RowError(f"not a boolean: {value!r}")
+
+
+def _from_csv(row: dict, languages: list[str]) -> dict:
+    images = row.get("images") or ""
+    return {
+        "slug": row.get("slug"),
+        "category": row.get("category"),
+        "price": row.get("price"),
+        "is_active": row.get("is_active"),
+        "is_main": row.get("is_main"),
+        "images": [name for name in images.split(IMAGE_SEPARATOR) if name.strip()],
+        "translations": {
+            code: {
+                "name": row.get(f"name_{code}") or "",
+                "description": row.get(f"description_{code}") or "",
+            }
+            for code in languages
+        },
+    }
+
+
+def read_records(stream, fmt: str, languages: list[str]):
+    """Yield ``(line_number, record)`` from ``stream`` without loading it whole."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, _from_csv(row, languages)
+        return
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, RowError(f"invalid JSON: {exc.msg}")
+
+
+def normalize(record: dict, languages: list[str], categories: dict[str, int]) -> dict:
+    if not isinstance(record, dict):
+        raise RowError("record must be an object")
+
+    category_slug = (record.get("category") or "").strip()
+    if category_slug not in categories:
+        raise RowError(f"unknown category {category_slug!r}")
+
+    try:
+        price = Decimal(str(record.get("price") or 0))
+    except InvalidOperation:
+        raise RowError(f"invalid price {record.get('price')!r}") from None
+
+    translations = {}
+    for code, values in (record.get("translations") or {}).items():
+        if code not in languages or not values:
+            continue
+        name = (values.get("name") or "").strip()
+        if name:
+            translations[code] = {"name": name, "description": values.get("description") or ""}
+    if not translations:
+        raise RowError("at least one translated name is required")
+
+    images = record.get("images") or []
+    if isinstance(images, str):
+        images = images.split(IMAGE_SEPARATOR)
+
+    return {
+        "slug": slugify(record.get("slug") or ""),
+        "category_id": categories[category_slug],
+        "price": price,
+        "is_active": _parse_bool(record.get("is_active"), True),
+        "is_main": _parse_bool(record.get("is_main"), False),
+        "translations": translations,
+        "images": [name.strip() for name in images if name and name.strip()],
+    }
+
+
+# ----------------- Импорт -----------------
+
+
+class SlugAllocator:
+    """Hands out ``base``, ``base-1``… for rows without a slug: one query per distinct base."""
+
+    def __init__(self):
+        self.next_suffix: dict[str, int] = {}
+        self.max_length = Product._meta.get_field("slug").max_length
+
+    def _allocate(self, name: str) -> str:
+        base = (slugify(name) or Product.slug_fallback)[: self.max_length - 11].rstrip("-")
+        if base not in self.next_suffix:
+            slug = next_free_slug(Product.objects.all(), base, self.max_length)
+            self.next_suffix[base] = int(slug[len(base) + 1 :] or 0)
+        suffix = self.next_suffix[base]
+        self.next_suffix[base] += 1
+        return f"{base}-{suffix}" if suffix else base
+
+    def assign(self, rows: list[dict], taken: set[str]) -> None:
+        """Fill ``slug`` of the rows that have none, avoiding ``taken`` and the database."""
+        pending = [row for row in rows if not row["slug"]]
+        while pending:
+            for row in pending:
+                name = next(iter(row["translations"].values()))["name"]
+                slug = self._allocate(name)
+                while slug in taken:
+                    slug = self._allocate(name)
+                row["slug"] = slug
+                taken.add(slug)
+            # Явные слаги из предыдущих пачек могли занять следующий номер.
+            clashes = set(
+                Product.objects.filter(slug__in=[row["slug"] for row in pending]).values_list("slug", flat=True)
+            )
+            pending = [row for row in pending if row["slug"] in clashes]
+            for row in pending:
+                row["slug"] = ""
+
+
+@dataclass
+class ImportStats:
+    created: int = 0
+    updated: int = 0
+    images: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+    image_errors: list[tuple[int, str]] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def rows(self) -> int:
+        return self.created + self.updated + len(self.errors)
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed else 0.0
+
+
+class CatalogImporter:
+    """Creates or updates products in batches with ``bulk_create``/``bulk_update``.
+
+    Products are matched by slug. Images are only attached to new products;
+    see :meth:`_ingest_images` for where they come from.
+    """
+
+    def __init__(self, languages: list[str] | None = None, image_root: str | None = None, pool=None):
+        self.image_root = image_root
+        self.pool = pool
+        self.languages = languages or [code for code, _name in settings.LANGUAGES]
+        self.categories = dict(Category.objects.values_list("slug", "pk"))
+        self.translation_model = Product._parler_meta.root_model
+        self.image_translation_model = ProductImage._parler_meta.root_model
+        self.slugs = SlugAllocator()
+        self.stats = ImportStats()
+
+    def import_batch(self, records: list[tuple[int, object]]) -> None:
+        rows = []
+        seen: set[str] = set()
+        for line_number, record in records:
+            try:
+                if isinstance(record, RowError):
+                    raise record
+                row = normalize(record, self.languages, self.categories)
+                if row["slug"] and row["slug"] in seen:
+                    raise RowError(f"duplicate slug {row['slug']!r} in the same batch")
+            except RowError as exc:
+                self.stats.errors.append((line_number, str(exc)))
+                continue
+            row["line"] = line_number
+            seen.add(row["slug"])
+            rows.append(row)
+
+        existing = Product.objects.filter(slug__in=[row["slug"] for row in rows if row["slug"]]).in_bulk(
+            field_name="slug"
+        )
+        new_rows = [row for row in rows if row["slug"] not in existing]
+        old_rows = [row for row in rows if row["slug"] in existing]
+        # Файлы обрабатываются до транзакции: она не должна ждать кодирования.
+        self._ingest_images(new_rows)
+
+        with transaction.atomic():
+            self.slugs.assign(new_rows, seen)
+            translations = self._create(new_rows) + self._update(old_rows, existing)
+            # Переводы пишутся менеджером parler без уведомлений: сообщаем сами,
+            # чтобы обновились поисковый индекс и кеши карточек.
+            changes.notify(self.translation_model, [translation.pk for translation in translations])
+            changes.notify(Product, {translation.master_id for translation in translations})
+
+        self.stats.created += len(new_rows)
+        self.stats.updated += len(old_rows)
+
+    def _ingest_images(self, rows: list[dict]) -> None:
+        """Replace ``row["images"]`` with ``(stored name, variants)`` pairs.
+
+        With ``image_root`` the entries are files under it: they are validated,
+        downscaled, copied to the storage and get their variants in ``pool``.
+        Otherwise they are names already in the storage, without variants yet.
+        """
+        if self.image_root is None:
+            for row in rows:
+                row["images"] = [(name, {}) for name in row["images"]]
+            return
+
+        jobs = {
+            source: (os.path.join(self.image_root, source), f"products/{os.path.basename(source)}")
+            for row in rows
+            for source in row["images"]
+        }
+        results = dict(run_in_pool(self.pool, store_image, jobs))
+        for row in rows:
+            images = []
+            for source in row["images"]:
+                result = results[source]
+                if isinstance(result, Exception):
+                    self.stats.image_errors.append((row["line"], f"{source}: {result}"))
+                else:
+                    images.append((result["name"], result["variants"]))
+            row["images"] = images
+
+    def _create(self, rows: list[dict]) -> list:
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    slug=row["slug"],
+                    category_id=row["category_id"],
+                    price=row["price"],
+                    is_active=row["is_active"],
+                    is_main=row["is_main"],
+                )
+                for row in rows
+            ]
+        )
+        translations = self.translation_model.objects.bulk_create(
+            [
+                self.translation_model(master_id=product.pk, language_code=code, **values)
+                for product, row in zip(products, rows)
+                for code, values in row["translations"].items()
+            ]
+        )
+
+        images = ProductImage.objects.bulk_create(
+            [
+                ProductImage(
+                    product_id=product.pk,
+                    image=name,
+                    image_variants=variants,
+                    ordering=position,
+                    is_primary=position == 0,
+                )
+                for product, row in zip(products, rows)
+                for position, (name, variants) in enumerate(row["images"])
+            ]
+        )
+        names = {row["slug"]: row["translations"] for row in rows}
+        by_product = {product.pk: product for product in products}
+        self.image_translation_model.objects.bulk_create(
+            [
+                self.image_translation_model(
+                    master_id=image.pk,
+                    language_code=code,
+                    alt_text=values["name"][:150],
+                )
+                for image in images
+                for code, values in names[by_product[image.product_id].slug].items()
+            ]
+        )
+
+        Product.refresh_primary_images(Product.objects.filter(pk__in={image.product_id for image in images}))
+
+        self.stats.images += len(images)
+        return translations
+
+    def _update(self, rows: list[dict], existing: dict[str, Product]) -> list:
+        if not rows:
+            return []
+        now = timezone.now()
+        products, changed_products = [], []
+        for row in rows:
+            product = existing[row["slug"]]
+            products.append(product)
+            values = {name: row[name] for name in ("category_id", "price", "is_active", "is_main")}
+            if all(getattr(product, name) == value for name, value in values.items()):
+                continue
+            for name, value in values.items():
+                setattr(product, name, value)
+            # bulk_update не трогает auto_now.
+            product.updated_at = now
+            changed_products.append(product)
+        Product.objects.bulk_update(
+            changed_products,
+            ["category", "price", "is_active", "is_main", "updated_at"],
+            batch_size=BULK_UPDATE_BATCH,
+        )
+
+        current = {
+            (t.master_id, t.language_code): t
+            for t in self.translation_model.objects.filter(master_id__in=[p.pk for p in products])
+        }
+        changed, added = [], []
+        for product, row in zip(products, rows):
+            for code, values in row["translations"].items():
+                translation = current.get((product.pk, code))
+                if translation is None:
+                    added.append(self.translation_model(master_id=product.pk, language_code=code, **values))
+                elif (translation.name, translation.description) != (values["name"], values["description"]):
+                    translation.name = values["name"]
+                    translation.description = values["description"]
+                    changed.append(translation)
+        self.translation_model.objects.bulk_update(changed, ["name", "description"], batch_size=BULK_UPDATE_BATCH)
+        return changed + self.translation_model.objects.bulk_create(added)
+
+
+# ----------------- Экспорт -----------------
+
+
+def export_records(languages: list[str], chunk_size: int = 1000):
+    """Yield one record per product, streaming from the database in chunks."""
+    products = (
+        Product.objects.select_related("category")
+        .prefetch_related(
+            "translations",
+            Prefetch(
+                "images",
+                queryset=ProductImage.objects.order_by(*PRIMARY_FIRST).only(
+                    "id", "product_id", "image"
+                ),
+            ),
+        )
+        .order_by("pk")
+    )
+    for product in products.iterator(chunk_size=chunk_size):
+        translations = {t.language_code: t for t in product.translations.all()}
+        yield {
+            "slug": product.slug,
+            "category": product.category.slug,
+            "price": str(product.price),
+            "is_active": product.is_active,
+            "is_main": product.is_main,
+            "translations": {
+                code: {"name": translations[code].name, "description": translations[code].description}
+                for code in languages
+                if code in translations
+            },
+            "images": [image.image.name for image in product.images.all()],
+        }
+
+
+def write_records(stream, records, fmt: str, languages: list[str]) -> int:
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=csv_columns(languages))
+        writer.writeheader()
+        for record in records:
+            row = {key: record[key] for key in ("slug", "category", "price")}
+            row["is_active"] = int(record["is_active"])
+            row["is_main"] = int(record["is_main"])
+            row["images"] = IMAGE_SEPARATOR.join(record["images"])
+            for code, values in record["translations"].items():
+                row[f"name_{code}"] = values["name"]
+                row[f"description_{code}"] = values["description"]
+            writer.writerow(row)
+            count += 1
+        return count
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
@@ -0,0 +1,172 @@
+"""Change notifications for watched models, including writes that send no signals.
+
+Saves, deletes and parler translation saves arrive through model signals;
+``update()``, ``bulk_create()`` and ``bulk_update()`` through
+:class:`ChangeTrackingQuerySet`. Subscribers get a :class:`Change` per model:
+
+* ``immediate`` ones right after each write, inside its transaction — for data
+  derived in the database (counters, search index);
+* the others once per transaction after it commits, with all changes to the
+  model merged — for caches, so a bulk action costs one invalidation.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.db import connections, models, transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from parler.models import TranslatedFieldsModel
+
+
+@dataclass
+class Change:
+    """Rows of ``model`` that were written, with the earlier values of its tracked fields."""
+
+    model: type
+    pks: set = field(default_factory=set)
+    previous: dict[str, set] = field(default_factory=dict)
+
+    def merge(self, other: Change) -> None:
+        self.pks |= other.pks
+        for name, values in other.previous.items():
+            self.previous.setdefault(name, set()).update(values)
+
+    def values(self, name: str) -> set:
+        """Earlier and current values of tracked field ``name`` over the changed rows."""
+        current = self.model._base_manager.filter(pk__in=self.pks).values_list(name, flat=True)
+        return (self.previous.get(name, set()) | set(current)) - {None}
+
+
+# Модель -> поля, прежние значения которых нужны подписчикам (старый слаг, старая категория).
+_tracked: dict[type, tuple[str, ...]] = {}
+
+_subscribers: dict[type, list[tuple[Callable[[Change], None], bool]]] = defaultdict(list)
+
+
+def subscribe(model: type, handler: Callable[[Change], None], immediate: bool = False) -> None:
+    _subscribers[model].append((handler, immediate))
+
+
+def unsubscribe(model: type, handler: Callable[[Change], None]) -> None:
+    _subscribers[model] = [entry for entry in _subscribers[model] if entry[0] is not handler]
+
+
+class _Batch:
+    """Changes of one transaction; registered with ``on_commit`` and delivered when it runs."""
+
+    def __init__(self):
+        self.changes: dict[type, Change] = {}
+        self.delivered = False
+
+    def add(self, change: Change) -> None:
+        if change.model in self.changes:
+            self.changes[change.model].merge(change)
+        else:
+            self.changes[change.model] = change
+
+    def __call__(self) -> None:
+        self.delivered = True
+        for change in self.changes.values():
+            for handler, immediate in _subscribers.get(change.model, ()):
+                if not immediate:
+                    handler(change)
+
+
+def _current_batch(using: str) -> _Batch:
+    connection = connections[using]
+    # Пачка, уже ждущая коммита на этом же уровне вложенности. При откате Django
+    # выбрасывает её вместе с остальными on_commit, и изменения пропадают с ней.
+    savepoints = set(connection.savepoint_ids)
+    for registered_at, callback, _robust in connection.run_on_commit:
+        if isinstance(callback, _Batch) and not callback.delivered and registered_at == savepoints:
+            return callback
+    batch = _Batch()
+    if connection.in_atomic_block:
+        transaction.on_commit(batch, using=using)
+    return batch
+
+
+def notify(model: type, pks, previous: dict[str, set] | None = None, using: str = "default") -> None:
+    """Report that rows ``pks`` of ``model`` were created, changed or deleted."""
+    change = Change(model, set(pks) - {None}, previous or {})
+    if not change.pks:
+        return
+    for handler, immediate in _subscribers.get(model, ()):
+        if immediate:
+            handler(change)
+    batch = _current_batch(using)
+    batch.add(change)
+    if not connections[using].in_atomic_block:
+        batch()
+
+
+def _snapshot(model: type, queryset) -> tuple[list, dict[str, set]]:
+    fields = _tracked.get(model, ())
+    rows = list(queryset.values_list("pk", *fields))
+    previous = {name: {row[index + 1] for row in rows} for index, name in enumerate(fields)}
+    return [row[0] for row in rows], previous
+
+
+class ChangeTrackingQuerySet(models.QuerySet):
+    """Reports ``update()``/``bulk_create()``/``bulk_update()`` to :func:`notify`."""
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            pks, previous = _snapshot(self.model, self)
+            rows = super().update(**kwargs)
+            notify(self.model, pks, previous, using=self.db)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        notify(self.model, [obj.pk for obj in objs], using=self.db)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            pks, previous = _snapshot(
+                self.model, self.model._base_manager.using(self.db).filter(pk__in=[obj.pk for obj in objs])
+            )
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            notify(self.model, pks, previous, using=self.db)
+        return rows
+
+
+def _remember(sender, instance, raw=False, using=None, **kwargs):
+    if raw or instance.pk is None:
+        return
+    fields = _tracked.get(sender, ())
+    if kwargs.get("signal") is pre_delete:
+        instance._change_previous = {name: {getattr(instance, name)} for name in fields}
+    else:
+        row = sender._base_manager.using(using).filter(pk=instance.pk).values(*fields).first() or {}
+        instance._change_previous = {name: {row[name]} for name in row}
+
+
+def _saved(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    notify(sender, [instance.pk], getattr(instance, "_change_previous", None), using=using)
+    if issubclass(sender, TranslatedFieldsModel):
+        # Перевод parler: изменилась и сама запись.
+        notify(sender.master.field.related_model, [instance.master_id], using=using)
+
+
+def watch(model: type, *tracked: str) -> None:
+    """Send signal-based changes of ``model`` and its parler translations to :func:`notify`."""
+    _tracked[model] = tracked
+    senders = [model]
+    parler_meta = getattr(model, "_parler_meta", None)
+    if parler_meta is not None:
+        senders.append(parler_meta.root_model)
+    for sender in senders:
+        uid = f"changes:{sender._meta.label_lower}"
+        if _tracked.get(sender):
+            pre_save.connect(_remember, sender=sender, dispatch_uid=uid)
+            pre_delete.connect(_remember, sender=sender, dispatch_uid=uid)
+        post_save.connect(_saved, sender=sender, dispatch_uid=uid)
+        post_delete.connect(_saved, sender=sender, dispatch_uid=uid)
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from .cache import get_version
+
+# Пространства имён только для валидаторов: сами данные под ними не кешируются.
+CATALOG_NAMESPACE = "catalog"
+ABOUT_NAMESPACE = "about"
+
+
+def _etag(request, namespaces: tuple[str, ...], per_visitor: bool) -> str:
+    """ETag of a page built from ``namespaces``; computed once per request.
+
+    There is no ``Last-Modified``: a date can't tell the language, the release
+    or the visitor's CSRF cookie apart, so ``If-Modified-Since`` alone would get
+    stale 304s.
+    """
+    cache_attr = "_content_etag"
+    cached = getattr(request, cache_attr, None)
+    if cached is not None:
+        return cached
+
+    parts = [
+        getattr(settings, "RELEASE_VERSION", ""),
+        get_language() or "",
+        request.get_full_path(),
+    ]
+    parts += [f"{namespace}:{get_version(namespace)}" for namespace in namespaces]
+    if per_visitor:
+        # В HTML есть CSRF-токен: страница, отданная до смены cookie, уже не годится.
+        parts.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""))
+    digest = hashlib.blake2b("|".join(parts).encode(), digest_size=16).hexdigest()
+    # Слабый ETag: маскированный CSRF-токен меняет байты ответа, но не его смысл.
+    etag = f'W/"{digest}"'
+    setattr(request, cache_attr, etag)
+    return etag
+
+
+def _conditional(view, namespaces: tuple[str, ...], per_visitor: bool):
+    decorated = condition(etag_func=lambda request, *args, **kwargs: _etag(request, namespaces, per_visitor))(view)
+
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            response = await decorated(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True)
+            return response
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = decorated(request, *args, **kwargs)
+        # Браузер хранит ответ, но перед показом всегда переспрашивает сервер.
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    return wrapper
+
+
+def conditional_page(*namespaces: str):
+    """Answer GET/HEAD with 304 before the view runs while none of ``namespaces`` changed.
+
+    Menu and footer come from the context processors, so HTML pages should
+    list their namespaces too.
+    """
+
+    def decorator(view):
+        return _conditional(view, namespaces, per_visitor=True)
+
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Same as :func:`conditional_page` for the ``list``/``retrieve`` actions of a DRF viewset."""
+
+    conditional_namespaces: tuple[str, ...] = ()
+
+    def list(self, request, *args, **kwargs):
+        view = _conditional(super().list, self.conditional_namespaces, per_visitor=False)
+        return view(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        view = _conditional(super().retrieve, self.conditional_namespaces, per_visitor=False)
+        return view(request, *args, **kwargs)
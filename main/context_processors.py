@@ -1,3 +1,6 @@
+from django.utils.translation import get_language
+
+from .cache import get_or_build
 from .models import (
     Category,
     ContactAddress,
@@ -7,26 +10,77 @@ from .models import (
     SocialMap,
 )
 
+MENU_NAMESPACE = "menu"
+FOOTER_NAMESPACE = "footer"
 
-def categories(request):
+
+def _build_menu():
+    return [
+        {"id": c.pk, "slug": c.slug, "name": c.name, "description": c.description}
+        for c in Category.objects.all().cached_translations()
+    ]
+
+
+def _build_footer():
+    addresses = (
+        ContactAddress.objects.filter(is_active=True)
+        .cached_translations()
+        .order_by("order")[:3]
+    )
+    phones = (
+        ContactPhone.objects.filter(is_active=True)
+        .cached_translations()
+        .order_by("order")[:3]
+    )
+    emails = (
+        ContactEmail.objects.filter(is_active=True)
+        .cached_translations()
+        .order_by("order")[:2]
+    )
+    hours = (
+        ContactWorkingHours.objects.filter(is_active=True)
+        .cached_translations()
+        .first()
+    )
+    social = SocialMap.objects.filter(is_active=True).first()
     return {
-        "menu_categories": Category.objects.all().prefetch_related("translations"),
+        "footer_addresses": [
+            {"title": a.title, "city": a.city, "address": a.address, "display": str(a)}
+            for a in addresses
+        ],
+        "footer_phones": [{"label": p.label, "phone": p.phone} for p in phones],
+        "footer_emails": [{"label": e.label, "email": e.email} for e in emails],
+        "footer_hours": (
+            {
+                "weekdays": hours.weekdays,
+                "saturday": hours.saturday,
+                "sunday": hours.sunday,
+                "note": hours.note,
+            }
+            if hours
+            else None
+        ),
+        "footer_social": (
+            {
+                "instagram_url": social.instagram_url,
+                "facebook_url": social.facebook_url,
+                "youtube_url": social.youtube_url,
+                "tiktok_url": social.tiktok_url,
+                "telegram_url": social.telegram_url,
+                "map_embed": social.map_embed,
+                "map_url": social.map_url,
+            }
+            if social
+            else None
+        ),
     }
 
 
-def global_contacts(request):
+def categories(request):
     return {
-        "footer_addresses": ContactAddress.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("order")[:3],
-        "footer_phones": ContactPhone.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("order")[:3],
-        "footer_emails": ContactEmail.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("order")[:2],
-        "footer_hours": ContactWorkingHours.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .first(),
-        "footer_social": SocialMap.objects.filter(is_active=True).first(),
+        "menu_categories": get_or_build(MENU_NAMESPACE, (get_language(),), _build_menu),
     }
+
+
+def global_contacts(request):
+    return get_or_build(FOOTER_NAMESPACE, (get_language(),), _build_footer)
@@ -0,0 +1,221 @@
+"""Critical ("above the fold") CSS for a rendered page.
+
+The fold is the markup from ``<body>`` to the end of the first
+``FOLD_SECTIONS`` top-level ``<section>`` elements or the page ``<footer>``,
+whichever comes first: the header plus the first screens of content. The
+rules of the stylesheet whose selectors can match an element of the fold are
+kept, together with the ``@media`` and ``@supports`` blocks around them,
+``@font-face`` and the ``@keyframes`` the kept rules animate. Matching ignores
+the document structure (``.a .b`` matches when both ``.a`` and ``.b`` occur)
+and drops interaction states (``:hover``, ``:focus``): the full stylesheet
+arrives before they matter.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+
+from .minify import _string_end, minify_css
+
+FOLD_SECTIONS = 2
+
+# Состояния, которых нет на первом кадре: такие селекторы в критический CSS не попадают.
+_INTERACTIVE = re.compile(r":(hover|focus|focus-visible|focus-within|active|visited)\b")
+_PSEUDO = re.compile(r"::?[\w-]+(\((?:[^()]|\([^()]*\))*\))?")
+_ATTRIBUTE = re.compile(r"\[[^\]]*\]")
+_COMBINATOR = re.compile(r"\s*[\s>+~]\s*")
+_TAG = re.compile(r"^([a-zA-Z][\w-]*|\*)")
+_CLASS = re.compile(r"\.([\w-]+)")
+_ID = re.compile(r"#([\w-]+)")
+_ANIMATION = re.compile(r"animation(?:-name)?\s*:([^;}]*)")
+_URL = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+_GROUPING = ("@media", "@supports", "@layer", "@container")
+
+
+@dataclass
+class Fold:
+    tags: set[str] = field(default_factory=lambda: {"html", "body"})
+    classes: set[str] = field(default_factory=set)
+    ids: set[str] = field(default_factory=set)
+
+
+class _FoldParser(HTMLParser):
+    def __init__(self, sections: int):
+        super().__init__(convert_charrefs=True)
+        self.fold = Fold()
+        self.sections = sections
+        self.in_body = False
+        self.section_depth = 0
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "body":
+            self.in_body = True
+        if not self.in_body or self.done:
+            return
+        if tag == "footer" and not self.section_depth:
+            # Страница короче FOLD_SECTIONS секций: подвал всё равно ниже первого экрана.
+            self.done = True
+            return
+        if tag == "section":
+            self.section_depth += 1
+        self.fold.tags.add(tag)
+        for name, value in attrs:
+            if name == "class" and value:
+                self.fold.classes.update(value.split())
+            elif name == "id" and value:
+                self.fold.ids.add(value)
+
+    def handle_endtag(self, tag):
+        if tag != "section" or not self.in_body or self.done:
+            return
+        self.section_depth -= 1
+        if self.section_depth == 0:
+            self.sections -= 1
+            self.done = self.sections <= 0
+
+
+def fold_of(html: str, sections: int = FOLD_SECTIONS) -> Fold:
+    """Tags, classes and ids used above the fold of ``html``."""
+    parser = _FoldParser(sections)
+    parser.feed(html)
+    parser.close()
+    return parser.fold
+
+
+def _block_end(css: str, start: int) -> int:
+    """Index just past the ``}`` matching the ``{`` at ``start - 1``."""
+    depth, i, n = 1, start, len(css)
+    while i < n:
+        ch = css[i]
+        if ch in "'\"":
+            i = _string_end(css, i)
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def _statements(css: str):
+    """Yield ``(prelude, body)`` of top-level statements; ``body`` is ``None`` for ``@import;``."""
+    i, n = 0, len(css)
+    while i < n:
+        j = i
+        while j < n and css[j] not in "{;":
+            if css[j] in "'\"":
+                j = _string_end(css, j)
+            elif css.startswith("/*", j):
+                j = css.find("*/", j + 2)
+                j = n if j < 0 else j + 2
+            else:
+                j += 1
+        prelude = re.sub(r"/\*.*?\*/", "", css[i:j], flags=re.S).strip()
+        if j >= n:
+            return
+        if css[j] == ";":
+            if prelude:
+                yield prelude, None
+            i = j + 1
+            continue
+        end = _block_end(css, j + 1)
+        yield prelude, css[j + 1 : end - 1]
+        i = end
+
+
+def _split_selectors(prelude: str) -> list[str]:
+    selectors, depth, start = [], 0, 0
+    for i, ch in enumerate(prelude):
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            selectors.append(prelude[start:i].strip())
+            start = i + 1
+    selectors.append(prelude[start:].strip())
+    return [selector for selector in selectors if selector]
+
+
+def selector_matches(selector: str, fold: Fold) -> bool:
+    if _INTERACTIVE.search(selector):
+        return False
+    selector = selector.replace(":root", "html")
+    selector = _ATTRIBUTE.sub("", _PSEUDO.sub("", selector))
+    for compound in _COMBINATOR.split(selector.strip()):
+        tag = _TAG.match(compound)
+        if tag and tag.group(1) != "*" and tag.group(1).lower() not in fold.tags:
+            return False
+        if not set(_CLASS.findall(compound)) <= fold.classes:
+            return False
+        if not set(_ID.findall(compound)) <= fold.ids:
+            return False
+    return True
+
+
+def _absolute_urls(body: str, base_url: str) -> str:
+    # Встроенный в страницу CSS разрешает относительные url() от страницы, а не от файла стилей.
+    def absolute(match):
+        url = match.group(2).strip()
+        if url.startswith(("/", "data:", "#")) or "://" in url:
+            return match.group(0)
+        return f'url("{posixpath.normpath(posixpath.join(base_url, url))}")'
+
+    return _URL.sub(absolute, body)
+
+
+def _extract(css: str, fold: Fold, animations: set[str], base_url: str) -> list[tuple[str, str | list]]:
+    kept: list[tuple[str, str | list]] = []
+    for prelude, body in _statements(css):
+        at_rule = prelude.split(None, 1)[0].lower() if prelude.startswith("@") else ""
+        if body is None:
+            if at_rule in ("@import", "@charset"):
+                kept.append((prelude, None))
+        elif at_rule in _GROUPING:
+            children = _extract(body, fold, animations, base_url)
+            if children:
+                kept.append((prelude, children))
+        elif at_rule in ("@font-face", "@keyframes", "@-webkit-keyframes"):
+            kept.append((prelude, _absolute_urls(body, base_url)))
+        elif not at_rule:
+            selectors = [selector for selector in _split_selectors(prelude) if selector_matches(selector, fold)]
+            if selectors:
+                for value in _ANIMATION.findall(body):
+                    animations.update(re.findall(r"[\w-]+", value))
+                kept.append((",".join(selectors), _absolute_urls(body, base_url)))
+    return kept
+
+
+def _serialize(statements, animations: set[str]) -> str:
+    parts = []
+    for prelude, body in statements:
+        if prelude.lower().startswith(("@keyframes", "@-webkit-keyframes")):
+            if prelude.split(None, 1)[-1].strip() not in animations:
+                continue
+        if body is None:
+            parts.append(f"{prelude};")
+        elif isinstance(body, list):
+            inner = _serialize(body, animations)
+            if inner:
+                parts.append(f"{prelude}{{{inner}}}")
+        else:
+            parts.append(f"{prelude}{{{body}}}")
+    return "".join(parts)
+
+
+def critical_css(css: str, html: str, sections: int = FOLD_SECTIONS, base_url: str = "") -> str:
+    """Minified subset of ``css`` needed to paint the fold of ``html``.
+
+    ``base_url`` is the URL of the stylesheet's directory; relative ``url()``
+    values are rewritten against it.
+    """
+    animations: set[str] = set()
+    statements = _extract(minify_css(css), fold_of(html, sections), animations, base_url)
+    return minify_css(_serialize(statements, animations))
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps, features
+
+from . import changes
+
+logger = logging.getLogger(__name__)
+
+# Ширины производных изображений (px). Больше оригинала не увеличиваем.
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+
+# Формат -> (имя формата Pillow, параметры сохранения). Порядок — от лучшего сжатия к худшему.
+VARIANT_FORMATS = {
+    "avif": ("AVIF", {"quality": 50}),
+    "webp": ("WEBP", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# Загружаемые оригиналы уменьшаются до этой стороны (px): больше не нужно ни одному варианту.
+MAX_SOURCE_SIDE = 2400
+
+MIME_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+
+def available_formats() -> list[str]:
+    return [fmt for fmt in VARIANT_FORMATS if fmt == "jpeg" or features.check(fmt)]
+
+
+def variant_name(name: str, width: int, fmt: str) -> str:
+    root, _ext = os.path.splitext(name)
+    return f"{root}-{width}w.{'jpg' if fmt == 'jpeg' else fmt}"
+
+
+def _encode(image: Image.Image, fmt: str) -> bytes:
+    pil_format, options = VARIANT_FORMATS[fmt]
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def _prepare(image: Image.Image) -> Image.Image:
+    image = ImageOps.exif_transpose(image)
+    image.load()
+    if image.mode not in ("RGB", "RGBA", "L"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    return image
+
+
+def _write_variants(storage, name: str, image: Image.Image) -> dict:
+    widths = [width for width in VARIANT_WIDTHS if width < image.width]
+    if image.width <= VARIANT_WIDTHS[-1]:
+        # Полноразмерная копия нужна, чтобы srcset не ограничивался меньшими ширинами.
+        widths.append(image.width)
+    formats = available_formats()
+    result: dict[str, list] = {fmt: [] for fmt in formats}
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            variant = variant_name(name, width, fmt)
+            if storage.exists(variant):
+                storage.delete(variant)
+            saved = storage.save(variant, ContentFile(_encode(resized, fmt)))
+            result[fmt].append([width, saved])
+
+    return {
+        "source": name,
+        "width": image.width,
+        "height": image.height,
+        "formats": result,
+    }
+
+
+def build_variants(field_file) -> dict:
+    """Write resized copies of ``field_file`` next to it and describe them.
+
+    Returns ``{"source", "width", "height", "formats": {fmt: [[width, name], ...]}}``,
+    the structure stored in the ``*_variants`` JSON fields.
+    """
+    with field_file.open("rb") as source:
+        image = _prepare(Image.open(source))
+    return _write_variants(field_file.storage, field_file.name, image)
+
+
+# ----------------- Пакетная обработка в пуле процессов -----------------
+
+
+def store_image(source: str | bytes, name: str) -> dict:
+    """Decode and validate ``source`` (a path or raw bytes), downscale it, save it
+    to the default storage as ``name`` and build its variants.
+
+    Returns ``{"name": stored name, "variants": {...}}``. Touches only the
+    storage, never the database, so it can run in a worker process.
+    """
+    opened = Image.open(source if isinstance(source, str) else BytesIO(source))
+    with opened:
+        # verify() ловит обрезанные и повреждённые файлы, но после него файл нужно открыть заново.
+        opened.verify()
+    with Image.open(source if isinstance(source, str) else BytesIO(source)) as opened:
+        image = _prepare(opened)
+    image.thumbnail((MAX_SOURCE_SIDE, MAX_SOURCE_SIDE), Image.LANCZOS)
+
+    fmt = "jpeg" if image.mode != "RGBA" else "webp"
+    root, _ext = os.path.splitext(name)
+    stored = default_storage.save(f"{root}.{'jpg' if fmt == 'jpeg' else fmt}", ContentFile(_encode(image, fmt)))
+    return {"name": stored, "variants": _write_variants(default_storage, stored, image)}
+
+
+def rebuild_variants(name: str, previous: dict | None) -> dict:
+    """Build variants for an already stored file and drop the stale ones; safe in a worker."""
+    with default_storage.open(name, "rb") as source:
+        image = _prepare(Image.open(source))
+    variants = _write_variants(default_storage, name, image)
+    delete_variants(default_storage, previous, keep=_variant_names(variants))
+    return variants
+
+
+def _init_worker():
+    # Рабочие процессы запускаются через spawn и настраивают Django сами.
+    django.setup()
+
+
+@contextmanager
+def image_pool(workers: int | None = None):
+    """``ProcessPoolExecutor`` for :func:`run_in_pool`, or ``None`` to work in-process.
+
+    ``workers`` defaults to all cores; 0 or 1 disables the pool.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as pool:
+        yield pool
+
+
+def run_in_pool(pool, func, jobs: dict):
+    """Yield ``(key, result_or_exception)`` for ``func(*args)`` of every ``{key: args}`` job."""
+    if pool is None:
+        for key, args in jobs.items():
+            try:
+                yield key, func(*args)
+            except Exception as exc:
+                yield key, exc
+        return
+
+    futures = {key: pool.submit(func, *args) for key, args in jobs.items()}
+    for key, future in futures.items():
+        try:
+            yield key, future.result()
+        except Exception as exc:
+            yield key, exc
+
+
+def _variant_names(variants: dict | None) -> set[str]:
+    return {
+        name
+        for entries in (variants or {}).get("formats", {}).values()
+        for _width, name in entries
+    }
+
+
+def delete_variants(storage, variants: dict | None, keep: set[str] = frozenset()) -> None:
+    for name in _variant_names(variants) - keep:
+        try:
+            storage.delete(name)
+        except OSError:
+            logger.warning("Could not delete image variant %s", name)
+
+
+def variants_outdated(instance, field_name: str, variants_field: str) -> bool:
+    """Whether the variants described in ``instance.<variants_field>`` are not those of the current file."""
+    field_file = getattr(instance, field_name)
+    current = getattr(instance, variants_field) or {}
+    if field_file:
+        return current.get("source") != field_file.name
+    return bool(current)
+
+
+def refresh_variants(instance, field_name: str, variants_field: str, force: bool = False) -> dict:
+    """Regenerate variants of ``instance.<field_name>`` when the file changed.
+
+    The new description is written with ``update()`` on the base manager, so no
+    further signals or change notifications fire.
+    """
+    field_file = getattr(instance, field_name)
+    current = getattr(instance, variants_field) or {}
+    if not force and not variants_outdated(instance, field_name, variants_field):
+        return current
+
+    variants: dict = {}
+    if field_file:
+        try:
+            variants = build_variants(field_file)
+        except Exception:
+            logger.exception("Failed to build variants for %s", field_file.name)
+            return current
+    delete_variants(field_file.storage, current, keep=_variant_names(variants))
+
+    type(instance)._base_manager.filter(pk=instance.pk).update(**{variants_field: variants})
+    setattr(instance, variants_field, variants)
+    return variants
+
+
+# ----------------- После сохранения в админке -----------------
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor_pid != os.getpid():
+            # Поток пула не переживает fork воркера: каждому процессу — свой пул.
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variants")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _refresh_saved(model, pk, field_name: str, variants_field: str) -> None:
+    instance = model._base_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+    previous = getattr(instance, variants_field) or {}
+    if refresh_variants(instance, field_name, variants_field) != previous:
+        # Страницы и снимки, собранные до появления вариантов, сбрасываются ещё раз.
+        changes.notify(model, [pk])
+
+
+def _run_in_background(job) -> None:
+    close_old_connections()
+    try:
+        job()
+    except Exception:
+        logger.exception("Failed to refresh image variants.")
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(instance, field_name: str, variants_field: str) -> None:
+    """Regenerate variants of a saved ``instance`` once the transaction commits.
+
+    With ``IMAGE_VARIANTS_BACKGROUND`` the encoding runs in a background thread
+    instead of the request; the change is reported again when the variants are written.
+    """
+    if not variants_outdated(instance, field_name, variants_field):
+        return
+    job = partial(_refresh_saved, type(instance), instance.pk, field_name, variants_field)
+    if settings.IMAGE_VARIANTS_BACKGROUND:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_background, job))
+    else:
+        transaction.on_commit(job)
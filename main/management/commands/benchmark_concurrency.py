@@ -0,0 +1,192 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.core.handlers.asgi import ASGIHandler
+from django.test import Client
+
+from main import models
+from main.benchmarking import client_host, page_views, summarize, write_report
+
+# Страницы с асинхронными вариантами.
+PAGES = {
+    "index": "/",
+    "catalog": "/catalog/",
+    "product_detail": "/product/{product}/",
+    "about": "/about/",
+}
+
+
+class _Latency:
+    """``execute_wrapper`` that adds a network round trip to every statement."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.seconds)
+        return execute(sql, params, many, context)
+
+
+async def _asgi_get(application, url: str, host: str) -> int:
+    """GET ``url`` through ``application`` as an ASGI server would; returns the status code.
+
+    ``AsyncClient`` is not used: it runs the sync code of all requests in one
+    thread, while ``ASGIHandler`` gives every request a thread of its own.
+    """
+    path, _sep, query = url.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", host.encode())],
+        "client": ("127.0.0.1", 0),
+        "server": (host, 80),
+    }
+    body_sent = asyncio.Event()
+    status = None
+
+    async def receive():
+        if not body_sent.is_set():
+            body_sent.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Клиент не отключается: обработчик сам отменит ожидание после ответа.
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await application(scope, receive, send)
+    return status
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the HTML pages with concurrent requests through the WSGI handler (sync views, "
+        "one thread per request) and the ASGI handler (async views): throughput and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per page and handler")
+        parser.add_argument(
+            "--db-latency-ms",
+            type=float,
+            default=0.0,
+            help="Add this delay to every SQL statement, e.g. the round trip to a remote PostgreSQL",
+        )
+        parser.add_argument(
+            "--only", default="", help="Comma-separated pages to run (default: all)"
+        )
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        product = models.Product.objects.filter(is_active=True).order_by("-created_at").first()
+        if product is None:
+            raise CommandError("The catalog is empty; run seed_demo_data first.")
+
+        pages = {name: url.format(product=product.slug) for name, url in PAGES.items()}
+        only = {name.strip() for name in options["only"].split(",") if name.strip()}
+        if only:
+            pages = {name: url for name, url in pages.items() if name in only}
+
+        latency = options["db_latency_ms"] / 1000
+        if latency:
+            # Соединения открываются и в потоках запросов, и в потоках секций.
+            connection_created.connect(self._add_latency, dispatch_uid="benchmark_concurrency")
+            self._latency = _Latency(latency)
+            connections.close_all()
+
+        concurrency, total = options["concurrency"], options["requests"]
+        self._host = client_host()
+        results = {}
+        try:
+            for name, url in pages.items():
+                with page_views(asynchronous=False):
+                    wsgi = self._load_wsgi(url, concurrency, total)
+                with page_views(asynchronous=True):
+                    asgi = asyncio.run(self._load_asgi(url, concurrency, total))
+                results[name] = {
+                    "url": url,
+                    "wsgi": wsgi,
+                    "asgi": asgi,
+                    "throughput_change_pct": round(
+                        (asgi["requests_per_second"] / wsgi["requests_per_second"] - 1) * 100, 1
+                    ),
+                }
+        finally:
+            connection_created.disconnect(dispatch_uid="benchmark_concurrency")
+
+        write_report(
+            {
+                "database": connection.vendor,
+                "cache": settings.CACHES["default"]["BACKEND"],
+                "concurrency": concurrency,
+                "requests": total,
+                "db_latency_ms": options["db_latency_ms"],
+                "section_threads": settings.ASYNC_SECTION_THREADS,
+                "results": results,
+            },
+            options["output"],
+            self.stdout,
+        )
+
+    def _add_latency(self, sender, connection, **kwargs):
+        connection.execute_wrappers.append(self._latency)
+
+    def _report(self, samples, statuses, elapsed):
+        errors = sum(1 for status in statuses if status != 200)
+        if errors:
+            self.stderr.write(f"{errors} responses were not HTTP 200")
+        return {
+            **summarize(samples),
+            "errors": errors,
+            "requests_per_second": round(len(samples) / elapsed, 1),
+        }
+
+    def _load_wsgi(self, url, concurrency, total):
+        local = threading.local()
+
+        def request():
+            # Как воркер gunicorn с потоками: у каждого потока свой клиент и своё соединение.
+            if not hasattr(local, "client"):
+                local.client = Client(HTTP_HOST=self._host)
+            started = time.perf_counter()
+            status = local.client.get(url).status_code
+            return time.perf_counter() - started, status
+
+        Client(HTTP_HOST=self._host).get(url)  # прогрев кеша страниц
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            started = time.perf_counter()
+            results = list(executor.map(lambda _index: request(), range(total)))
+            elapsed = time.perf_counter() - started
+        return self._report([sample for sample, _ in results], [status for _, status in results], elapsed)
+
+    async def _load_asgi(self, url, concurrency, total):
+        application = ASGIHandler()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                status = await _asgi_get(application, url, self._host)
+                return time.perf_counter() - started, status
+
+        await _asgi_get(application, url, self._host)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+        return self._report([sample for sample, _ in results], [status for _, status in results], elapsed)
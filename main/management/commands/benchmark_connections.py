@@ -0,0 +1,94 @@
+from django.core import signals
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from main.benchmarking import measure, summarize, write_report
+
+# Режим -> (CONN_MAX_AGE, с пулом). Пул и постоянные соединения Django не совмещает.
+MODES = {
+    "new_connection_per_request": (0, False),
+    "persistent_connection": (None, False),
+    "pool": (0, True),
+}
+COLUMNS = ("mean_ms", "p50_ms", "p95_ms", "max_ms")
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request database connection cost with a new connection per request, "
+        "a persistent connection (CONN_MAX_AGE) and the connection pool, side by side"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=200)
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file ('-' for stdout)")
+
+    def _request_cycle(self):
+        # То же, что делает обработчик запроса: close_old_connections на входе и выходе.
+        signals.request_started.send(sender=self.__class__)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        signals.request_finished.send(sender=self.__class__)
+
+    def _close(self):
+        connection.close()
+        # Пул живёт на уровне процесса: без close_pool() следующий прогон получил бы старый.
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+
+    def _run(self, mode, runs, pool_options):
+        conn_max_age, pooled = MODES[mode]
+        if pooled and connection.vendor != "postgresql":
+            return {"skipped": "the connection pool needs PostgreSQL with psycopg 3"}
+
+        settings_dict = connection.settings_dict
+        original = settings_dict["CONN_MAX_AGE"], settings_dict["OPTIONS"]
+        self._close()
+        options = {key: value for key, value in original[1].items() if key != "pool"}
+        if pooled:
+            options["pool"] = pool_options
+        settings_dict["CONN_MAX_AGE"], settings_dict["OPTIONS"] = conn_max_age, options
+        try:
+            return summarize(measure(self._request_cycle, runs))
+        except ImproperlyConfigured as exc:
+            return {"skipped": str(exc).splitlines()[0]}
+        finally:
+            self._close()
+            settings_dict["CONN_MAX_AGE"], settings_dict["OPTIONS"] = original
+
+    def _table(self, results) -> str:
+        width = max(map(len, results)) + 2
+        lines = ["".ljust(8) + "".join(mode.rjust(width) for mode in results)]
+        for column in COLUMNS:
+            cells = (
+                "-" if "skipped" in result else f"{result[column]:.3f}"
+                for result in results.values()
+            )
+            lines.append(column.ljust(8) + "".join(cell.rjust(width) for cell in cells))
+        lines += [f"{mode}: {result['skipped']}" for mode, result in results.items() if "skipped" in result]
+        return "\n".join(lines)
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        # Настройки пула из DB_POOL, иначе — значения psycopg_pool по умолчанию.
+        pool_options = settings_dict.get("OPTIONS", {}).get("pool") or True
+
+        results = {mode: self._run(mode, options["runs"], pool_options) for mode in MODES}
+        report = {
+            "vendor": connection.vendor,
+            "host": settings_dict.get("HOST"),
+            "configured_pool": bool(settings_dict.get("OPTIONS", {}).get("pool")),
+            "results": results,
+        }
+        before = results["new_connection_per_request"]["p50_ms"]
+        report["p50_saved_ms"] = {
+            mode: round(before - result["p50_ms"], 3)
+            for mode, result in results.items()
+            if mode != "new_connection_per_request" and "skipped" not in result
+        }
+
+        self.stdout.write(self._table(results))
+        if options["output"]:
+            write_report(report, options["output"], self.stdout)
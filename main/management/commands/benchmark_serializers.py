@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+
+from main import renderers
+from main.benchmarking import client_host, count_queries, measure, summarize, write_report
+from main.models import Product
+from main.product_rows import parse_fields, product_rows
+from main.views import ProductListSerializer, ProductRowSerializer, ProductSerializer, ProductViewSet
+
+
+def _instances(serializer_class, images):
+    def run(request, size):
+        queryset = (
+            Product.objects.filter(is_active=True)
+            .select_related("category", "primary_image")
+            .prefetch_related("translations", "category__translations", images)
+            .order_by("-created_at", "id")[:size]
+        )
+        return serializer_class(queryset, many=True, context={"request": request}).data
+
+    return run
+
+
+def _rows(fields):
+    def run(request, size):
+        queryset = Product.objects.filter(is_active=True).order_by("-created_at", "id")
+        rows = product_rows(queryset, fields, translation.get_language())[:size]
+        return ProductRowSerializer(rows, many=True, fields=fields, context={"request": request}).data
+
+    return run
+
+
+RENDERERS = {
+    "json": JSONRenderer,
+    "fast_json": renderers.FastJSONRenderer,
+}
+
+# Способы собрать страницу списка товаров: запросы + сериализация.
+STRATEGIES = {
+    "full": _instances(ProductSerializer, "images__translations"),
+    "instances": _instances(ProductListSerializer, "primary_image__translations"),
+    "rows": _rows(parse_fields("")),
+    "rows_sparse": _rows(parse_fields("id,name,slug,price")),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare product list serialization strategies (model serializers versus "
+        "flat .values() rows) and JSON renderers for several page sizes"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="12,50,200", help="Comma-separated page sizes")
+        parser.add_argument("--runs", type=int, default=30, help="Timed runs per strategy and size")
+        parser.add_argument("--language", default="ru")
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",") if size.strip()]
+        except ValueError:
+            raise CommandError("--sizes must be a comma-separated list of integers.")
+        available = Product.objects.filter(is_active=True).count()
+        if available < max(sizes, default=0):
+            self.stderr.write(f"Only {available} active products; larger pages are truncated.")
+
+        request = RequestFactory(HTTP_HOST=client_host()).get("/api/catalog/products/")
+        results = {}
+        with translation.override(options["language"]):
+            for size in sizes:
+                page = {}
+                for name, build in STRATEGIES.items():
+                    queries = count_queries(lambda: build(request, size))
+                    samples = measure(lambda: build(request, size), options["runs"])
+                    page[name] = {"queries": queries, **summarize(samples)}
+                baseline = page["instances"]["p50_ms"]
+                for timings in page.values():
+                    timings["speedup_vs_instances"] = (
+                        round(baseline / timings["p50_ms"], 2) if timings["p50_ms"] else None
+                    )
+
+                data = STRATEGIES["rows"](request, size)
+                page["render"] = {
+                    name: {
+                        "bytes": len(renderer_class().render(data)),
+                        **summarize(measure(lambda: renderer_class().render(data), options["runs"])),
+                    }
+                    for name, renderer_class in RENDERERS.items()
+                }
+                results[str(size)] = page
+
+        write_report(
+            {
+                "language": options["language"],
+                "products": available,
+                "json_backend": renderers.BACKEND,
+                "results": results,
+                "endpoint": self._endpoint(options["runs"]),
+            },
+            options["output"],
+            self.stdout,
+        )
+
+    def _endpoint(self, runs):
+        """Full ``GET /api/catalog/products/`` with each renderer."""
+        client = Client(HTTP_HOST=client_host())
+        url = "/api/catalog/products/"
+        original = ProductViewSet.renderer_classes
+        timings = {}
+        try:
+            for name, renderer_class in RENDERERS.items():
+                ProductViewSet.renderer_classes = [renderer_class]
+                status = client.get(url).status_code
+                if status != 200:
+                    raise CommandError(f"{url} with {name}: HTTP {status}")
+                timings[name] = summarize(measure(lambda: client.get(url), runs))
+        finally:
+            ProductViewSet.renderer_classes = original
+        return timings
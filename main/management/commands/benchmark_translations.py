@@ -0,0 +1,116 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import translation
+
+from main.benchmarking import StatementRecorder, count_queries, measure, result_size, summarize, write_report
+from main.models import Category, Product
+from main.pagination import CATALOG_ORDERING
+from main.views import CATALOG_PAGE_SIZE
+
+
+def _catalog(prefetch):
+    products = prefetch(
+        Product.objects.filter(is_active=True)
+        .select_related("category", "primary_image")
+        .order_by(*CATALOG_ORDERING)
+    )[:CATALOG_PAGE_SIZE]
+    return [(p.name, p.category.name) for p in products]
+
+
+def _homepage(prefetch):
+    products = prefetch(
+        Product.objects.filter(is_active=True, is_main=True)
+        .select_related("category", "primary_image")
+        .order_by("-created_at")
+    )[:8]
+    return [(p.name, p.category.name) for p in products]
+
+
+def _product(prefetch):
+    product = prefetch(
+        Product.objects.filter(is_active=True).select_related("category").order_by("-created_at")
+    ).first()
+    return product.name, product.description, product.category.name
+
+
+def _menu(prefetch):
+    return [(c.name, c.description) for c in prefetch(Category.objects.all())]
+
+
+# Сценарий -> (сборка данных страницы, прежний prefetch_related, поля для prefetch_translations).
+SCENARIOS = {
+    "catalog": (_catalog, ("translations", "category__translations"), ("name", "category__name")),
+    "homepage_products": (
+        _homepage,
+        ("translations", "category__translations"),
+        ("name", "category__name"),
+    ),
+    "product_page": (
+        _product,
+        ("translations", "category__translations"),
+        ("name", "description", "category__name"),
+    ),
+    "menu": (_menu, ("translations",), ()),
+}
+
+
+def _translation_tables():
+    return [
+        model._parler_meta.root_model._meta.db_table
+        for model in apps.get_app_config("main").get_models()
+        if getattr(model, "_parler_meta", None) is not None
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare prefetch_related('translations') with prefetch_translations(): "
+        "translation rows and bytes read, queries and timings per page"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--languages", default="ru,en", help="Comma-separated languages to measure")
+        parser.add_argument("--runs", type=int, default=30, help="Timed runs per scenario and strategy")
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+
+    def handle(self, *args, **options):
+        if not Product.objects.filter(is_active=True).exists():
+            raise CommandError("The catalog is empty; run seed_demo_data first.")
+
+        tables = _translation_tables()
+        results = {}
+        for language in [code.strip() for code in options["languages"].split(",") if code.strip()]:
+            with translation.override(language):
+                results[language] = {
+                    name: self._compare(build, lookups, fields, tables, options["runs"])
+                    for name, (build, lookups, fields) in SCENARIOS.items()
+                }
+
+        write_report(
+            {"products": Product.objects.count(), "results": results},
+            options["output"],
+            self.stdout,
+        )
+
+    def _compare(self, build, lookups, fields, tables, runs):
+        strategies = {
+            "prefetch_related": lambda queryset: queryset.prefetch_related(*lookups),
+            "prefetch_translations": lambda queryset: queryset.prefetch_translations(*fields),
+        }
+        report = {}
+        for name, prefetch in strategies.items():
+            recorder = StatementRecorder(tables)
+            with connection.execute_wrapper(recorder):
+                build(prefetch)
+            rows, size = result_size(recorder.statements)
+            report[name] = {
+                "translation_rows": rows,
+                "translation_bytes": size,
+                "queries": count_queries(lambda: build(prefetch)),
+                **summarize(measure(lambda: build(prefetch), runs)),
+            }
+        before, after = report["prefetch_related"], report["prefetch_translations"]
+        report["rows_saved"] = before["translation_rows"] - after["translation_rows"]
+        report["bytes_saved"] = before["translation_bytes"] - after["translation_bytes"]
+        return report
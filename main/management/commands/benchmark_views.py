@@ -0,0 +1,114 @@
+import subprocess
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from main import models
+from main.benchmarking import client_host, count_queries, measure, scenario_urls, summarize, write_report
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark public HTML views and API endpoints: SQL query counts against budgets "
+        "and p50/p95 response times, written as a JSON report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Re-seed the database with this many products first (DESTROYS existing content)",
+        )
+        parser.add_argument("--runs", type=int, default=30, help="Timed runs per scenario")
+        parser.add_argument("--output", default=None, help="Write the JSON report to this file")
+        parser.add_argument(
+            "--only", default="", help="Comma-separated scenario names to run (default: all)"
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error if a scenario exceeds its query budget",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_demo_data", products=options["seed"], stdout=self.stdout)
+
+        product = models.Product.objects.filter(is_active=True).order_by("-created_at").first()
+        category = models.Category.objects.order_by("pk").first()
+        if product is None or category is None:
+            raise CommandError("The catalog is empty; run with --seed N or seed_demo_data first.")
+
+        scenarios = scenario_urls(product.slug, category.slug)
+        only = {name.strip() for name in options["only"].split(",") if name.strip()}
+        if only:
+            scenarios = {name: value for name, value in scenarios.items() if name in only}
+
+        client = Client(HTTP_HOST=client_host())
+        results = {}
+        failures = []
+        errors = []
+        for name, (url, budget) in scenarios.items():
+            cache.clear()
+            response = None
+
+            def request():
+                nonlocal response
+                response = client.get(url)
+
+            queries_cold = count_queries(request)
+            status, size = response.status_code, len(response.content)
+            if status != 200:
+                # Время ответа с ошибкой — не время страницы: в отчёт идёт только статус.
+                results[name] = {"url": url, "status": status, "error": f"HTTP {status}"}
+                errors.append(f"{name}: HTTP {status}")
+                continue
+            queries_warm = count_queries(request)
+            samples = measure(lambda: client.get(url), options["runs"], warmup=0)
+
+            results[name] = {
+                "url": url,
+                "status": status,
+                "bytes": size,
+                "queries_cold": queries_cold,
+                "queries_warm": queries_warm,
+                "query_budget": budget,
+                **summarize(samples),
+            }
+            if queries_warm > budget:
+                failures.append(f"{name}: {queries_warm} queries, budget {budget}")
+
+        report = {
+            "generated_at": timezone.now().isoformat(),
+            "revision": _git_revision(),
+            "database": connection.vendor,
+            "cache": settings.CACHES["default"]["BACKEND"],
+            "catalog": {
+                "products": models.Product.objects.count(),
+                "categories": models.Category.objects.count(),
+                "product_images": models.ProductImage.objects.count(),
+                "languages": [code for code, _name in settings.LANGUAGES],
+            },
+            "scenarios": results,
+        }
+        write_report(report, options["output"], self.stdout)
+
+        if errors:
+            raise CommandError("Scenarios did not return 200:\n" + "\n".join(errors))
+        if options["check"] and failures:
+            raise CommandError("Benchmark budget exceeded:\n" + "\n".join(failures))
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.catalog_io import FORMATS, detect_format, export_records, write_records
+
+
+class Command(BaseCommand):
+    help = "Export all products to CSV or JSON Lines in the format catalog_import reads"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-", help="Output file (default: stdout)")
+        parser.add_argument("--format", choices=FORMATS, help="Output format (default: by file extension)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Products fetched per query")
+        parser.add_argument(
+            "--languages",
+            default=",".join(code for code, _name in settings.LANGUAGES),
+            help="Comma-separated languages to export translations for",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = detect_format(path, options["format"])
+        languages = [code.strip() for code in options["languages"].split(",") if code.strip()]
+        records = export_records(languages, chunk_size=options["batch_size"])
+
+        if path == "-":
+            write_records(self.stdout, records, fmt, languages)
+            return
+
+        started = time.perf_counter()
+        with open(path, "w", encoding="utf-8", newline="") as stream:
+            count = write_records(stream, records, fmt, languages)
+
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} products to {path}; {rate:.0f} rows/s"))
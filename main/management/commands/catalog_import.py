@@ -0,0 +1,76 @@
+import os
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.catalog_io import FORMATS, CatalogImporter, detect_format, read_records
+from main.images import image_pool
+
+
+class Command(BaseCommand):
+    help = (
+        "Import products from a CSV or JSON Lines file in batches. Products are matched by slug: "
+        "new ones are created with their translations and images, existing ones are updated"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin")
+        parser.add_argument("--format", choices=FORMATS, help="Input format (default: by file extension)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows per transaction")
+        parser.add_argument(
+            "--languages",
+            default=",".join(code for code, _name in settings.LANGUAGES),
+            help="Comma-separated languages to read translations for",
+        )
+        parser.add_argument(
+            "--image-root",
+            help="Directory with the source photos; image entries are paths relative to it. "
+            "Without it they must already be names in the media storage",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Worker processes for image processing (default: all cores; 1 = in-process)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = detect_format(path, options["format"])
+        languages = [code.strip() for code in options["languages"].split(",") if code.strip()]
+        image_root = options["image_root"]
+        if image_root is not None and not os.path.isdir(image_root):
+            raise CommandError(f"{image_root} is not a directory")
+
+        try:
+            stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        images = image_pool(options["workers"]) if image_root is not None else nullcontext()
+        with stream, images as pool:
+            importer = CatalogImporter(languages, image_root=image_root, pool=pool)
+            stats = importer.stats
+            records = read_records(stream, fmt, languages)
+            while batch := list(islice(records, options["batch_size"])):
+                importer.import_batch(batch)
+                self.stdout.write(f"{stats.rows} rows, {stats.rows_per_second:.1f} rows/s")
+
+        for line_number, message in stats.errors[:50]:
+            self.stderr.write(f"line {line_number}: {message}")
+        if len(stats.errors) > 50:
+            self.stderr.write(f"... and {len(stats.errors) - 50} more errors")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {stats.created}, updated {stats.updated}, images {stats.images}, "
+                f"skipped {len(stats.errors)} rows; {stats.rows_per_second:.1f} rows/s"
+            )
+        )
+        for line_number, message in stats.image_errors[:50]:
+            self.stderr.write(f"line {line_number}: image skipped, {message}")
+        if stats.images and image_root is None:
+            self.stdout.write("Run generate_image_variants to build responsive variants for new images.")
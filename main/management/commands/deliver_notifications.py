@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.notifications import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued Telegram notifications with retries and exponential backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process due notifications and exit")
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when the queue is empty",
+        )
+        parser.add_argument("--batch-size", type=int, default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"sent={sent} failed={failed}")
+            if options["once"]:
+                if not (sent or failed):
+                    break
+                continue
+            if not (sent or failed):
+                time.sleep(options["interval"])
@@ -0,0 +1,81 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from main import models
+from main.benchmarking import client_host
+from main.critical_css import FOLD_SECTIONS, critical_css
+from main.templatetags.critical_css import CRITICAL_DIR, STYLESHEET
+
+
+class Command(BaseCommand):
+    help = (
+        "Render every page template and write the CSS its first screen needs to "
+        "static/styles/critical/<page>.css, inlined by {% page_styles %}"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Re-seed the database with this many products first (DESTROYS existing content)",
+        )
+        parser.add_argument(
+            "--sections",
+            type=int,
+            default=FOLD_SECTIONS,
+            help="Top-level <section> elements counted as above the fold",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default=None,
+            help="Directory for <page>.css (default: styles/critical in the first STATICFILES_DIRS entry)",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            call_command("seed_demo_data", products=options["seed"], stdout=self.stdout)
+
+        product = models.Product.objects.filter(is_active=True).order_by("-created_at").first()
+        if product is None:
+            raise CommandError("The catalog is empty; run with --seed N or seed_demo_data first.")
+
+        stylesheet = finders.find(STYLESHEET)
+        if not stylesheet:
+            raise CommandError(f"{STYLESHEET} not found by the staticfiles finders.")
+        css = Path(stylesheet).read_text(encoding="utf-8")
+        base_url = settings.STATIC_URL + STYLESHEET.rsplit("/", 1)[0] + "/"
+
+        output_dir = Path(options["output_dir"] or Path(self._static_dir()) / CRITICAL_DIR)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Имя страницы совпадает с шаблоном, который вызывает {% page_styles "<имя>" %}.
+        pages = {
+            "index": reverse("main:index"),
+            "catalog": reverse("main:catalog"),
+            "product_detail": reverse("main:product_detail", args=[product.slug]),
+            "about": reverse("main:about"),
+            "contact": reverse("main:contact"),
+        }
+        client = Client(HTTP_HOST=client_host())
+        for page, url in pages.items():
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"{url}: HTTP {response.status_code}")
+            critical = critical_css(
+                css, response.content.decode("utf-8"), options["sections"], base_url=base_url
+            )
+            (output_dir / f"{page}.css").write_text(critical + "\n", encoding="utf-8")
+            self.stdout.write(f"{page}: {len(critical.encode())} of {len(css.encode())} bytes")
+
+    def _static_dir(self) -> str:
+        if not settings.STATICFILES_DIRS:
+            raise CommandError("STATICFILES_DIRS is empty; pass --output-dir.")
+        entry = settings.STATICFILES_DIRS[0]
+        return entry[1] if isinstance(entry, (list, tuple)) else entry
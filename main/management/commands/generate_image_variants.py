@@ -0,0 +1,56 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from main.images import image_pool, rebuild_variants, run_in_pool
+from main.signals import IMAGE_VARIANT_FIELDS
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = "Generate responsive image variants for existing product, carousel and header images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild variants even if they are up to date",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Worker processes for resizing and encoding (default: all cores; 1 = in-process)",
+        )
+
+    def handle(self, *args, **options):
+        with image_pool(options["workers"]) as pool:
+            for model, (field_name, variants_field) in IMAGE_VARIANT_FIELDS.items():
+                done = failed = 0
+                instances = (
+                    model.objects.exclude(**{field_name: ""}).only("pk", field_name, variants_field).iterator()
+                )
+                while batch := list(islice(instances, BATCH_SIZE)):
+                    jobs = {
+                        instance.pk: (getattr(instance, field_name).name, getattr(instance, variants_field))
+                        for instance in batch
+                        if options["force"]
+                        or (getattr(instance, variants_field) or {}).get("source")
+                        != getattr(instance, field_name).name
+                    }
+                    # Кодирование идёт в пуле, в базу результаты пишутся одной пачкой.
+                    by_pk = {instance.pk: instance for instance in batch}
+                    updated = []
+                    for pk, result in run_in_pool(pool, rebuild_variants, jobs):
+                        if isinstance(result, Exception):
+                            self.stderr.write(f"{model.__name__} #{pk}: {result}")
+                            failed += 1
+                            continue
+                        setattr(by_pk[pk], variants_field, result)
+                        updated.append(by_pk[pk])
+                    model.objects.bulk_update(updated, [variants_field])
+                    done += len(updated)
+                self.stdout.write(f"{model._meta.verbose_name_plural}: {done} rebuilt, {failed} failed")
+
+        self.stdout.write(self.style.SUCCESS("Image variants are up to date"))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.db import transaction
 from django.conf import settings
 from pathlib import Path
@@ -7,24 +8,113 @@ from io import BytesIO
 from PIL import Image
 import random
 
-from main import models
+from main import changes, models
+from main.images import image_pool, run_in_pool, store_image
 
 COLORS = ["red", "green", "blue", "orange", "purple", "gray"]
 
 
-def generate_image(color: str, size=(600, 400)):
+def encode_image(color: str, size=(600, 400)) -> bytes:
     image = Image.new("RGB", size, color=color)
     buf = BytesIO()
     image.save(buf, format="JPEG")
-    return ContentFile(buf.getvalue(), name=f"{color}.jpg")
+    return buf.getvalue()
+
+
+def demo_image(color: str, size: tuple, name: str, variants: bool) -> dict:
+    """Encode a plain ``color`` picture and store it as ``name``; runs in the image pool."""
+    if variants:
+        return store_image(encode_image(color, size), name)
+    return {"name": default_storage.save(name, ContentFile(encode_image(color, size))), "variants": {}}
 
 
 class Command(BaseCommand):
     help = "Seed demo data for development"
 
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=40, help="Number of products")
+        parser.add_argument("--categories", type=int, default=5, help="Number of categories")
+        parser.add_argument("--images", type=int, default=3, help="Images per product")
+        parser.add_argument(
+            "--languages",
+            default=",".join(code for code, _name in settings.LANGUAGES),
+            help="Comma-separated languages to fill translations for",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Worker processes for encoding images (default: all cores; 1 = in-process)",
+        )
+
+    def _translated(self, code, languages, **fields) -> dict:
+        return {name: f"{value} [{code}]" if code != languages[0] else value for name, value in fields.items()}
+
+    def _set_translations(self, obj, languages, **fields):
+        for code in languages:
+            obj.set_current_language(code)
+            for name, value in self._translated(code, languages, **fields).items():
+                setattr(obj, name, value)
+        obj.set_current_language(languages[0])
+
+    def _create_products(self, count, images, categories, languages, stored) -> None:
+        """Products, their images and translations in a few ``bulk_create`` calls, as in main.catalog_io."""
+        translation_model = models.Product._parler_meta.root_model
+        image_translation_model = models.ProductImage._parler_meta.root_model
+
+        products = models.Product.objects.bulk_create(
+            [
+                models.Product(
+                    slug=f"product-{i}",
+                    price=random.randint(10, 1000),
+                    category=random.choice(categories),
+                    is_main=i <= 8,
+                )
+                for i in range(1, count + 1)
+            ]
+        )
+        translations = translation_model.objects.bulk_create(
+            [
+                translation_model(
+                    master_id=product.pk,
+                    language_code=code,
+                    **self._translated(code, languages, name=f"Product {i}", description="Demo product"),
+                )
+                for i, product in enumerate(products, 1)
+                for code in languages
+            ]
+        )
+
+        product_images = []
+        for product in products:
+            for n in range(1, images + 1):
+                name, variants = stored["products", random.choice(COLORS)]
+                product_images.append(
+                    models.ProductImage(
+                        product_id=product.pk, image=name, image_variants=variants, ordering=n, is_primary=n == 1
+                    )
+                )
+        product_images = models.ProductImage.objects.bulk_create(product_images)
+        image_translation_model.objects.bulk_create(
+            [
+                image_translation_model(
+                    master_id=image.pk,
+                    language_code=code,
+                    **self._translated(code, languages, alt_text=f"Image {image.ordering}"),
+                )
+                for image in product_images
+                for code in languages
+            ]
+        )
+        # Переводы пишутся менеджером parler без уведомлений: сообщаем сами,
+        # чтобы обновились поисковый индекс и кеши.
+        changes.notify(translation_model, [translation.pk for translation in translations])
+        changes.notify(models.Product, [product.pk for product in products])
+
     @transaction.atomic
     def handle(self, *args, **options):
         Path(settings.MEDIA_ROOT).mkdir(parents=True, exist_ok=True)
+        languages = [code.strip() for code in options["languages"].split(",") if code.strip()]
 
         models.ProductImage.objects.all().delete()
         models.Product.objects.all().delete()
@@ -35,34 +125,43 @@ class Command(BaseCommand):
         models.Value.objects.all().delete()
         models.CompanyInfo.objects.all().delete()
         models.CarouselItem.objects.all().delete()
+        models.SectionHeader.objects.all().delete()
 
         categories = []
-        for i in range(1, 6):
-            cat = models.Category.objects.create(name=f"Category {i}")
+        for i in range(1, options["categories"] + 1):
+            cat = models.Category()
+            self._set_translations(cat, languages, name=f"Category {i}")
+            cat.save()
             categories.append(cat)
 
-        for i in range(1, 41):
-            cat = random.choice(categories)
-            product = models.Product.objects.create(
-                name=f"Product {i}",
-                description="Demo product",
-                price=random.randint(10, 1000),
-                category=cat,
-            )
-            for n in range(1, 4):
-                color = random.choice(COLORS)
-                img = generate_image(color)
-                models.ProductImage.objects.create(
-                    product=product,
-                    image=img,
-                    alt_text=f"Image {n}",
-                    ordering=n,
-                    is_primary=(n == 1),
-                )
+        # Все картинки (по одной на цвет для товаров, слайды, фото команды) кодируются
+        # заранее и параллельно; дальше записи только ссылаются на готовые файлы.
+        jobs = {("products", color): (color, (600, 400), f"products/{color}.jpg", True) for color in COLORS}
+        jobs.update(
+            {
+                ("carousel", i): (random.choice(COLORS), (600, 400), f"carousel/slide-{i}.jpg", True)
+                for i in range(1, 4)
+            }
+        )
+        jobs.update(
+            {
+                ("team", i): (random.choice(COLORS), (300, 300), f"about/team/member-{i}.jpg", False)
+                for i in range(1, 5)
+            }
+        )
+        with image_pool(options["workers"]) as pool:
+            stored = {}
+            for key, result in run_in_pool(pool, demo_image, jobs):
+                if isinstance(result, Exception):
+                    raise result
+                stored[key] = (result["name"], result["variants"])
+
+        self._create_products(options["products"], options["images"], categories, languages, stored)
 
         for i in range(1, 4):
-            img = generate_image(random.choice(COLORS))
-            models.CarouselItem.objects.create(title=f"Slide {i}", image=img, ordering=i)
+            slide = models.CarouselItem(title=f"Slide {i}", ordering=i)
+            slide.image, slide.image_variants = stored["carousel", i]
+            slide.save()
 
         for i in range(1, 4):
             models.Advantage.objects.create(title=f"Advantage {i}", description="Desc", ordering=i)
@@ -71,12 +170,17 @@ class Command(BaseCommand):
             models.Metric.objects.create(name=f"Metric {i}", value=str(i * 10), suffix="units", ordering=i)
 
         for i in range(1, 5):
-            img = generate_image(random.choice(COLORS), size=(300, 300))
-            models.TeamMember.objects.create(full_name=f"Member {i}", role="Role", photo=img, ordering=i)
+            photo, _variants = stored["team", i]
+            models.TeamMember.objects.create(full_name=f"Member {i}", role="Role", photo=photo, ordering=i)
 
         for i in range(1, 5):
             models.Value.objects.create(title=f"Value {i}", description="Desc", ordering=i)
 
         models.CompanyInfo.objects.create(mission_text="Our mission", about_text="About us")
 
+        for slug in ("catalog", "about", "contact"):
+            header = models.SectionHeader(slug=slug)
+            self._set_translations(header, languages, title=slug.capitalize(), description="Demo header")
+            header.save()
+
         self.stdout.write(self.style.SUCCESS("Demo data created"))
@@ -0,0 +1,51 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from main.translations import cache_translations
+
+
+def _translatable_models():
+    return {
+        model._meta.label_lower: model
+        for model in apps.get_app_config("main").get_models()
+        if getattr(model, "_parler_meta", None) is not None
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill parler's translation cache for every translatable model in bulk "
+        "(one query and one set_many per batch), e.g. after a deploy or a cache flush"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--models", default="", help="Comma-separated model labels, e.g. main.product (default: all)"
+        )
+        parser.add_argument("--languages", default="", help="Comma-separated languages (default: all)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Objects per query")
+
+    def handle(self, *args, **options):
+        models = _translatable_models()
+        selected = [label.strip().lower() for label in options["models"].split(",") if label.strip()]
+        unknown = sorted(set(selected) - set(models))
+        if unknown:
+            raise CommandError(f"Not translatable models: {', '.join(unknown)}.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+        languages = [code.strip() for code in options["languages"].split(",") if code.strip()] or None
+
+        if settings.CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+            self.stderr.write(
+                "The default cache is LocMemCache: only this process is warmed. "
+                "Use CACHE_BACKEND=file or redis to share translations between workers."
+            )
+
+        for label in selected or models:
+            model = models[label]
+            pks = list(model._base_manager.order_by("pk").values_list("pk", flat=True))
+            entries = 0
+            for start in range(0, len(pks), options["batch_size"]):
+                entries += cache_translations(model, pks[start : start + options["batch_size"]], languages)
+            self.stdout.write(f"{label}: {len(pks)} objects, {entries} cache entries")
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import os
+from wsgiref.headers import Headers
+
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError, StaticFile
+
+from .staticfiles import ENCODINGS
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoise that also offers the ``.zst`` variants written by ``collectstatic``.
+
+    The smallest variant the browser accepts is sent. Hashed names get
+    ``Cache-Control: max-age=<10 years>, public, immutable``, the rest
+    ``WHITENOISE_MAX_AGE``.
+    """
+
+    @staticmethod
+    def is_compressed_variant(path, stat_cache=None):
+        for suffix in ENCODINGS:
+            if path.endswith(suffix):
+                uncompressed_path = path[: -len(suffix)]
+                if stat_cache is None:
+                    return os.path.isfile(uncompressed_path)
+                return uncompressed_path in stat_cache
+        return False
+
+    def get_static_file(self, path, url, stat_cache=None):
+        # Как WhiteNoise.get_static_file, но варианты — все из ENCODINGS, а не только .gz/.br.
+        if stat_cache is None and not os.path.exists(path):
+            raise MissingFileError(path)
+        headers = Headers([])
+        self.add_mime_headers(headers, path, url)
+        self.add_cache_headers(headers, path, url)
+        if self.allow_all_origins:
+            headers["Access-Control-Allow-Origin"] = "*"
+        if self.add_headers_function is not None:
+            self.add_headers_function(headers, path, url)
+        return StaticFile(
+            path,
+            headers.items(),
+            stat_cache=stat_cache,
+            encodings={encoding: path + suffix for suffix, encoding in ENCODINGS.items()},
+        )
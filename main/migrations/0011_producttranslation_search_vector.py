@@ -0,0 +1,74 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:00
+
+import django.contrib.postgres.search
+from django.db import migrations
+from django.utils.html import strip_tags
+
+POSTGRES_BACKFILL = """
+UPDATE main_product_translation SET search_vector =
+    setweight(to_tsvector(cfg.name::regconfig, coalesce(name, '')), 'A')
+    || setweight(to_tsvector(cfg.name::regconfig,
+        regexp_replace(coalesce(description, ''), '<[^>]+>', ' ', 'g')), 'B')
+FROM (
+    SELECT t.id, CASE t.language_code
+        WHEN 'ru' THEN 'russian'
+        WHEN 'en' THEN 'english'
+        ELSE 'simple' END AS name
+    FROM main_product_translation t
+) AS cfg
+WHERE cfg.id = main_product_translation.id
+"""
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX main_product_translation_search_gin "
+            "ON main_product_translation USING gin (search_vector)"
+        )
+        schema_editor.execute(POSTGRES_BACKFILL)
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS main_product_fts USING fts5("
+            "master_id UNINDEXED, language_code UNINDEXED, name, description, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        # Как main.search.index_translations: разметка CKEditor в индекс не попадает.
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT id, master_id, language_code, name, description FROM main_product_translation"
+            )
+            rows = [
+                (pk, master_id, language_code, name or "", strip_tags(description or ""))
+                for pk, master_id, language_code, name, description in cursor.fetchall()
+            ]
+            cursor.executemany(
+                "INSERT INTO main_product_fts (rowid, master_id, language_code, name, description) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS main_product_translation_search_gin")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS main_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0010_alter_advantagetranslation_options_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="producttranslation",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0011_producttranslation_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="carouselitem",
+            name="image_variants",
+            field=models.JSONField(
+                blank=True, default=dict, editable=False, verbose_name="Варианты изображения"
+            ),
+        ),
+        migrations.AddField(
+            model_name="productimage",
+            name="image_variants",
+            field=models.JSONField(
+                blank=True, default=dict, editable=False, verbose_name="Варианты изображения"
+            ),
+        ),
+        migrations.AddField(
+            model_name="sectionheader",
+            name="photo_variants",
+            field=models.JSONField(
+                blank=True, default=dict, editable=False, verbose_name="Варианты фото"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0012_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TelegramNotification",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("text", models.TextField(verbose_name="Текст")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("pending", "В очереди"), ("sent", "Отправлено"), ("failed", "Ошибка")],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                ("attempts", models.PositiveIntegerField(default=0, verbose_name="Попытки")),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Следующая попытка"),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="Последняя ошибка")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Создано")),
+                ("sent_at", models.DateTimeField(blank=True, null=True, verbose_name="Отправлено")),
+            ],
+            options={
+                "verbose_name": "Уведомление Telegram",
+                "verbose_name_plural": "Уведомления Telegram",
+                "ordering": ["-created_at", "-id"],
+                "indexes": [models.Index(fields=["status", "next_attempt_at"], name="main_telegr_status_7fb97b_idx")],
+            },
+        ),
+    ]
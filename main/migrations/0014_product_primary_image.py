@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_primary_image(apps, schema_editor):
+    Product = apps.get_model("main", "Product")
+    ProductImage = apps.get_model("main", "ProductImage")
+    first_image = (
+        ProductImage.objects.filter(product_id=models.OuterRef("pk"))
+        .order_by("-is_primary", "ordering", "id")
+        .values("pk")[:1]
+    )
+    Product.objects.update(primary_image_id=models.Subquery(first_image))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0013_telegramnotification"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="primary_image",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="main.productimage",
+                verbose_name="Основное изображение",
+            ),
+        ),
+        migrations.RunPython(fill_primary_image, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_active_products_count(apps, schema_editor):
+    Category = apps.get_model("main", "Category")
+    Product = apps.get_model("main", "Product")
+    active = (
+        Product.objects.filter(category_id=models.OuterRef("pk"), is_active=True)
+        .order_by()
+        .values("category_id")
+        .annotate(count=models.Count("pk"))
+        .values("count")
+    )
+    Category.objects.update(
+        active_products_count=Coalesce(models.Subquery(active), 0, output_field=models.PositiveIntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0014_product_primary_image"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="active_products_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Активных товаров"),
+        ),
+        migrations.RunPython(fill_active_products_count, migrations.RunPython.noop),
+    ]
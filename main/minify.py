@@ -0,0 +1,199 @@
+"""Conservative CSS and JavaScript minifiers for ``collectstatic``.
+
+Only comments and redundant whitespace are removed. Strings, regular
+expressions and template literals are copied as they are, and JS keeps the
+line breaks between statements, so code relying on automatic semicolon
+insertion parses the same. ``/*! ... */`` (licence) comments are kept.
+"""
+
+from __future__ import annotations
+
+# Пробелы вокруг этих символов в CSS не нужны. ":" — только после него:
+# пробел перед ним в селекторе значим (".a :hover").
+_CSS_TIGHT = set("{};,>")
+
+# После этих символов и слов "/" в JS начинает регулярное выражение, а не деление.
+_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {
+    "return", "typeof", "instanceof", "case", "do", "else", "in", "of",
+    "new", "delete", "void", "throw", "yield", "await",
+}
+# Перевод строки после/перед этими символами не влияет на расстановку ";".
+_JS_NEWLINE_AFTER = set("{([,;")
+_JS_NEWLINE_BEFORE = set(")]},;")
+
+
+def _is_word(ch: str) -> bool:
+    return bool(ch) and (ch.isalnum() or ch in "_$\\" or ord(ch) > 127)
+
+
+def _string_end(source: str, start: int) -> int:
+    """Index just past the quoted string or template literal starting at ``start``."""
+    quote = source[start]
+    i, n = start + 1, len(source)
+    while i < n:
+        ch = source[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        if quote == "`" and source.startswith("${", i):
+            i = _expression_end(source, i + 2)
+            continue
+        if ch == "\n" and quote != "`":
+            # Незакрытая строка: дальше не разбираем, копируем как есть.
+            return i
+        i += 1
+    return n
+
+
+def _expression_end(source: str, start: int) -> int:
+    """Index just past the ``}`` closing a template literal's ``${`` expression."""
+    depth, i, n = 1, start, len(source)
+    while i < n:
+        ch = source[i]
+        if ch in "'\"`":
+            i = _string_end(source, i)
+            continue
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def _comment_end(source: str, start: int) -> int:
+    end = source.find("*/", start + 2)
+    return len(source) if end == -1 else end + 2
+
+
+def minify_css(source: str) -> str:
+    out: list[str] = []
+    last = ""
+    space = False
+    i, n = 0, len(source)
+    while i < n:
+        ch = source[i]
+        if source.startswith("/*", i):
+            end = _comment_end(source, i)
+            if source.startswith("/*!", i):
+                out.append(source[i:end])
+                last = "/"
+            else:
+                # ".a/**/.b" — то же, что ".a.b": комментарий не разделитель.
+                space = space or (end < n and source[end].isspace())
+            i = end
+            continue
+        if ch.isspace():
+            space = True
+            i += 1
+            continue
+
+        if space and out and last not in _CSS_TIGHT and last != ":" and ch not in _CSS_TIGHT:
+            out.append(" ")
+        space = False
+        if ch in "'\"":
+            end = _string_end(source, i)
+            out.append(source[i:end])
+            last, i = source[end - 1], end
+            continue
+        if ch == "\\":
+            # Экранированный символ (".sm\:flex", "\ ") копируется вместе с "\".
+            out.append(source[i : i + 2])
+            last, i = "\\", i + 2
+            continue
+        if ch == "}" and last == ";":
+            out.pop()
+        out.append(ch)
+        last = ch
+        i += 1
+    return "".join(out)
+
+
+def minify_js(source: str) -> str:
+    out: list[str] = []
+    last = ""
+    word = ""
+    gap = ""  # пропущенный пробел: "", " " или "\n"
+    i, n = 0, len(source)
+    while i < n:
+        ch = source[i]
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end == -1 else end
+            continue
+        if source.startswith("/*", i):
+            end = _comment_end(source, i)
+            if source.startswith("/*!", i):
+                out.append(source[i:end] + "\n")
+                last, word, gap = "\n", "", ""
+            elif "\n" in source[i:end]:
+                gap = "\n"
+            else:
+                gap = gap or " "
+            i = end
+            continue
+        if ch.isspace():
+            if ch in "\n\r\u2028\u2029":
+                gap = "\n"
+            else:
+                gap = gap or " "
+            i += 1
+            continue
+
+        if gap and out:
+            if gap == "\n" and last not in _JS_NEWLINE_AFTER and ch not in _JS_NEWLINE_BEFORE:
+                out.append("\n")
+            elif (
+                (_is_word(last) and _is_word(ch))
+                or (last in "+-" and ch == last)
+                or (last == "/" and ch in "/*")
+                or (last.isdigit() and ch == ".")
+            ):
+                out.append(" ")
+        gap = ""
+
+        if ch in "'\"`":
+            end = _string_end(source, i)
+            out.append(source[i:end])
+            last, word, i = source[end - 1], "", end
+            continue
+        if ch == "/" and (not out or last in _REGEX_AFTER or word in _REGEX_KEYWORDS):
+            end = _regex_end(source, i)
+            out.append(source[i:end])
+            # Флаги регулярного выражения — буквы: за ним нельзя вплотную ставить слово.
+            last, word, i = "a", "", end
+            continue
+
+        out.append(ch)
+        word = word + ch if _is_word(ch) and _is_word(last) else (ch if _is_word(ch) else "")
+        last = ch
+        i += 1
+    return "".join(out).strip()
+
+
+def _regex_end(source: str, start: int) -> int:
+    i, n = start + 1, len(source)
+    in_class = False
+    while i < n:
+        ch = source[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "\n":
+            return i
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            i += 1
+            while i < n and _is_word(source[i]):
+                i += 1
+            return i
+        i += 1
+    return n
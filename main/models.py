@@ -2,22 +2,72 @@ from __future__ import annotations
 
 import re
 
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from django.utils.text import slugify
+from django.db.models.functions import Coalesce
+from django.db.models.query import ModelIterable
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
+from parler.managers import TranslatableManager, TranslatableQuerySet
 from parler.models import TranslatableModel, TranslatedFields
 
 from ckeditor.fields import RichTextField
 
+from .changes import ChangeTrackingQuerySet
+from .slugs import UniqueSlugMixin
+from .translations import load_translations, translation_prefetches
+
+
+class TrackedQuerySet(ChangeTrackingQuerySet, TranslatableQuerySet):
+    _cached_translations = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._cached_translations = self._cached_translations
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super()._fetch_all()
+        if (
+            fetched
+            and self._cached_translations is not None
+            and issubclass(self._iterable_class, ModelIterable)
+        ):
+            load_translations(self._result_cache, *self._cached_translations)
+
+    def cached_translations(self, *related: str):
+        """Read translations of the results (and ``related`` FK objects) from parler's cache in bulk."""
+        clone = self._chain()
+        clone._cached_translations = related
+        return clone
+
+    def prefetch_translations(self, *fields: str):
+        """Prefetch translations in the active language and its fallbacks only.
+
+        ``fields`` names the translated fields a page reads, ``"category__name"``
+        for related models. The paths select the models whose translations are
+        loaded, not columns; see :mod:`main.translations`.
+        """
+        return self.prefetch_related(*translation_prefetches(self.model, fields))
+
+
+# Массовые update()/bulk_create()/bulk_update() тоже попадают в main.changes,
+# prefetch_translations() заменяет prefetch_related("translations").
+TrackedManager = TranslatableManager.from_queryset(TrackedQuerySet)
+
 
 # --- Главная: карусель ---
 class CarouselItem(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         title=models.CharField(_("Заголовок"), max_length=150, blank=True),
         subtitle=models.CharField(_("Подзаголовок"), max_length=250, blank=True),
     )
     image = models.ImageField(_("Изображение"), upload_to="carousel/")
+    image_variants = models.JSONField(_("Варианты изображения"), default=dict, blank=True, editable=False)
     link_url = models.URLField(_("Ссылка"), blank=True)
     is_active = models.BooleanField(_("Активен"), default=True, db_index=True)
     ordering = models.PositiveIntegerField(_("Порядок"), default=0, db_index=True)
@@ -34,6 +84,8 @@ class CarouselItem(TranslatableModel):
 
 
 class SectionHeader(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         title=models.CharField(_("Заголовок"), max_length=200),
         description=models.TextField(_("Описание"), blank=True),
@@ -45,6 +97,7 @@ class SectionHeader(TranslatableModel):
         null=True,
         help_text=_("Фон для блока, можно не добавлять"),
     )
+    photo_variants = models.JSONField(_("Варианты фото"), default=dict, blank=True, editable=False)
     slug = models.SlugField(
         _("Слаг"),
         unique=True,
@@ -61,38 +114,60 @@ class SectionHeader(TranslatableModel):
 
 
 # --- Каталог ---
-class Category(TranslatableModel):
+class Category(UniqueSlugMixin, TranslatableModel):
+    objects = TrackedManager()
+
+    slug_fallback = "category"
+
     translations = TranslatedFields(
         name=models.CharField(_("Название"), max_length=120),
         description=models.TextField(_("Описание"), blank=True),
     )
     slug = models.SlugField(_("Слаг"), unique=True, db_index=True, max_length=140)
+    # Поддерживается сигналами и массовыми действиями, см. refresh_active_products_counts.
+    active_products_count = models.PositiveIntegerField(
+        _("Активных товаров"), default=0, editable=False
+    )
 
     class Meta:
         verbose_name = _("Категория")
         verbose_name_plural = _("Категории")
         indexes = [models.Index(fields=["slug"])]
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            name_value = self.safe_translation_getter("name", any_language=True) or ""
-            base = slugify(name_value) or "category"
-            slug = base
-            n = 1
-            while Category.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{n}"
-                n += 1
-            self.slug = slug
-        return super().save(*args, **kwargs)
+    @classmethod
+    def refresh_active_products_counts(cls, pks=None) -> None:
+        """Recount ``active_products_count`` for categories ``pks`` (all if ``None``) in one ``UPDATE``."""
+        active = (
+            Product.objects.filter(category_id=models.OuterRef("pk"), is_active=True)
+            .order_by()
+            .values("category_id")
+            .annotate(count=models.Count("pk"))
+            .values("count")
+        )
+        # Через _base_manager: пересчёт счётчика — не изменение категории для main.changes.
+        queryset = cls._base_manager.all() if pks is None else cls._base_manager.filter(pk__in=pks)
+        queryset.update(
+            active_products_count=Coalesce(models.Subquery(active), 0, output_field=models.PositiveIntegerField())
+        )
 
     def __str__(self) -> str:
         return self.safe_translation_getter("name", any_language=True) or f"Category {self.pk}"
 
 
-class Product(TranslatableModel):
+# Порядок изображений в карточке: основное, затем по «Порядку».
+PRIMARY_FIRST = ("-is_primary", "ordering", "id")
+
+
+class Product(UniqueSlugMixin, TranslatableModel):
+    objects = TrackedManager()
+
+    slug_fallback = "product"
+
     translations = TranslatedFields(
         name=models.CharField(_("Название"), max_length=180),
         description=RichTextField(_("Описание"), blank=True),
+        # Заполняется из main.search при сохранении перевода.
+        search_vector=SearchVectorField(null=True, editable=False),
     )
     slug = models.SlugField(_("Слаг"), unique=True, db_index=True, max_length=200)
     price = models.DecimalField(_("Цена"), max_digits=10, decimal_places=2, default=0)
@@ -104,6 +179,16 @@ class Product(TranslatableModel):
         related_name="products",
         verbose_name=_("Категория"),
     )
+    # Денормализация: изображение для карточек в списках, обновляется из ProductImage.
+    primary_image = models.ForeignKey(
+        "ProductImage",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+        verbose_name=_("Основное изображение"),
+    )
     created_at = models.DateTimeField(_("Создано"), auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(_("Обновлено"), auto_now=True)
 
@@ -117,23 +202,28 @@ class Product(TranslatableModel):
             models.Index(fields=["created_at"]),
         ]
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            name_value = self.safe_translation_getter("name", any_language=True) or ""
-            base = slugify(name_value) or "product"
-            slug = base
-            n = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{n}"
-                n += 1
-            self.slug = slug
-        return super().save(*args, **kwargs)
+    @classmethod
+    def refresh_primary_image(cls, product_id) -> None:
+        """Point ``primary_image`` at the image listings show: the primary one, else the first."""
+        cls.refresh_primary_images(cls._base_manager.filter(pk=product_id))
+
+    @classmethod
+    def refresh_primary_images(cls, queryset) -> None:
+        """Same as :meth:`refresh_primary_image` for many products in one ``UPDATE``."""
+        first_image = (
+            ProductImage.objects.filter(product_id=models.OuterRef("pk"))
+            .order_by(*PRIMARY_FIRST)
+            .values("pk")[:1]
+        )
+        queryset.update(primary_image_id=models.Subquery(first_image))
 
     def __str__(self) -> str:
         return self.safe_translation_getter("name", any_language=True) or f"Product {self.pk}"
 
 
 class ProductImage(TranslatableModel):
+    objects = TrackedManager()
+
     product = models.ForeignKey(
         Product,
         on_delete=models.CASCADE,
@@ -144,6 +234,7 @@ class ProductImage(TranslatableModel):
         alt_text=models.CharField(_("Альтернативный текст"), max_length=150, blank=True),
     )
     image = models.ImageField(_("Изображение"), upload_to="products/")
+    image_variants = models.JSONField(_("Варианты изображения"), default=dict, blank=True, editable=False)
     ordering = models.PositiveIntegerField(_("Порядок"), default=0, db_index=True)
     is_primary = models.BooleanField(_("Основное"), default=False)
 
@@ -170,6 +261,8 @@ class ProductImage(TranslatableModel):
 
 # --- О нас ---
 class Advantage(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         title=models.CharField(_("Заголовок"), max_length=150),
         description=models.TextField(_("Описание")),
@@ -188,6 +281,8 @@ class Advantage(TranslatableModel):
 
 
 class Metric(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         name=models.CharField(_("Название"), max_length=120),
         value=models.CharField(_("Значение"), max_length=60),
@@ -206,6 +301,8 @@ class Metric(TranslatableModel):
 
 
 class TeamMember(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         full_name=models.CharField(_("ФИО"), max_length=150),
         role=models.CharField(_("Роль"), max_length=120),
@@ -226,6 +323,8 @@ class TeamMember(TranslatableModel):
 
 
 class Value(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         title=models.CharField(_("Заголовок"), max_length=150),
         description=models.TextField(_("Описание")),
@@ -244,6 +343,8 @@ class Value(TranslatableModel):
 
 
 class Video(TranslatableModel):
+    objects = TrackedManager()
+
     class Page(models.TextChoices):
         HOME = "home", _("Главная")
         ABOUT = "about", _("О нас")
@@ -290,6 +391,8 @@ class Video(TranslatableModel):
 
 
 class CompanyInfo(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         mission_text=models.TextField(_("Миссия"), blank=True),
         about_text=models.TextField(_("О компании"), blank=True),
@@ -315,6 +418,8 @@ class CompanyInfo(TranslatableModel):
 
 
 class SocialMap(models.Model):
+    objects = models.Manager.from_queryset(ChangeTrackingQuerySet)()
+
     instagram_url = models.URLField(_("Instagram"), blank=True)
     facebook_url = models.URLField(_("Facebook"), blank=True)
     youtube_url = models.URLField(_("YouTube"), blank=True)
@@ -339,6 +444,8 @@ class SocialMap(models.Model):
 
 
 class ContactAddress(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         title=models.CharField(_("Название"), max_length=150, blank=True),
         city=models.CharField(_("Город"), max_length=120, blank=True),
@@ -361,6 +468,8 @@ class ContactAddress(TranslatableModel):
 
 
 class ContactPhone(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         label=models.CharField(_("Подпись"), max_length=120, blank=True),
     )
@@ -379,6 +488,8 @@ class ContactPhone(TranslatableModel):
 
 
 class ContactEmail(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         label=models.CharField(_("Подпись"), max_length=120, blank=True),
     )
@@ -397,6 +508,8 @@ class ContactEmail(TranslatableModel):
 
 
 class ContactWorkingHours(TranslatableModel):
+    objects = TrackedManager()
+
     translations = TranslatedFields(
         weekdays=models.CharField(_("Будни"), max_length=200),
         saturday=models.CharField(_("Суббота"), max_length=200),
@@ -422,7 +535,11 @@ class ContactWorkingHours(TranslatableModel):
         return self.safe_translation_getter("weekdays", any_language=True) or f"Hours {self.pk}"
 
 
-class ContactTopic(TranslatableModel):
+class ContactTopic(UniqueSlugMixin, TranslatableModel):
+    objects = TrackedManager()
+
+    slug_fallback = "topic"
+
     translations = TranslatedFields(
         name=models.CharField(_("Название"), max_length=150),
     )
@@ -433,18 +550,6 @@ class ContactTopic(TranslatableModel):
         verbose_name_plural = _("Темы обращений")
         ordering = ["slug"]
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            name_value = self.safe_translation_getter("name", any_language=True) or ""
-            base = slugify(name_value) or "topic"
-            slug = base
-            index = 1
-            while ContactTopic.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{index}"
-                index += 1
-            self.slug = slug
-        return super().save(*args, **kwargs)
-
     def __str__(self) -> str:
         return self.safe_translation_getter("name", any_language=True) or f"Topic {self.pk}"
 
@@ -474,3 +579,31 @@ class ContactRequest(models.Model):
 
     def __str__(self) -> str:
         return f"{self.name} — {self.phone}"
+
+
+class TelegramNotification(models.Model):
+    """Outbox row: written together with the source record, delivered by ``deliver_notifications``."""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("В очереди")
+        SENT = "sent", _("Отправлено")
+        FAILED = "failed", _("Ошибка")
+
+    text = models.TextField(_("Текст"))
+    status = models.CharField(
+        _("Статус"), max_length=10, choices=Status.choices, default=Status.PENDING
+    )
+    attempts = models.PositiveIntegerField(_("Попытки"), default=0)
+    next_attempt_at = models.DateTimeField(_("Следующая попытка"), default=timezone.now)
+    last_error = models.TextField(_("Последняя ошибка"), blank=True)
+    created_at = models.DateTimeField(_("Создано"), auto_now_add=True)
+    sent_at = models.DateTimeField(_("Отправлено"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Уведомление Telegram")
+        verbose_name_plural = _("Уведомления Telegram")
+        ordering = ["-created_at", "-id"]
+        indexes = [models.Index(fields=["status", "next_attempt_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.get_status_display()} #{self.pk}"
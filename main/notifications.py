@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from utils.telegram import MAX_MESSAGE_LENGTH, TelegramError, post_message
+
+from .models import TelegramNotification
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_SEPARATOR = "\n\n"
+
+
+def enqueue_telegram_message(text: str) -> TelegramNotification:
+    """Store ``text`` in the outbox; call inside the transaction that creates the source record."""
+    return TelegramNotification.objects.create(text=text)
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    seconds = settings.TELEGRAM_OUTBOX_BACKOFF_BASE * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(seconds, settings.TELEGRAM_OUTBOX_BACKOFF_MAX))
+
+
+def _group_messages(notifications) -> list[list[TelegramNotification]]:
+    """Pack notifications into as few Telegram messages as the length limit allows."""
+    groups: list[list[TelegramNotification]] = []
+    length = 0
+    for notification in notifications:
+        size = len(notification.text)
+        if groups and length + len(MESSAGE_SEPARATOR) + size <= MAX_MESSAGE_LENGTH:
+            groups[-1].append(notification)
+            length += len(MESSAGE_SEPARATOR) + size
+        else:
+            groups.append([notification])
+            length = size
+    return groups
+
+
+def _claim(batch_size: int) -> list[TelegramNotification]:
+    """Lock due rows briefly and push their next attempt past the time sending them can take."""
+    with transaction.atomic():
+        due = list(
+            TelegramNotification.objects.select_for_update(skip_locked=True)
+            .filter(status=TelegramNotification.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        # Каждая строка уходит не больше двух раз (в группе и отдельно): пока идёт отправка,
+        # другой процесс её не возьмёт, а после падения этого процесса она снова станет доступна.
+        lease = timedelta(seconds=2 * len(due) * settings.TELEGRAM_TIMEOUT)
+        TelegramNotification.objects.filter(pk__in=[n.pk for n in due]).update(
+            next_attempt_at=timezone.now() + lease
+        )
+    return due
+
+
+def _send(group: list[TelegramNotification]):
+    """Send ``group`` as one message, its rows one by one if that fails; yields ``(rows, error)``."""
+    try:
+        post_message(MESSAGE_SEPARATOR.join(n.text for n in group))
+    except TelegramError as exc:
+        if len(group) == 1:
+            yield group, exc
+            return
+        logger.warning("Telegram delivery of %s merged notifications failed: %s", len(group), exc)
+    else:
+        yield group, None
+        return
+    # Одно неверное сообщение не должно задерживать остальные из той же группы.
+    for index, notification in enumerate(group):
+        try:
+            post_message(notification.text)
+        except TelegramError as exc:
+            if not exc.permanent:
+                # Telegram недоступен: остальные ждут следующей попытки без лишних запросов.
+                yield group[index:], exc
+                return
+            yield [notification], exc
+        else:
+            yield [notification], None
+
+
+def _record_failure(rows: list[TelegramNotification], exc: TelegramError) -> None:
+    logger.warning("Telegram delivery failed: %s", exc)
+    now = timezone.now()
+    for notification in rows:
+        notification.attempts += 1
+        notification.last_error = str(exc)
+        if exc.permanent or notification.attempts >= settings.TELEGRAM_OUTBOX_MAX_ATTEMPTS:
+            notification.status = TelegramNotification.Status.FAILED
+        else:
+            notification.next_attempt_at = now + backoff_delay(notification.attempts)
+        notification.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+
+
+def _record_success(rows: list[TelegramNotification]) -> None:
+    now = timezone.now()
+    for notification in rows:
+        notification.attempts += 1
+        notification.status = TelegramNotification.Status.SENT
+        notification.sent_at = now
+        notification.last_error = ""
+        notification.save(update_fields=["attempts", "status", "sent_at", "last_error"])
+
+
+def deliver_pending(batch_size: int | None = None) -> tuple[int, int]:
+    """Deliver one batch of due notifications. Returns ``(sent, failed)`` row counts.
+
+    Rows are claimed in a short transaction; Telegram is called after it commits,
+    so no row locks are held during the HTTP requests.
+    """
+    batch_size = batch_size or settings.TELEGRAM_OUTBOX_BATCH_SIZE
+    sent = failed = 0
+    for group in _group_messages(_claim(batch_size)):
+        for rows, error in _send(group):
+            if error is None:
+                _record_success(rows)
+                sent += len(rows)
+            else:
+                _record_failure(rows, error)
+                failed += len(rows)
+    return sent, failed
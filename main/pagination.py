@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import base64
+import datetime
+import json
+from dataclasses import dataclass
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+
+CATALOG_ORDERING = ("-created_at", "id")
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder обрезает время до миллисекунд: строки из одной миллисекунды
+        # при переходе на следующую страницу пропускались бы.
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, cls=_CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, model, ordering) -> list | None:
+    """Decode ``cursor`` into Python values for ``ordering``; ``None`` if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != len(ordering):
+        return None
+
+    decoded = []
+    for field_name, value in zip(ordering, values):
+        try:
+            field = model._meta.get_field(field_name.lstrip("-"))
+        except FieldDoesNotExist:
+            # Аннотации (например, search_rank) передаются как есть.
+            decoded.append(value)
+            continue
+        try:
+            decoded.append(field.to_python(value))
+        except Exception:
+            return None
+    return decoded
+
+
+def _after(ordering, values) -> Q:
+    """Build ``WHERE`` for rows strictly after ``values`` in ``ordering``."""
+    condition = Q()
+    equal = Q()
+    for field_name, value in zip(ordering, values):
+        name = field_name.lstrip("-")
+        lookup = "lt" if field_name.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return condition
+
+
+def paginate_keyset(queryset, cursor: str | None, per_page: int, ordering=CATALOG_ORDERING) -> KeysetPage:
+    """Return one page of ``queryset`` after ``cursor`` without COUNT or OFFSET."""
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, ordering)
+        if values is not None:
+            queryset = queryset.filter(_after(ordering, values))
+
+    items = list(queryset[: per_page + 1])
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, name.lstrip("-")) for name in ordering])
+    return KeysetPage(object_list=items, next_cursor=next_cursor)
+
+
+class ProductCursorPagination(CursorPagination):
+    page_size = 12
+    ordering = CATALOG_ORDERING
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        # Без явного ?ordering= результаты поиска идут по релевантности.
+        if ordering == self.ordering and "search_rank" in queryset.query.annotations:
+            return ("-search_rank",) + ordering
+        return ordering
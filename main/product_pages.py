@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.template.loader import render_to_string
+from django.utils import translation
+
+from .cache import (
+    DEFAULT_TIMEOUT,
+    aget_or_build,
+    ahas_version,
+    bump_version,
+    get_or_build,
+    has_version,
+    versioned_key,
+)
+from .models import PRIMARY_FIRST, Product, ProductImage
+
+# Своя версия у каждой карточки: f"product:{slug}".
+PRODUCT_NAMESPACE = "product"
+TEMPLATE = "partials/_product_detail.html"
+
+
+def product_namespace(slug: str) -> str:
+    return f"{PRODUCT_NAMESPACE}:{slug}"
+
+
+def _products():
+    return (
+        Product.objects.select_related("category")
+        .prefetch_translations("name", "description", "category__name")
+        .prefetch_related(
+            # Уже упорядоченный список: .order_by() поверх images.all() обошёл бы prefetch.
+            Prefetch(
+                "images",
+                queryset=ProductImage.objects.prefetch_translations().order_by(*PRIMARY_FIRST),
+                to_attr="ordered_images",
+            ),
+        )
+    )
+
+
+def _render(product: Product) -> dict:
+    # Кешируется только содержимое карточки: CSRF-токены и прочее
+    # зависящее от посетителя остаётся в base.html и рендерится каждый раз.
+    html = render_to_string(TEMPLATE, {"product": product, "images": product.ordered_images})
+    return {"html": html}
+
+
+def build_product_page(slug: str) -> dict:
+    """Rendered product card in the active language; ``{"html": None}`` if there is no such product."""
+    product = _products().filter(slug=slug, is_active=True).first()
+    if product is None:
+        return {"html": None}
+    return _render(product)
+
+
+def _active_product(slug: str):
+    return Product.objects.filter(slug=slug, is_active=True)
+
+
+def get_product_page(slug: str) -> dict:
+    namespace = product_namespace(slug)
+    # Версия заводится только для существующих товаров: иначе каждый случайный
+    # /product/<slug>/ оставлял бы в кеше бессрочный ключ версии.
+    if not has_version(namespace) and not _active_product(slug).exists():
+        return {"html": None}
+    return get_or_build(namespace, (translation.get_language(),), lambda: build_product_page(slug))
+
+
+async def aget_product_page(slug: str) -> dict:
+    namespace = product_namespace(slug)
+    if not await ahas_version(namespace) and not await _active_product(slug).aexists():
+        return {"html": None}
+    return await aget_or_build(
+        namespace,
+        (translation.get_language(),),
+        lambda: sync_to_async(build_product_page)(slug),
+    )
+
+
+def invalidate_product_pages(slugs) -> None:
+    for slug in set(slugs):
+        if slug:
+            bump_version(product_namespace(slug))
+
+
+def warm_product_pages(queryset) -> int:
+    """Render and store the pages of the active products in ``queryset`` for every language."""
+    count = 0
+    pks = list(queryset.filter(is_active=True).values_list("pk", flat=True))
+    for code, _name in settings.LANGUAGES:
+        # parler запоминает язык объекта при загрузке, поэтому для каждого языка — свой запрос.
+        with translation.override(code):
+            for product in _products().filter(pk__in=pks).iterator(chunk_size=200):
+                key = versioned_key(product_namespace(product.slug), code)
+                cache.set(key, _render(product), DEFAULT_TIMEOUT)
+                count += 1
+    return count
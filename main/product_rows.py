@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from django.db.models import F, FilteredRelation, Q
+from django.db.models.functions import Coalesce
+from parler import appsettings
+from rest_framework.exceptions import ValidationError
+
+# Поля списка товаров в API и колонки .values(), из которых они собираются.
+LIST_FIELDS = {
+    "id": ("id",),
+    "name": ("name",),
+    "slug": ("slug",),
+    "description": ("description",),
+    "price": ("price",),
+    "category": (
+        "category_id",
+        "category_name",
+        "category_slug",
+        "category_description",
+        "category_products_count",
+    ),
+    "primary_image": (
+        "primary_image_id",
+        "primary_image_name",
+        "primary_image_variants",
+        "primary_image_alt_text",
+        "primary_image_ordering",
+        "primary_image_is_primary",
+    ),
+    "created_at": ("created_at",),
+}
+
+# Переводимые колонки: имя в строке -> (путь к таблице переводов, поле перевода).
+TRANSLATED = {
+    "name": ("translations", "name"),
+    "description": ("translations", "description"),
+    "category_name": ("category__translations", "name"),
+    "category_description": ("category__translations", "description"),
+    "primary_image_alt_text": ("primary_image__translations", "alt_text"),
+}
+
+PLAIN = {
+    "category_slug": F("category__slug"),
+    "category_products_count": F("category__active_products_count"),
+    "primary_image_name": F("primary_image__image"),
+    "primary_image_variants": F("primary_image__image_variants"),
+    "primary_image_ordering": F("primary_image__ordering"),
+    "primary_image_is_primary": F("primary_image__is_primary"),
+}
+
+
+def parse_fields(value: str | None) -> tuple[str, ...]:
+    """``?fields=name,price`` -> requested list fields in output order; all of them if empty."""
+    requested = {name.strip() for name in (value or "").split(",") if name.strip()}
+    if not requested:
+        return tuple(LIST_FIELDS)
+    unknown = sorted(requested - set(LIST_FIELDS))
+    if unknown:
+        raise ValidationError({"fields": [f"Unknown fields: {', '.join(unknown)}."]})
+    return tuple(name for name in LIST_FIELDS if name in requested)
+
+
+def _translation_alias(path: str, language_code: str) -> str:
+    return f"_{path.replace('__', '_')}_{language_code.replace('-', '_')}"
+
+
+def product_rows(queryset, fields, language_code: str, extra=()):
+    """Turn a filtered, ordered product queryset into flat dicts for ``fields``.
+
+    Translations are joined for the active language and parler's fallbacks instead
+    of being prefetched, so a page is a single query whatever it contains.
+    ``extra`` names further columns to keep, e.g. the pagination ordering keys.
+    """
+    columns = [column for name in fields for column in LIST_FIELDS[name]]
+    columns += [column for column in extra if column not in columns]
+    languages = appsettings.PARLER_LANGUAGES.get_active_choices(language_code)
+
+    relations = {}
+    annotations = {}
+    for column in columns:
+        if column in TRANSLATED:
+            path, field = TRANSLATED[column]
+            aliases = []
+            for code in languages:
+                alias = _translation_alias(path, code)
+                relations.setdefault(
+                    alias,
+                    FilteredRelation(path, condition=Q(**{f"{path}__language_code": code})),
+                )
+                aliases.append(F(f"{alias}__{field}"))
+            annotations[column] = Coalesce(*aliases) if len(aliases) > 1 else aliases[0]
+        elif column in PLAIN:
+            annotations[column] = PLAIN[column]
+
+    # Свои аннотации (search_rank) уже есть в запросе, их достаточно назвать.
+    names = [column for column in columns if column not in annotations]
+    return queryset.alias(**relations).annotate(**annotations).values(*names, *annotations)
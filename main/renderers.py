@@ -0,0 +1,95 @@
+"""Faster JSON for the API: orjson or msgspec when installed, DRF's stdlib path otherwise.
+
+Enable in ``REST_FRAMEWORK``::
+
+    "DEFAULT_RENDERER_CLASSES": ["main.renderers.FastJSONRenderer", ...],
+    "DEFAULT_PARSER_CLASSES": ["main.renderers.FastJSONParser", ...],
+"""
+
+from __future__ import annotations
+
+import codecs
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, get_encoding
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Всё, что orjson/msgspec не умеют сами (ленивые строки, timedelta, QuerySet...),
+# кодируется так же, как в DRF.
+_default = JSONEncoder().default
+
+if orjson is not None:
+    BACKEND = "orjson"
+    # Даты отдаём через DRF: "Z" вместо "+00:00", как у стандартного рендерера.
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(data) -> bytes:
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+
+    loads = orjson.loads
+    DecodeError = orjson.JSONDecodeError
+elif msgspec is not None:  # pragma: no cover
+    BACKEND = "msgspec"
+
+    def _enc_hook(obj):
+        # msgspec не кодирует подклассы str (ErrorDetail, SafeString).
+        return str(obj) if isinstance(obj, str) else _default(obj)
+
+    _encoder = msgspec.json.Encoder(enc_hook=_enc_hook, decimal_format="number")
+    dumps = _encoder.encode
+    loads = msgspec.json.decode
+    DecodeError = msgspec.DecodeError
+else:  # pragma: no cover
+    BACKEND = None
+    dumps = loads = None
+    DecodeError = ValueError
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` with the same output, encoded by orjson/msgspec when available.
+
+    Pretty-printed (``; indent=``), ASCII-only and non-strict output still go
+    through the stdlib encoder, since the fast libraries do not support them.
+    Serializer output is byte-for-byte identical; with msgspec, raw ``Decimal`` and
+    ``timedelta`` values that bypass serializer fields are written msgspec's way.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if (
+            dumps is None
+            or self.ensure_ascii
+            or not self.compact
+            or not self.strict
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        # То же экранирование U+2028/U+2029, что и в JSONRenderer.
+        return dumps(data).replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` decoding UTF-8 bodies with orjson/msgspec when available."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = codecs.lookup(get_encoding(parser_context or {})).name
+        if loads is None or encoding != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return loads(stream.read())
+        except DecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Case, F, Func, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+from django.utils.html import strip_tags
+
+
+FTS_TABLE = "main_product_fts"
+RANK_SCALE = 1_000_000
+SEARCH_ORDERING = ("-search_rank", "-created_at", "id")
+
+# Конфигурации PostgreSQL для языков сайта; остальные индексируются как "simple".
+SEARCH_CONFIGS = {
+    "ru": "russian",
+    "en": "english",
+}
+
+
+def search_config(language_code: str | None) -> str:
+    return SEARCH_CONFIGS.get(language_code or "", "simple")
+
+
+def index_translations(translations) -> None:
+    """Refresh the search data of ProductTranslation rows ``translations``."""
+    translations = list(translations)
+    if not translations:
+        return
+    if connection.vendor == "postgresql":
+        model = type(translations[0])
+        by_language: dict[str, list[int]] = {}
+        for translation in translations:
+            by_language.setdefault(translation.language_code, []).append(translation.pk)
+        description = Func(
+            Coalesce(F("description"), Value("")),
+            Value("<[^>]+>"),
+            Value(" "),
+            Value("g"),
+            function="regexp_replace",
+        )
+        for language_code, pks in by_language.items():
+            config = search_config(language_code)
+            vector = SearchVector(Coalesce(F("name"), Value("")), weight="A", config=config) + SearchVector(
+                description, weight="B", config=config
+            )
+            model.objects.filter(pk__in=pks).update(search_vector=vector)
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {FTS_TABLE} "
+                "(rowid, master_id, language_code, name, description) VALUES (%s, %s, %s, %s, %s)",
+                [
+                    (
+                        translation.pk,
+                        translation.master_id,
+                        translation.language_code,
+                        translation.name or "",
+                        strip_tags(translation.description or ""),
+                    )
+                    for translation in translations
+                ],
+            )
+
+
+def unindex_translations(pks) -> None:
+    """Drop deleted ProductTranslation rows from the SQLite index; in PostgreSQL they go with the row."""
+    pks = list(pks)
+    if pks and connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in pks])
+
+
+def _fts5_query(text: str) -> str:
+    terms = [term.replace('"', "") for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
+def _like_pattern(text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_products(queryset, text: str, language_code: str | None):
+    """Filter ``queryset`` by full-text ``text`` in one language and order it by relevance.
+
+    Products whose slug contains ``text`` match too, ranked below text matches.
+    """
+    text = (text or "").strip()
+    if not text:
+        return queryset
+
+    if connection.vendor == "postgresql":
+        query = SearchQuery(text, config=search_config(language_code), search_type="websearch")
+        matches = queryset.model._parler_meta.root_model.objects.filter(search_vector=query)
+        if language_code:
+            matches = matches.filter(language_code=language_code)
+        # Отдельные запросы через UNION: OR со слагом в одном WHERE не даёт использовать GIN-индекс.
+        slugs = queryset.model._base_manager.filter(slug__icontains=text).values("pk")
+        # Ранг храним целым числом, чтобы его можно было точно передать в курсоре пагинации.
+        ranked = (
+            matches.filter(master_id=OuterRef("pk"))
+            .annotate(rank=Cast(SearchRank(F("search_vector"), query) * RANK_SCALE, IntegerField()))
+            .order_by("-rank")
+            .values("rank")[:1]
+        )
+        return (
+            queryset.filter(pk__in=matches.values("master_id").union(slugs))
+            .annotate(search_rank=Coalesce(Subquery(ranked), Value(0)))
+            .order_by(*SEARCH_ORDERING)
+        )
+
+    if connection.vendor == "sqlite":
+        fts_query = _fts5_query(text)
+        if not fts_query:
+            return queryset.none()
+        sql = (
+            f"SELECT master_id, bm25({FTS_TABLE}, 0, 0, 10.0, 1.0) AS score "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        )
+        params = [fts_query]
+        if language_code:
+            sql += " AND language_code = %s"
+            params.append(language_code)
+        # Совпадения по слагу тем же запросом, с нулевым рангом — ниже текстовых.
+        sql += (
+            f" UNION ALL SELECT id, 0 FROM {queryset.model._meta.db_table}"
+            " WHERE slug LIKE %s ESCAPE '\\'"
+        )
+        params.append(_like_pattern(text))
+        ranks: dict[int, float] = {}
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            # bm25 в SQLite отрицательный: чем меньше, тем релевантнее.
+            for master_id, score in cursor.fetchall():
+                score = int(-score * RANK_SCALE)
+                ranks[master_id] = max(score, ranks.get(master_id, score))
+        if not ranks:
+            return queryset.none()
+        rank = Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in ranks.items()],
+            output_field=IntegerField(),
+        )
+        return (
+            queryset.filter(pk__in=ranks.keys())
+            .annotate(search_rank=rank)
+            .order_by(*SEARCH_ORDERING)
+        )
+
+    lookup = (
+        Q(translations__name__icontains=text)
+        | Q(translations__description__icontains=text)
+        | Q(slug__icontains=text)
+    )
+    if language_code:
+        lookup &= Q(translations__language_code=language_code)
+    return queryset.filter(lookup).distinct()
@@ -0,0 +1,63 @@
+"""Build the independent parts of a page at the same time.
+
+Django's async ORM (``aget()``, ``async for``) runs each query through
+``sync_to_async(thread_sensitive=True)``, i.e. on the request's single sync
+thread and connection: awaiting several of them with ``asyncio.gather`` still
+sends the queries one after another. :func:`gather_sections` runs every section
+in a worker thread of its own instead, each with its own database connection,
+so their queries overlap and the page costs the slowest section rather than
+the sum of them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_SECTION_THREADS, thread_name_prefix="page-section"
+            )
+        return _executor
+
+
+def _run(build: Callable[[], Any]):
+    # Как обработчик запроса: соединение потока проверяется до и после работы,
+    # устаревшее (CONN_MAX_AGE) или сломанное закрывается, из пула — возвращается.
+    close_old_connections()
+    try:
+        return build()
+    finally:
+        close_old_connections()
+
+
+def _build_all(sections: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+    return {name: build() for name, build in sections.items()}
+
+
+async def gather_sections(sections: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+    """Call every builder of ``sections`` concurrently; returns ``{name: result}``.
+
+    Builders are plain sync functions that evaluate their querysets (``list()``,
+    ``.first()``); they see the request's active language. With
+    ``ASYNC_SECTION_THREADS = 0`` they run one after another on the request
+    thread, e.g. inside a test transaction that other connections cannot see.
+    """
+    if not settings.ASYNC_SECTION_THREADS:
+        return await sync_to_async(_build_all)(sections)
+    run = sync_to_async(_run, thread_sensitive=False, executor=_get_executor())
+    results = await asyncio.gather(*(run(build) for build in sections.values()))
+    return dict(zip(sections, results))
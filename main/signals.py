@@ -0,0 +1,148 @@
+from django.db.models.signals import post_save
+
+from . import changes
+from .cache import bump_version
+from .conditional import ABOUT_NAMESPACE, CATALOG_NAMESPACE
+from .context_processors import FOOTER_NAMESPACE, MENU_NAMESPACE
+from .images import schedule_variants
+from .models import (
+    Advantage,
+    CarouselItem,
+    Category,
+    CompanyInfo,
+    ContactAddress,
+    ContactEmail,
+    ContactPhone,
+    ContactTopic,
+    ContactWorkingHours,
+    Metric,
+    Product,
+    ProductImage,
+    SectionHeader,
+    SocialMap,
+    TeamMember,
+    Value,
+    Video,
+)
+from .product_pages import invalidate_product_pages
+from .search import index_translations, unindex_translations
+from .snapshots import HOMEPAGE_NAMESPACE, schedule_homepage_rebuild
+from .translations import forget_translations
+
+# Модель -> пространства имён кеша, которые нужно сбросить при её изменении.
+INVALIDATION_MAP = {
+    Category: (MENU_NAMESPACE, HOMEPAGE_NAMESPACE, CATALOG_NAMESPACE),
+    ContactAddress: (FOOTER_NAMESPACE,),
+    ContactPhone: (FOOTER_NAMESPACE,),
+    ContactEmail: (FOOTER_NAMESPACE,),
+    ContactWorkingHours: (FOOTER_NAMESPACE,),
+    SocialMap: (FOOTER_NAMESPACE,),
+    CarouselItem: (HOMEPAGE_NAMESPACE,),
+    Product: (HOMEPAGE_NAMESPACE, CATALOG_NAMESPACE),
+    ProductImage: (HOMEPAGE_NAMESPACE, CATALOG_NAMESPACE),
+    Metric: (HOMEPAGE_NAMESPACE, ABOUT_NAMESPACE),
+    Video: (HOMEPAGE_NAMESPACE,),
+    CompanyInfo: (HOMEPAGE_NAMESPACE, CATALOG_NAMESPACE, ABOUT_NAMESPACE),
+    SectionHeader: (CATALOG_NAMESPACE, ABOUT_NAMESPACE),
+    Advantage: (ABOUT_NAMESPACE,),
+    TeamMember: (ABOUT_NAMESPACE,),
+    Value: (ABOUT_NAMESPACE,),
+}
+
+# Модель -> (поле с файлом, JSON-поле с описанием его производных изображений).
+IMAGE_VARIANT_FIELDS = {
+    ProductImage: ("image", "image_variants"),
+    CarouselItem: ("image", "image_variants"),
+    SectionHeader: ("photo", "photo_variants"),
+}
+
+# Пространство имён -> что сделать после сброса (например, пересобрать снимок).
+REBUILDERS = {
+    HOMEPAGE_NAMESPACE: schedule_homepage_rebuild,
+}
+
+
+def invalidate(namespaces):
+    for namespace in namespaces:
+        bump_version(namespace)
+        rebuild = REBUILDERS.get(namespace)
+        if rebuild is not None:
+            rebuild()
+
+
+def _make_receiver(namespaces):
+    def receiver(change):
+        invalidate(namespaces)
+
+    return receiver
+
+
+# Модель -> поля, прежние значения которых нужны подписчикам ниже.
+TRACKED_FIELDS = {
+    Product: ("slug", "category_id"),
+    ProductImage: ("product_id",),
+}
+
+# Модель -> слаги товаров, чьи закешированные карточки устарели при её изменении.
+# Изменения переводов приходят как изменения самой записи.
+PRODUCT_PAGE_SLUGS = {
+    Product: lambda change: change.values("slug"),
+    ProductImage: lambda change: Product.objects.filter(pk__in=change.values("product_id")).values_list(
+        "slug", flat=True
+    ),
+    Category: lambda change: Product.objects.filter(category_id__in=change.pks).values_list(
+        "slug", flat=True
+    ),
+}
+
+
+def _invalidate_product_pages(change):
+    invalidate_product_pages(PRODUCT_PAGE_SLUGS[change.model](change))
+
+
+def _refresh_category_counts(change):
+    Category.refresh_active_products_counts(change.values("category_id"))
+
+
+def _index_product_translations(change):
+    translations = list(change.model.objects.filter(pk__in=change.pks))
+    index_translations(translations)
+    unindex_translations(change.pks - {translation.pk for translation in translations})
+
+
+def _forget_translations(change):
+    forget_translations(change.model, change.pks)
+
+
+def _refresh_image_variants(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_variants(instance, *IMAGE_VARIANT_FIELDS[sender])
+
+
+def _refresh_primary_images(change):
+    # Через изменения приходят и update()/bulk_create()/bulk_update() изображений, не только save().
+    Product.refresh_primary_images(Product._base_manager.filter(pk__in=change.values("product_id")))
+
+
+def connect():
+    # Варианты изображений кодируются после коммита и сообщают об изменении ещё раз, когда записаны.
+    for model in IMAGE_VARIANT_FIELDS:
+        post_save.connect(
+            _refresh_image_variants, sender=model, dispatch_uid=f"image-variants:{model._meta.label_lower}"
+        )
+
+    for model in [*INVALIDATION_MAP, ContactTopic]:
+        changes.watch(model, *TRACKED_FIELDS.get(model, ()))
+        # Кеш переводов parler: save()/delete() перевода parler обновляет сам,
+        # а массовые записи и удаление через QuerySet приходят только сюда.
+        if getattr(model, "_parler_meta", None) is not None:
+            changes.subscribe(model, _forget_translations)
+    for model, namespaces in INVALIDATION_MAP.items():
+        changes.subscribe(model, _make_receiver(namespaces))
+    for model in PRODUCT_PAGE_SLUGS:
+        changes.subscribe(model, _invalidate_product_pages)
+    # Производные данные в базе пересчитываются в той же транзакции.
+    changes.subscribe(Product, _refresh_category_counts, immediate=True)
+    # primary_image — тоже сразу: сброс кешей после коммита уже видит новое значение.
+    changes.subscribe(ProductImage, _refresh_primary_images, immediate=True)
+    changes.subscribe(Product._parler_meta.root_model, _index_product_translations, immediate=True)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import re
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Max, Q, Value, When
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+# Сколько раз пересчитывать слаг, если параллельная вставка заняла тот же.
+SAVE_ATTEMPTS = 5
+
+
+def next_free_slug(queryset, base: str, max_length: int) -> str:
+    """Return ``base`` or ``base-N`` with the smallest N above every taken one.
+
+    One query: the range ``base-`` <= slug < ``base.`` is served by the slug
+    index, the regex keeps only numeric suffixes and the database returns the
+    largest of them.
+    """
+    # Оставляем место под "-" и до десяти цифр суффикса, чтобы не выйти за max_length.
+    base = base[: max_length - 11].rstrip("-")
+    pattern = rf"^{re.escape(base)}-[0-9]+$"
+    suffix = Cast(Substr("slug", len(base) + 2), models.BigIntegerField())
+    taken = queryset.filter(
+        # "." следует за "-" в ASCII: диапазон покрывает ровно слаги, начинающиеся с "base-".
+        Q(slug=base) | Q(slug__gte=f"{base}-", slug__lt=f"{base}.", slug__regex=pattern)
+    ).aggregate(
+        last=Max(Case(When(slug=base, then=Value(0)), default=suffix, output_field=models.BigIntegerField()))
+    )["last"]
+    if taken is None:
+        return base
+    return f"{base}-{taken + 1}"
+
+
+class UniqueSlugMixin:
+    """Fill an empty ``slug`` from the translated ``name`` when saving.
+
+    The slug is picked by :func:`next_free_slug`; if a concurrent insert takes
+    it first, the unique index rejects the row and the slug is recomputed.
+    """
+
+    slug_fallback = "item"
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        name_value = self.safe_translation_getter("name", any_language=True) or ""
+        base = slugify(name_value) or self.slug_fallback
+        others = type(self)._default_manager.all()
+        if self.pk is not None:
+            others = others.exclude(pk=self.pk)
+        max_length = self._meta.get_field("slug").max_length
+
+        for attempt in range(SAVE_ATTEMPTS):
+            self.slug = next_free_slug(others, base, max_length)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == SAVE_ATTEMPTS - 1 or not others.filter(slug=self.slug).exists():
+                    self.slug = ""
+                    raise
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import translation
+
+from .cache import DEFAULT_TIMEOUT, aget_or_build, get_or_build, versioned_key
+from .models import CarouselItem, CompanyInfo, Metric, Product, Video
+from .sections import gather_sections
+
+logger = logging.getLogger(__name__)
+
+HOMEPAGE_NAMESPACE = "homepage"
+
+_executor: ThreadPoolExecutor | None = None
+_executor_pid: int | None = None
+_queue_lock = threading.Lock()
+_queued = False
+
+
+def _file_url(field) -> str:
+    return field.url if field else ""
+
+
+def _carousel() -> list[dict]:
+    carousel = (
+        CarouselItem.objects.filter(is_active=True)
+        .prefetch_translations()
+        .order_by("ordering")
+    )
+    return [
+        {
+            "title": item.title,
+            "subtitle": item.subtitle,
+            "image_url": _file_url(item.image),
+            "image_variants": item.image_variants,
+            "link_url": item.link_url,
+        }
+        for item in carousel
+    ]
+
+
+def _main_products() -> list[dict]:
+    main_products = (
+        Product.objects.filter(is_active=True, is_main=True)
+        .select_related("category", "primary_image")
+        .prefetch_translations("name", "category__name")
+        .order_by("-created_at")[:8]
+    )
+    products = []
+    for p in main_products:
+        image = p.primary_image
+        products.append(
+            {
+                "slug": p.slug,
+                "name": p.name,
+                "category_name": p.category.name,
+                "image_url": _file_url(image.image) if image else "",
+                "image_variants": image.image_variants if image else {},
+            }
+        )
+    return products
+
+
+def _metrics() -> list[dict]:
+    metrics = (
+        Metric.objects.filter(is_active=True)
+        .prefetch_translations()
+        .order_by("ordering")[:3]
+    )
+    return [{"name": m.name, "value": m.value, "suffix": m.suffix} for m in metrics]
+
+
+def _home_video() -> dict | None:
+    home_video = (
+        Video.objects.filter(page=Video.Page.HOME, is_active=True)
+        .prefetch_translations()
+        .order_by("order", "-created_at")
+        .first()
+    )
+    if home_video is None:
+        return None
+    return {
+        "title": home_video.title,
+        "file_url": _file_url(home_video.file),
+        "youtube_embed": home_video.youtube_embed,
+    }
+
+
+def _company() -> dict | None:
+    company = CompanyInfo.objects.prefetch_translations().first()
+    if company is None:
+        return None
+    return {
+        "about_text": company.about_text,
+        "mission_text": company.mission_text,
+        "contacts": company.contacts,
+    }
+
+
+# Секции снимка; друг от друга не зависят, асинхронная главная собирает их параллельно.
+HOMEPAGE_SECTIONS = {
+    "carousel": _carousel,
+    "main_products": _main_products,
+    "metrics": _metrics,
+    "home_video": _home_video,
+    "company": _company,
+}
+
+
+def build_homepage_snapshot() -> dict:
+    """Collect everything ``index.html`` needs for the active language into plain data."""
+    return {name: build() for name, build in HOMEPAGE_SECTIONS.items()}
+
+
+def get_homepage_snapshot() -> dict:
+    return get_or_build(
+        HOMEPAGE_NAMESPACE, (translation.get_language(),), build_homepage_snapshot
+    )
+
+
+async def aget_homepage_snapshot() -> dict:
+    """:func:`get_homepage_snapshot` for async views; a missing snapshot is built section by section in parallel."""
+    return await aget_or_build(
+        HOMEPAGE_NAMESPACE,
+        (translation.get_language(),),
+        lambda: gather_sections(HOMEPAGE_SECTIONS),
+    )
+
+
+def rebuild_homepage_snapshots() -> None:
+    """Rebuild the snapshot for every configured language under the current version."""
+    global _queued
+    with _queue_lock:
+        _queued = False
+    try:
+        for code, _name in settings.LANGUAGES:
+            with translation.override(code):
+                key = versioned_key(HOMEPAGE_NAMESPACE, code)
+                cache.set(key, build_homepage_snapshot(), DEFAULT_TIMEOUT)
+    except Exception:
+        logger.exception("Failed to rebuild homepage snapshot.")
+    finally:
+        close_old_connections()
+
+
+def _enqueue_rebuild() -> None:
+    global _executor, _executor_pid, _queued
+    with _queue_lock:
+        if _executor_pid != os.getpid():
+            # Поток пула не переживает fork воркера: каждому процессу — свой пул и своя очередь.
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="homepage-snapshot")
+            _executor_pid = os.getpid()
+            _queued = False
+        if _queued:
+            return
+        _queued = True
+        executor = _executor
+    executor.submit(rebuild_homepage_snapshots)
+
+
+def schedule_homepage_rebuild() -> None:
+    """Rebuild snapshots in the background once the current transaction commits.
+
+    Changes made while a rebuild is still queued are coalesced into it.
+    """
+    if settings.HOMEPAGE_SNAPSHOT_BACKGROUND:
+        transaction.on_commit(_enqueue_rebuild)
@@ -0,0 +1,155 @@
+"""``collectstatic`` pipeline: minify own CSS/JS, hash, precompress with gzip, Brotli and zstd.
+
+Enable in ``STORAGES["staticfiles"]`` together with
+``main.middleware.StaticFilesMiddleware``, which also serves the ``.zst``
+variants. Brotli needs the ``brotli`` package and zstd ``zstandard`` (or
+Python 3.14+); without them only gzip is written. Bytes saved per asset are
+written to ``STATIC_ROOT/REPORT_NAME``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:  # pragma: no cover
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+from django.conf import settings
+from whitenoise.compress import Compressor as WhiteNoiseCompressor
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .minify import minify_css, minify_js
+
+REPORT_NAME = "assets-report.json"
+ZSTD_LEVEL = 19
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+# Расширение -> Content-Encoding заранее сжатых вариантов файла.
+ENCODINGS = {".br": "br", ".zst": "zstd", ".gz": "gzip"}
+
+
+def compress_zstd(data: bytes) -> bytes | None:
+    if zstd is not None:  # pragma: no cover
+        return zstd.compress(data, level=ZSTD_LEVEL)
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return None
+
+
+class Compressor(WhiteNoiseCompressor):
+    """WhiteNoise's gzip/Brotli compressor plus a ``.zst`` variant."""
+
+    def compress(self, path):
+        filenames = super().compress(path)
+        with open(path, "rb") as f:
+            stat_result = os.fstat(f.fileno())
+            data = f.read()
+        compressed = compress_zstd(data)
+        if compressed is not None and self.is_compressed_effectively("Zstandard", path, len(data), compressed):
+            filenames.append(self.write_data(path, compressed, ".zst", stat_result))
+        return filenames
+
+
+class OptimizedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """Manifest storage that minifies the project's CSS/JS before hashing.
+
+    Files of third-party apps (admin, jazzmin, ckeditor) are only hashed and
+    compressed: they ship minified builds of their own.
+    """
+
+    def _minify_roots(self) -> set[str]:
+        roots = set()
+        for entry in settings.STATICFILES_DIRS:
+            root = entry[1] if isinstance(entry, (list, tuple)) else entry
+            roots.add(os.path.abspath(root))
+        return roots
+
+    def _should_minify(self, name: str, storage) -> bool:
+        suffix = Path(name).suffix.lower()
+        return (
+            settings.STATIC_MINIFY
+            and suffix in MINIFIERS
+            and ".min." not in name
+            and os.path.abspath(getattr(storage, "location", "")) in self._minify_roots()
+        )
+
+    def _minify(self, paths: dict) -> dict[str, int]:
+        """Minify collected copies in place; returns the original size of every minified file."""
+        original_sizes = {}
+        for name, (storage, path) in list(paths.items()):
+            if not self._should_minify(name, storage):
+                continue
+            with storage.open(path) as source_file:
+                source = source_file.read()
+            minified = MINIFIERS[Path(name).suffix.lower()](source.decode("utf-8")).encode("utf-8")
+            target = self.path(name)
+            if os.path.islink(target):
+                # collectstatic --link: не писать через ссылку в исходник.
+                os.unlink(target)
+            with open(target, "wb") as target_file:
+                target_file.write(minified)
+            original_sizes[name] = len(source)
+            # Хеш и сжатые варианты строятся уже из уменьшенной копии.
+            paths[name] = (self, name)
+        return original_sizes
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+        paths = dict(paths)
+        original_sizes = self._minify(paths)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        self._write_report(paths, original_sizes)
+
+    def create_compressor(self, **kwargs):
+        return Compressor(**kwargs)
+
+    def _write_report(self, paths: dict, original_sizes: dict[str, int]) -> None:
+        assets = {}
+        for name, (storage, path) in sorted(paths.items()):
+            hashed_name = self.hashed_files.get(self.hash_key(self.clean_name(name)))
+            if not hashed_name or not self.compressor.should_compress(name):
+                continue
+            hashed_path = self.path(hashed_name)
+            entry = {
+                "hashed_name": hashed_name,
+                "original": original_sizes.get(name) or storage.size(path),
+                "minified": os.path.getsize(hashed_path),
+            }
+            for suffix, encoding in ENCODINGS.items():
+                if os.path.exists(hashed_path + suffix):
+                    entry[encoding] = os.path.getsize(hashed_path + suffix)
+            smallest = min(value for key, value in entry.items() if key not in ("hashed_name", "original"))
+            entry["saved"] = entry["original"] - smallest
+            entry["saved_pct"] = round(entry["saved"] / entry["original"] * 100, 1) if entry["original"] else 0.0
+            assets[name] = entry
+
+        original = sum(entry["original"] for entry in assets.values())
+        saved = sum(entry["saved"] for entry in assets.values())
+        report = {
+            "assets": assets,
+            "total": {
+                "original": original,
+                "saved": saved,
+                "saved_pct": round(saved / original * 100, 1) if original else 0.0,
+            },
+        }
+        Path(self.path(REPORT_NAME)).write_text(
+            json.dumps(report, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+        )
+
+    def stored_name(self, name):
+        # Без collectstatic манифеста нет. Исходное имя — только если строгость отключена
+        # (WHITENOISE_MANIFEST_STRICT=0, тесты); иначе ошибка, как у ManifestStaticFilesStorage.
+        if not self.manifest_strict and not self.hashed_files and not self.exists(self.manifest_name):
+            return name
+        return super().stored_name(name)
@@ -0,0 +1,61 @@
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+STYLESHEET = "styles/main.css"
+# Вывод manage.py extract_critical_css, путь внутри статики.
+CRITICAL_DIR = "styles/critical"
+
+
+def _read(name: str) -> str:
+    # После collectstatic — уменьшенная копия из STATIC_ROOT, иначе исходник из static/.
+    try:
+        with staticfiles_storage.open(name) as css_file:
+            return css_file.read().decode("utf-8").strip()
+    except (OSError, ValueError):
+        pass
+    path = finders.find(name)
+    if not path:
+        return ""
+    with open(path, encoding="utf-8") as css_file:
+        return css_file.read().strip()
+
+
+_read_cached = lru_cache(maxsize=None)(_read)
+
+
+def critical_styles(page: str) -> str:
+    if not page:
+        return ""
+    name = f"{CRITICAL_DIR}/{page}.css"
+    # При DEBUG файл перечитывается: extract_critical_css можно запускать без перезапуска сервера.
+    return _read(name) if settings.DEBUG else _read_cached(name)
+
+
+@register.simple_tag
+def page_styles(page=""):
+    """Inline the critical CSS of ``page`` and load ``main.css`` without blocking rendering.
+
+    Without a critical CSS file for the page ``main.css`` is linked as usual.
+    """
+    href = static(STYLESHEET)
+    css = critical_styles(page)
+    if not css:
+        return format_html('<link rel="stylesheet" href="{}">', href)
+    return format_html(
+        "<style>{}</style>\n"
+        '    <link rel="preload" href="{}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        '    <noscript><link rel="stylesheet" href="{}"></noscript>',
+        # "</style" внутри CSS закрыл бы тег раньше времени.
+        mark_safe(css.replace("</", "<\\/")),
+        href,
+        href,
+    )
@@ -0,0 +1,56 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from main.images import MIME_TYPES
+
+register = template.Library()
+
+
+def _entries(variants, fmt):
+    return (variants or {}).get("formats", {}).get(fmt) or []
+
+
+@register.filter
+def srcset(variants, fmt="webp"):
+    """``srcset`` value for one format of a ``*_variants`` description."""
+    return ", ".join(f"{default_storage.url(name)} {width}w" for width, name in _entries(variants, fmt))
+
+
+@register.simple_tag
+def picture(src, variants, alt="", sizes="100vw", css_class="", loading="lazy"):
+    """Render ``<picture>`` with AVIF/WebP sources and a JPEG ``srcset`` fallback."""
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (MIME_TYPES[fmt], srcset(variants, fmt), sizes)
+            for fmt in ("avif", "webp")
+            if _entries(variants, fmt)
+        ),
+    )
+    jpeg_srcset = srcset(variants, "jpeg")
+    width = (variants or {}).get("width")
+    height = (variants or {}).get("height")
+    return format_html(
+        '<picture>{}<img src="{}"{} alt="{}"{}{}{}></picture>',
+        sources,
+        src,
+        format_html(' srcset="{}" sizes="{}"', jpeg_srcset, sizes) if jpeg_srcset else "",
+        alt,
+        format_html(' class="{}"', css_class) if css_class else "",
+        format_html(' width="{}" height="{}"', width, height) if width and height else "",
+        format_html(' loading="{}"', loading) if loading else "",
+    )
+
+
+@register.simple_tag
+def image_set(src, variants, max_width=1600):
+    """CSS ``image-set()`` for background images, picking the largest variant up to ``max_width``."""
+    candidates = []
+    for fmt in ("avif", "webp"):
+        fitting = [entry for entry in _entries(variants, fmt) if entry[0] <= max_width]
+        if fitting:
+            candidates.append(f'url("{default_storage.url(fitting[-1][1])}") type("{MIME_TYPES[fmt]}")')
+    candidates.append(f'url("{src}")')
+    return ", ".join(candidates)
@@ -1,3 +1,1379 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import json
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import parse_qs
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.template import Context, Template
+from django.templatetags.static import static
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+from django.utils.translation import get_language, gettext_lazy
+from parler.cache import get_translation_cache_key
+from PIL import Image
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from . import changes, notifications, slugs, snapshots
+from .admin import retry_notifications
+from .benchmarking import count_queries, page_views, scenario_urls
+from .cache import LOCK_POLL_INTERVAL, bump_version, get_or_build, has_version, versioned_key
+from .catalog_io import CatalogImporter, export_records, read_records, write_records
+from .critical_css import critical_css
+from .images import available_formats, variant_name
+from .minify import minify_css, minify_js
+from .context_processors import categories, global_contacts
+from .models import (
+    Category,
+    ContactPhone,
+    ContactRequest,
+    Product,
+    ProductImage,
+    SocialMap,
+    TelegramNotification,
+)
+from .notifications import deliver_pending, enqueue_telegram_message
+from .pagination import paginate_keyset
+from .product_pages import (
+    _products,
+    build_product_page,
+    invalidate_product_pages,
+    product_namespace,
+    warm_product_pages,
+)
+from .product_rows import parse_fields, product_rows
+from .renderers import FastJSONParser, FastJSONRenderer
+from .sections import gather_sections
+from .snapshots import (
+    HOMEPAGE_SECTIONS,
+    get_homepage_snapshot,
+    rebuild_homepage_snapshots,
+    schedule_homepage_rebuild,
+)
+from .staticfiles import REPORT_NAME, OptimizedStaticFilesStorage, compress_zstd
+from .templatetags.critical_css import CRITICAL_DIR
+from .translations import cache_translations
+from .views import ProductListSerializer, ProductRowSerializer
+
+# collectstatic в тестах не запускается: страницы ссылаются на исходные имена статики.
+# Замена STORAGES пересоздаёт staticfiles_storage, а он читает WHITENOISE_MANIFEST_STRICT при создании.
+SOURCE_STATIC = {"WHITENOISE_MANIFEST_STRICT": False, "STORAGES": settings.STORAGES}
+
+
+class TelegramStandIn:
+    """Local HTTP server answering like ``api.telegram.org/bot<token>/sendMessage``."""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+        # Сообщения с этим текстом отклоняются, как Telegram отклоняет неверную разметку.
+        self.rejected = None
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = parse_qs(self.rfile.read(length).decode())
+                stand_in.requests.append({"path": self.path, "data": body})
+                status = stand_in.status
+                if stand_in.rejected and stand_in.rejected in body["text"][0]:
+                    status = 400
+                payload = json.dumps({"ok": status == 200}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@override_settings(**SOURCE_STATIC)
+class TelegramOutboxTests(TestCase):
+    def setUp(self):
+        self.telegram = TelegramStandIn()
+        self.telegram.start()
+        self.addCleanup(self.telegram.stop)
+        override = override_settings(
+            TELEGRAM_API_URL=self.telegram.url,
+            TELEGRAM_TIMEOUT=2,
+            TELEGRAM_OUTBOX_MAX_ATTEMPTS=3,
+            TELEGRAM_OUTBOX_BACKOFF_BASE=30,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_contact_form_queues_notification_without_calling_telegram(self):
+        response = self.client.post(
+            reverse("main:contact"),
+            {"name": "Иван", "phone": "+7 700 000 00 00", "message": "Нужен диван", "consent": "on"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ContactRequest.objects.count(), 1)
+        notification = TelegramNotification.objects.get()
+        self.assertEqual(notification.status, TelegramNotification.Status.PENDING)
+        self.assertIn("Иван", notification.text)
+        self.assertEqual(self.telegram.requests, [])
+
+    def test_deliver_pending_batches_due_notifications(self):
+        enqueue_telegram_message("first")
+        enqueue_telegram_message("second")
+
+        sent, failed = deliver_pending()
+
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertEqual(len(self.telegram.requests), 1)
+        request = self.telegram.requests[0]
+        self.assertTrue(request["path"].endswith("/sendMessage"))
+        self.assertEqual(request["data"]["text"], ["first\n\nsecond"])
+        self.assertFalse(
+            TelegramNotification.objects.exclude(status=TelegramNotification.Status.SENT).exists()
+        )
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.telegram.status = 502
+        notification = enqueue_telegram_message("hello")
+
+        self.assertEqual(deliver_pending(), (0, 1))
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        self.assertGreater(notification.next_attempt_at, timezone.now() + timedelta(seconds=20))
+        self.assertTrue(notification.last_error)
+
+        # Пока не наступило время следующей попытки, повторных запросов нет.
+        self.assertEqual(deliver_pending(), (0, 0))
+        self.assertEqual(len(self.telegram.requests), 1)
+
+        self.telegram.status = 200
+        TelegramNotification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_pending(), (1, 0))
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.SENT)
+        self.assertEqual(notification.attempts, 2)
+
+    def test_notification_fails_after_max_attempts(self):
+        self.telegram.status = 500
+        notification = enqueue_telegram_message("hello")
+
+        for _attempt in range(3):
+            TelegramNotification.objects.update(next_attempt_at=timezone.now())
+            deliver_pending()
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.FAILED)
+        self.assertEqual(notification.attempts, 3)
+
+        # Повтор из админки даёт сообщению полный набор попыток заново; отправленные не трогает.
+        delivered = TelegramNotification.objects.create(text="sent", status=TelegramNotification.Status.SENT)
+        retry_notifications(None, None, TelegramNotification.objects.all())
+        deliver_pending()
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, TelegramNotification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+        delivered.refresh_from_db()
+        self.assertEqual(delivered.status, TelegramNotification.Status.SENT)
+        self.assertEqual(len(self.telegram.requests), 4)
+
+    def test_rejected_message_fails_at_once_without_holding_back_its_group(self):
+        self.telegram.rejected = "<broken"
+        first, broken, second = (enqueue_telegram_message(text) for text in ("first", "<broken", "second"))
+
+        self.assertEqual(deliver_pending(), (2, 1))
+        self.assertEqual(
+            [request["data"]["text"][0] for request in self.telegram.requests],
+            ["first\n\n<broken\n\nsecond", "first", "<broken", "second"],
+        )
+        for notification in (first, broken, second):
+            notification.refresh_from_db()
+        self.assertEqual([first.status, second.status], [TelegramNotification.Status.SENT] * 2)
+        self.assertEqual(broken.status, TelegramNotification.Status.FAILED)
+        self.assertEqual(broken.attempts, 1)
+
+    def test_unavailable_telegram_is_not_retried_row_by_row(self):
+        self.telegram.status = 503
+        enqueue_telegram_message("first")
+        enqueue_telegram_message("second")
+
+        self.assertEqual(deliver_pending(), (0, 2))
+        self.assertEqual(len(self.telegram.requests), 2)
+        self.assertFalse(
+            TelegramNotification.objects.exclude(status=TelegramNotification.Status.PENDING).exists()
+        )
+
+    def test_telegram_is_called_after_the_claim_commits(self):
+        enqueue_telegram_message("hello")
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        def post_message(text):
+            depths.append(len(connection.atomic_blocks))
+
+        with mock.patch.object(notifications, "post_message", post_message):
+            self.assertEqual(deliver_pending(), (1, 0))
+        self.assertEqual(depths, [depth])
+
+
+@override_settings(CACHE_FILL_WAIT=5)
+class VersionedCacheTests(SimpleTestCase):
+    namespace = "tests"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_concurrent_miss_is_built_once(self):
+        started, release = threading.Event(), threading.Event()
+        builds = []
+
+        def slow_builder():
+            builds.append("slow")
+            started.set()
+            release.wait(5)
+            return "value"
+
+        results = []
+        first = threading.Thread(
+            target=lambda: results.append(get_or_build(self.namespace, ("x",), slow_builder))
+        )
+        first.start()
+        started.wait(5)
+        # Пока первый поток держит блокировку, второй ждёт его результат, а не строит сам.
+        second = threading.Thread(
+            target=lambda: results.append(get_or_build(self.namespace, ("x",), lambda: builds.append("fast")))
+        )
+        second.start()
+        time.sleep(LOCK_POLL_INTERVAL * 3)
+        release.set()
+        first.join(5)
+        second.join(5)
+
+        self.assertEqual(builds, ["slow"])
+        self.assertEqual(results, ["value", "value"])
+
+    @override_settings(CACHE_FILL_WAIT=0.2)
+    def test_waiter_builds_itself_when_the_fill_never_comes(self):
+        # Блокировку держит воркер, который так и не положил значение в кеш.
+        cache.add(f"{versioned_key(self.namespace, 'x')}:lock", 1)
+        started = time.monotonic()
+        self.assertEqual(get_or_build(self.namespace, ("x",), lambda: "built"), "built")
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_bump_makes_old_values_unreachable(self):
+        old_key = versioned_key(self.namespace, "x")
+        self.assertEqual(get_or_build(self.namespace, ("x",), lambda: "old"), "old")
+
+        bump_version(self.namespace)
+        self.assertNotEqual(versioned_key(self.namespace, "x"), old_key)
+        self.assertEqual(get_or_build(self.namespace, ("x",), lambda: "new"), "new")
+        self.assertEqual(get_or_build(self.namespace, ("x",), lambda: "again"), "new")
+
+
+@override_settings(HOMEPAGE_SNAPSHOT_BACKGROUND=False, IMAGE_VARIANTS_BACKGROUND=False, **SOURCE_STATIC)
+class SeededCatalogTestCase(TestCase):
+    products = 30
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.media = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.media.cleanup)
+        with override_settings(MEDIA_ROOT=cls.media.name):
+            # Рабочие процессы не видят override_settings, поэтому кодируем в этом процессе.
+            call_command("seed_demo_data", products=cls.products, images=2, workers=1, stdout=StringIO())
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+
+class QueryBudgetTests(SeededCatalogTestCase):
+
+    def test_views_stay_within_query_budget(self):
+        product = Product.objects.order_by("-created_at").first()
+        category = Category.objects.order_by("pk").first()
+
+        for name, (url, budget) in scenario_urls(product.slug, category.slug).items():
+            with self.subTest(name, url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
+                queries = count_queries(lambda: self.client.get(url))
+                self.assertLessEqual(queries, budget)
+
+    def test_benchmark_command_reports_pages_and_rejects_errors(self):
+        output = tempfile.NamedTemporaryFile(suffix=".json")
+        self.addCleanup(output.close)
+        with override_settings(ALLOWED_HOSTS=["shop.example"]):
+            call_command("benchmark_views", runs=1, output=output.name, check=True, stdout=StringIO())
+        scenarios = json.loads(Path(output.name).read_text())["scenarios"]
+        self.assertEqual({result["status"] for result in scenarios.values()}, {200})
+        self.assertTrue(all("p50_ms" in result for result in scenarios.values()))
+
+        # Без --check ответы с ошибкой тоже не попадают в отчёт как замеры.
+        with override_settings(ALLOWED_HOSTS=[]), self.assertRaisesMessage(CommandError, "HTTP 400"):
+            call_command("benchmark_views", runs=1, only="catalog", output=output.name, stdout=StringIO())
+        self.assertEqual(
+            json.loads(Path(output.name).read_text())["scenarios"]["catalog"],
+            {"url": "/catalog/", "status": 400, "error": "HTTP 400"},
+        )
+
+    def test_list_queries_do_not_grow_with_page_size(self):
+        # Полная страница (12 товаров) и страница из двух товаров стоят одинаково: нет N+1.
+        urls = ["/catalog/?partial=1", "/api/catalog/products/"]
+        for url in urls:
+            self.client.get(url)
+        full_page = [count_queries(lambda: self.client.get(url)) for url in urls]
+
+        with override_settings(MEDIA_ROOT=self.media.name):
+            call_command("seed_demo_data", products=2, images=2, workers=1, stdout=StringIO())
+        cache.clear()
+        for url in urls:
+            self.client.get(url)
+        short_page = [count_queries(lambda: self.client.get(url)) for url in urls]
+
+        self.assertEqual(full_page, short_page)
+
+
+class ConditionalGetTests(SeededCatalogTestCase):
+    products = 3
+
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.order_by("pk").first()
+        self.url = reverse("main:product_detail", args=[self.product.slug])
+
+    def test_unchanged_page_is_not_modified_without_queries(self):
+        # Первый запрос выдаёт CSRF-cookie, она входит в ETag.
+        self.client.get(self.url)
+        etag = self.client.get(self.url)["ETag"]
+
+        response = None
+
+        def revalidate():
+            nonlocal response
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(count_queries(revalidate), 0)
+        self.assertEqual(response.status_code, 304)
+
+    def test_content_change_invalidates_etag(self):
+        self.client.get(self.url)
+        etag = self.client.get(self.url)["ETag"]
+
+        self.product.set_current_language("ru")
+        self.product.name = "Новое название"
+        # Кеши сбрасываются после коммита транзакции.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Новое название")
+
+    def test_api_list_is_revalidated(self):
+        url = "/api/catalog/products/"
+        response = self.client.get(url)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertFalse(response.has_header("Last-Modified"))
+        etag = response["ETag"]
+        # Без ETag дата ничего не подтверждает: ответ отдаётся полностью.
+        future = "Fri, 01 Jan 2100 00:00:00 GMT"
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=future).status_code, 200)
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.first().save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class KeysetPaginationTests(SeededCatalogTestCase):
+
+    def test_rows_sharing_a_millisecond_are_not_skipped(self):
+        moment = timezone.now().replace(microsecond=123000)
+        for offset, pk in enumerate(Product.objects.order_by("pk").values_list("pk", flat=True)):
+            Product.objects.filter(pk=pk).update(created_at=moment + timedelta(microseconds=offset))
+
+        seen, cursor = [], None
+        while True:
+            page = paginate_keyset(Product.objects.all(), cursor, per_page=7)
+            seen += [product.pk for product in page.object_list]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(sorted(seen), sorted(Product.objects.values_list("pk", flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+
+@override_settings(HOMEPAGE_SNAPSHOT_BACKGROUND=False)
+class SlugTests(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(slug="divany")
+
+    def make_product(self, name="Divan"):
+        product = Product(category=self.category)
+        product.set_current_language("ru")
+        product.name = name
+        product.save()
+        return product
+
+    def test_colliding_names_get_numbered_suffixes_in_constant_queries(self):
+        first = count_queries(self.make_product)
+        for _ in range(20):
+            self.make_product()
+        last = count_queries(self.make_product)
+
+        self.assertEqual(first, last)
+        self.assertEqual(Product.objects.get(slug="divan-21").name, "Divan")
+        self.assertTrue(Product.objects.filter(slug="divan").exists())
+
+    def test_non_numeric_suffix_is_not_counted(self):
+        Product.objects.create(category=self.category, slug="divan-uglovoy")
+        Product.objects.create(category=self.category, slug="divan-3")
+
+        self.assertEqual(slugs.next_free_slug(Product.objects.all(), "divan", 200), "divan-4")
+        self.assertEqual(slugs.next_free_slug(Product.objects.all(), "kreslo", 200), "kreslo")
+
+    def test_suffix_fits_max_length(self):
+        Product.objects.create(category=self.category, slug="x" * 129)
+
+        slug = slugs.next_free_slug(Product.objects.all(), "x" * 300, 140)
+        self.assertEqual(slug, "x" * 129 + "-1")
+
+    def test_slug_taken_concurrently_is_recomputed(self):
+        self.make_product()
+        original = slugs.next_free_slug
+        calls = []
+
+        def stale(queryset, base, max_length):
+            # Первый расчёт устарел: другой процесс уже вставил "divan".
+            calls.append(base)
+            return "divan" if len(calls) == 1 else original(queryset, base, max_length)
+
+        slugs.next_free_slug = stale
+        self.addCleanup(setattr, slugs, "next_free_slug", original)
+
+        self.assertEqual(self.make_product().slug, "divan-1")
+        self.assertEqual(len(calls), 2)
+
+
+@override_settings(HOMEPAGE_SNAPSHOT_BACKGROUND=False)
+class CatalogImportExportTests(TestCase):
+    def setUp(self):
+        Category.objects.create(slug="divany")
+
+    def run_import(self, lines, fmt="jsonl", image_root=None):
+        importer = CatalogImporter(["ru", "en"], image_root=image_root)
+        importer.import_batch(list(read_records(StringIO("\n".join(lines)), fmt, ["ru", "en"])))
+        return importer.stats
+
+    def test_jsonl_import_creates_products_translations_and_images(self):
+        record = {
+            "category": "divany",
+            "price": "1500",
+            "translations": {"ru": {"name": "Divan", "description": "<p>Мягкий</p>"}, "en": {"name": "Sofa"}},
+            "images": ["products/a.jpg", "products/b.jpg"],
+        }
+        stats = self.run_import(
+            [json.dumps(record), json.dumps(record), json.dumps({**record, "category": "nope"}), "{broken"]
+        )
+
+        self.assertEqual((stats.created, stats.updated), (2, 0))
+        self.assertEqual([line for line, _message in stats.errors], [3, 4])
+        product = Product.objects.get(slug="divan-1")
+        self.assertEqual(product.safe_translation_getter("name", language_code="en"), "Sofa")
+        self.assertEqual(product.primary_image.image.name, "products/a.jpg")
+        self.assertEqual(product.images.count(), 2)
+        self.assertTrue(Product.objects.filter(slug="divan").exists())
+
+    def test_export_round_trips_through_csv_and_updates_by_slug(self):
+        self.run_import(
+            [json.dumps({"slug": "d1", "category": "divany", "price": "10", "translations": {"ru": {"name": "A"}}})]
+        )
+        output = StringIO()
+        write_records(output, export_records(["ru", "en"]), "csv", ["ru", "en"])
+        csv_text = output.getvalue().replace(",10.00,", ",25.00,").replace(",A,", ",B,")
+
+        stats = self.run_import(csv_text.splitlines(), fmt="csv")
+
+        self.assertEqual((stats.created, stats.updated), (0, 1))
+        product = Product.objects.get(slug="d1")
+        self.assertEqual(str(product.price), "25.00")
+        self.assertEqual(product.safe_translation_getter("name", language_code="ru"), "B")
+
+    def test_photos_from_image_root_are_stored_with_variants(self):
+        photos = tempfile.TemporaryDirectory()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(photos.cleanup)
+        self.addCleanup(media.cleanup)
+        Image.new("RGB", (400, 300), "red").save(f"{photos.name}/sofa.jpg")
+        with open(f"{photos.name}/broken.jpg", "wb") as broken:
+            broken.write(b"\xff\xd8\xff\xe0not a jpeg")
+        record = {"slug": "d1", "category": "divany", "translations": {"ru": {"name": "A"}}}
+
+        with override_settings(MEDIA_ROOT=media.name):
+            stats = self.run_import(
+                [json.dumps({**record, "images": ["sofa.jpg", "broken.jpg"]})], image_root=photos.name
+            )
+
+        self.assertEqual(stats.images, 1)
+        self.assertEqual([line for line, _message in stats.image_errors], [1])
+        image = Product.objects.get(slug="d1").primary_image
+        self.assertTrue(image.image.name.startswith("products/sofa"))
+        self.assertEqual(image.image_variants["source"], image.image.name)
+        widths = [width for width, _name in image.image_variants["formats"]["jpeg"]]
+        self.assertEqual(widths, [320, 400])
+
+
+class ProductPageCacheTests(SeededCatalogTestCase):
+    products = 4
+
+    def setUp(self):
+        super().setUp()
+        self.product, self.other = Product.objects.order_by("pk")[:2]
+        self.url = reverse("main:product_detail", args=[self.product.slug])
+        self.other_url = reverse("main:product_detail", args=[self.other.slug])
+
+    def queries(self, url):
+        return count_queries(lambda: self.client.get(url))
+
+    def test_warmed_page_is_served_without_queries(self):
+        self.client.get(self.url)  # меню, подвал и CSRF-cookie
+        invalidate_product_pages([self.product.slug])
+
+        self.assertEqual(warm_product_pages(Product.objects.filter(pk=self.product.pk)), 2)
+        self.assertEqual(self.queries(self.url), 0)
+
+    def test_unknown_slugs_leave_nothing_in_cache(self):
+        self.assertEqual(self.client.get("/product/no-such-product/").status_code, 404)
+        self.assertFalse(has_version(product_namespace("no-such-product")))
+
+        # Отключённый товар уже имел версию: его отсутствие кешируется в ней же.
+        self.client.get(self.url)
+        Product.objects.filter(pk=self.product.pk).update(is_active=False)
+        invalidate_product_pages([self.product.slug])
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_page_build_query_budget(self):
+        # Все изображения приходят одним запросом уже в порядке показа, сколько бы их ни было.
+        first = self.product.images.first()
+        ProductImage.objects.bulk_create(
+            ProductImage(product=self.product, image=first.image.name, ordering=ordering)
+            for ordering in (5, 0, 3)
+        )
+        primary = self.product.images.order_by("-ordering").first()
+        ProductImage.objects.filter(product=self.product).update(is_primary=False)
+        ProductImage.objects.filter(pk=primary.pk).update(is_primary=True)
+
+        with translation.override("ru"):
+            product = _products().get(pk=self.product.pk)
+            self.assertEqual(count_queries(lambda: build_product_page(self.product.slug)), 5)
+
+        images = product.ordered_images
+        self.assertEqual(images[0].pk, primary.pk)
+        self.assertEqual(
+            [image.pk for image in images[1:]],
+            list(
+                self.product.images.exclude(pk=primary.pk)
+                .order_by("ordering", "id")
+                .values_list("pk", flat=True)
+            ),
+        )
+
+    def test_primary_image_follows_bulk_writes(self):
+        first = self.product.images.order_by("pk").first()
+        added = ProductImage.objects.bulk_create(
+            [ProductImage(product=self.other, image=first.image.name, ordering=0, is_primary=True)]
+        )
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.primary_image_id, added[0].pk)
+
+        ProductImage.objects.filter(product=self.product).update(is_primary=False)
+        ProductImage.objects.filter(pk=first.pk).update(is_primary=True)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.primary_image_id, first.pk)
+
+        first.is_primary = False
+        ProductImage.objects.bulk_update([first], ["is_primary"])
+        self.product.refresh_from_db()
+        self.assertEqual(
+            self.product.primary_image_id, self.product.images.order_by("ordering", "id").first().pk
+        )
+
+        ProductImage.objects.filter(product=self.product).delete()
+        self.product.refresh_from_db()
+        self.assertIsNone(self.product.primary_image_id)
+
+    def test_image_change_invalidates_only_its_product(self):
+        self.client.get(self.url)
+        self.client.get(self.other_url)
+
+        image = self.product.images.first()
+        image.ordering = 99
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+
+        self.assertGreater(self.queries(self.url), 0)
+        self.assertEqual(self.queries(self.other_url), 0)
+
+    def test_translation_and_category_changes_are_rendered(self):
+        self.client.get(self.url)
+
+        self.product.set_current_language("ru")
+        self.product.name = "Новое имя"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+        self.assertContains(self.client.get(self.url), "Новое имя")
+
+        category = self.product.category
+        category.set_current_language("ru")
+        category.name = "Новая категория"
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save()
+        self.assertContains(self.client.get(self.url), "Новая категория")
+
+    def test_old_slug_stops_serving_cached_page(self):
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.product.slug = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+        self.assertEqual(self.client.get("/product/renamed/").status_code, 200)
+
+
+class ProductListApiTests(SeededCatalogTestCase):
+    products = 15
+    url = "/api/catalog/products/"
+
+    def legacy(self, slugs, request):
+        products = (
+            Product.objects.filter(slug__in=slugs)
+            .select_related("category", "primary_image")
+            .prefetch_related("translations", "category__translations", "primary_image__translations")
+        )
+        data = {item["slug"]: item for item in ProductListSerializer(products, many=True, context={"request": request}).data}
+        return [data[slug] for slug in slugs]
+
+    def test_rows_match_model_serializer(self):
+        ProductImage.objects.filter(product=Product.objects.order_by("-created_at").first()).delete()
+        response = self.client.get(self.url)
+        results = response.json()["results"]
+        self.assertIsNone(results[0]["primary_image"])
+
+        slugs = [item["slug"] for item in results]
+        self.assertEqual(json.loads(json.dumps(results)), json.loads(json.dumps(self.legacy(slugs, response.wsgi_request))))
+
+        # Переводы без английской версии берутся из запасного языка, как у parler.
+        request = RequestFactory().get(self.url)
+        with translation.override("en"):
+            queryset = Product.objects.filter(slug__in=slugs).order_by("-created_at", "id")
+            rows = product_rows(queryset, parse_fields(""), "en")
+            data = ProductRowSerializer(rows, many=True, context={"request": request}).data
+            self.assertEqual(json.loads(json.dumps(data)), json.loads(json.dumps(self.legacy(slugs, request))))
+
+    def test_search_matches_slug(self):
+        product = Product.objects.order_by("pk").first()
+        Product.objects.filter(pk=product.pk).update(slug="sku_xq-42")
+        for text in ("xq-42", "SKU_XQ"):
+            with self.subTest(text):
+                results = self.client.get(self.url, {"search": text}).json()["results"]
+                self.assertEqual([item["slug"] for item in results], ["sku_xq-42"])
+        # "_" в LIKE — любой символ; в поиске он буквальный.
+        self.assertEqual(self.client.get(self.url, {"search": "sku-xq"}).json()["results"], [])
+
+    def test_search_ignores_description_markup(self):
+        product = Product.objects.order_by("pk").first()
+        with translation.override("ru"), self.captureOnCommitCallbacks(execute=True):
+            product.set_current_language("ru")
+            product.description = '<p>Мягкий <strong class="lead">диван</strong></p>'
+            product.save()
+
+        def found(text):
+            results = self.client.get(self.url, {"search": text}, HTTP_ACCEPT_LANGUAGE="ru").json()["results"]
+            return [item["slug"] for item in results]
+
+        def check():
+            self.assertEqual(found("диван"), [product.slug])
+            self.assertEqual(found("strong"), [])
+            self.assertEqual(found("lead"), [])
+
+        check()
+        # Заполнение индекса миграцией 0011 тоже без разметки.
+        migration = importlib.import_module("main.migrations.0011_producttranslation_search_vector")
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM main_product_fts")
+            migration.create_search_index(None, SimpleNamespace(connection=connection, execute=cursor.execute))
+        check()
+
+    def test_sparse_fieldset(self):
+        response = self.client.get(self.url, {"fields": "name,price", "ordering": "price"})
+        body = response.json()
+        self.assertEqual({tuple(item) for item in body["results"]}, {("name", "price")})
+
+        # Курсор строится по колонке сортировки, даже если её нет в ответе.
+        rest = self.client.get(body["next"]).json()["results"]
+        self.assertEqual(len(body["results"]) + len(rest), Product.objects.filter(is_active=True).count())
+
+        self.assertEqual(self.client.get(self.url, {"fields": "name,secret"}).status_code, 400)
+
+
+class FastJSONTests(SeededCatalogTestCase):
+    products = 3
+
+    def test_renderer_matches_stdlib_output(self):
+        response = self.client.get("/api/catalog/products/")
+        self.assertEqual(response.status_code, 200)
+        payload = {
+            "page": response.data,
+            "price": Decimal("10.50"),
+            "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            "label": gettext_lazy("Цена"),
+            "separator": "a\u2028b",
+        }
+
+        rendered = FastJSONRenderer().render(payload)
+        self.assertEqual(rendered, JSONRenderer().render(payload))
+        self.assertIn(b'"created_at":"2024-05-01T12:30:15.123456Z"', rendered)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parser_round_trip(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(BytesIO('{"name": "Ёж", "n": 1.5}'.encode()), "application/json", {}), {"name": "Ёж", "n": 1.5})
+        with self.assertRaises(ParseError):
+            parser.parse(BytesIO(b"{bad"), "application/json", {})
+
+    def test_benchmark_times_successful_endpoint_responses(self):
+        output = tempfile.NamedTemporaryFile(suffix=".json")
+        self.addCleanup(output.close)
+        with override_settings(ALLOWED_HOSTS=["shop.example"]):
+            call_command("benchmark_serializers", sizes="2", runs=1, output=output.name, stdout=StringIO())
+        self.assertEqual(set(json.loads(Path(output.name).read_text())["endpoint"]), {"json", "fast_json"})
+
+        with override_settings(ALLOWED_HOSTS=[]), self.assertRaisesMessage(CommandError, "HTTP 400"):
+            call_command("benchmark_serializers", sizes="", runs=1, output=output.name, stdout=StringIO())
+
+
+class ConnectionBenchmarkTests(TestCase):
+    def test_measures_every_mode_and_restores_settings(self):
+        settings_dict = dict(connection.settings_dict)
+        output = tempfile.NamedTemporaryFile(suffix=".json")
+        self.addCleanup(output.close)
+        stdout = StringIO()
+        call_command("benchmark_connections", runs=2, output=output.name, stdout=stdout)
+
+        results = json.loads(Path(output.name).read_text())["results"]
+        self.assertEqual(set(results), {"new_connection_per_request", "persistent_connection", "pool"})
+        self.assertEqual(results["persistent_connection"]["runs"], 2)
+        # На SQLite пула нет: колонка остаётся в таблице с прочерками.
+        self.assertIn("skipped", results["pool"])
+        header, *rows = stdout.getvalue().splitlines()
+        self.assertEqual(header.split(), ["new_connection_per_request", "persistent_connection", "pool"])
+        self.assertEqual(rows[1].split()[0], "p50_ms")
+        self.assertEqual(rows[1].split()[-1], "-")
+        self.assertEqual(dict(connection.settings_dict), settings_dict)
+
+
+class CategoryCountTests(SeededCatalogTestCase):
+    products = 6
+
+    def counts(self):
+        return dict(Category.objects.values_list("slug", "active_products_count"))
+
+    def expected(self):
+        return {
+            category.slug: category.products.filter(is_active=True).count()
+            for category in Category.objects.all()
+        }
+
+    def test_counts_follow_product_changes(self):
+        self.assertEqual(self.counts(), self.expected())
+        product = Product.objects.order_by("pk").first()
+        target = Category.objects.exclude(pk=product.category_id).first()
+
+        product.category = target
+        product.save()
+        self.assertEqual(self.counts(), self.expected())
+
+        product.is_active = False
+        product.save()
+        self.assertEqual(self.counts(), self.expected())
+
+        Product.objects.filter(is_active=True).first().delete()
+        self.assertEqual(self.counts(), self.expected())
+
+    def test_admin_actions_update_counts_and_api(self):
+        user = User.objects.create_superuser("admin", "admin@example.com", "password")
+        self.client.force_login(user)
+        category = Category.objects.filter(products__is_active=True).first()
+        url = reverse("category-detail", args=[category.pk])
+        self.assertEqual(self.client.get(url).json()["products_count"], category.active_products_count)
+        etag = self.client.get(url)["ETag"]
+
+        products = category.products.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse("admin:main_product_changelist"),
+                {"action": "make_inactive", "_selected_action": [product.pk for product in products]},
+            )
+        category.refresh_from_db()
+        self.assertEqual(category.active_products_count, 0)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get(url).json()["products_count"], 0)
+        self.assertEqual(self.counts(), self.expected())
+
+
+class TranslationPrefetchTests(SeededCatalogTestCase):
+    products = 4
+
+    def test_only_active_languages_are_loaded(self):
+        with translation.override("ru"):
+            products = list(
+                Product.objects.select_related("category")
+                .prefetch_translations("name", "category__name")
+                .order_by("pk")
+            )
+            with self.assertNumQueries(0):
+                names = [(p.name, p.description, p.category.name) for p in products]
+            self.assertEqual(
+                names,
+                [
+                    (p.name, p.description, p.category.name)
+                    for p in Product.objects.select_related("category").order_by("pk")
+                ],
+            )
+            for product in products:
+                self.assertEqual([t.language_code for t in product.active_translations], ["ru"])
+
+    def test_prefetched_translations_track_modifications(self):
+        with translation.override("ru"):
+            product = Product.objects.prefetch_translations("name").order_by("pk").first()
+            self.assertEqual(product.description, "Demo product")
+            translation_row = product.active_translations[0]
+            self.assertFalse(translation_row.is_modified)
+
+            product.description = "Changed"
+            self.assertTrue(translation_row.is_modified)
+            product.save()
+        saved = Product.objects.get(pk=product.pk)
+        self.assertEqual(saved.safe_translation_getter("description", language_code="ru"), "Changed")
+
+    def test_search_vector_is_neither_loaded_nor_cached(self):
+        with translation.override("ru"), CaptureQueriesContext(connection) as queries:
+            product = Product.objects.prefetch_translations("name").order_by("pk").first()
+            self.assertEqual(product.description, "Demo product")
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("search_vector", queries[1]["sql"])
+        self.assertIsNone(product.active_translations[0].search_vector)
+
+        cache_translations(Product, [product.pk], ["ru"])
+        translations_model = Product._parler_meta.root_model
+        entry = cache.get(get_translation_cache_key(translations_model, product.pk, "ru"))
+        self.assertEqual(set(entry), {"id", "name", "description"})
+
+    def test_missing_translation_falls_back_without_queries(self):
+        product = Product.objects.order_by("pk").first()
+        product.translations.filter(language_code="en").delete()
+        russian = product.safe_translation_getter("name", language_code="ru")
+
+        with translation.override("en"):
+            loaded = Product.objects.prefetch_translations("name").get(pk=product.pk)
+            self.assertEqual([t.language_code for t in loaded.active_translations], ["ru"])
+            with self.assertNumQueries(0):
+                self.assertEqual(loaded.name, russian)
+
+
+class TranslationCacheTests(SeededCatalogTestCase):
+    products = 6
+
+    def listing(self):
+        products = Product.objects.select_related("category").cached_translations("category")
+        return [(str(p), str(p.category)) for p in products.order_by("pk")]
+
+    def test_warmed_cache_serves_translations_without_queries(self):
+        call_command("warm_translation_cache", stdout=StringIO(), stderr=StringIO())
+        with translation.override("en"):
+            with self.assertNumQueries(1):
+                names = self.listing()
+            expected = [
+                (p.safe_translation_getter("name"), p.category.safe_translation_getter("name"))
+                for p in Product.objects.select_related("category").order_by("pk")
+            ]
+        self.assertEqual(names, expected)
+        self.assertTrue(all(name.endswith("[en]") for name, _category in names))
+
+    def test_cold_cache_is_filled_with_one_query_per_model(self):
+        with self.assertNumQueries(3):
+            cold = self.listing()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.listing(), cold)
+
+    def test_deleted_translation_is_forgotten(self):
+        call_command("warm_translation_cache", stdout=StringIO(), stderr=StringIO())
+        product = Product.objects.order_by("pk").first()
+        with self.captureOnCommitCallbacks(execute=True):
+            product.translations.filter(language_code="en").delete()
+
+        with translation.override("en"):
+            loaded = Product.objects.cached_translations().get(pk=product.pk)
+            self.assertEqual(loaded.name, product.safe_translation_getter("name", language_code="ru"))
+
+    def test_admin_changelist_queries_do_not_grow_with_rows(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        url = reverse("admin:main_product_changelist")
+        self.client.get(url)
+        # Холодный кеш: без чтения пачкой каждая строка читала бы свой перевод отдельно.
+        cache.clear()
+        before = count_queries(lambda: self.client.get(url))
+
+        category = Category.objects.first()
+        for index in range(5):
+            product = Product(slug=f"extra-{index}", category=category, price=1)
+            product.set_current_language("ru")
+            product.name = f"Extra {index}"
+            product.save()
+        self.client.get(url)
+        cache.clear()
+        self.assertEqual(count_queries(lambda: self.client.get(url)), before)
+
+
+class ChangeNotificationTests(SeededCatalogTestCase):
+    products = 4
+
+    def setUp(self):
+        super().setUp()
+        self.received = []
+        changes.subscribe(Product, self.received.append)
+        self.addCleanup(changes.unsubscribe, Product, self.received.append)
+
+    def test_bulk_writes_are_coalesced_per_transaction(self):
+        products = list(Product.objects.order_by("pk"))
+        category = Category.objects.exclude(pk=products[0].category_id).first()
+        old_category = products[0].category_id
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Product.objects.filter(pk=products[0].pk).update(category=category)
+                Product.objects.filter(pk__in=[p.pk for p in products[1:]]).update(is_main=True)
+                products[1].price = 5
+                Product.objects.bulk_update([products[1]], ["price"])
+                self.assertEqual(self.received, [])
+
+        self.assertEqual(len(self.received), 1)
+        change = self.received[0]
+        self.assertEqual(change.pks, {p.pk for p in products})
+        self.assertIn(old_category, change.values("category_id"))
+        self.assertIn(category.pk, change.values("category_id"))
+        # Счётчики пересчитываются сразу, внутри транзакции.
+        self.assertEqual(
+            dict(Category.objects.values_list("pk", "active_products_count")),
+            {c.pk: c.products.filter(is_active=True).count() for c in Category.objects.all()},
+        )
+
+    def test_rolled_back_changes_are_dropped(self):
+        product = Product.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Product.objects.filter(pk=product.pk).update(price=1)
+                raise RuntimeError
+            Product.objects.filter(pk=product.pk).update(is_main=True)
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0].pks, {product.pk})
+
+    def test_translation_save_and_bulk_create_notify_the_product(self):
+        product = Product.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            product.set_current_language("en")
+            product.name = "Renamed"
+            product.save_translations()
+        self.assertEqual(self.received[-1].pks, {product.pk})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            created = Product.objects.bulk_create([Product(slug="bulk", category=product.category)])
+        self.assertEqual(self.received[-1].pks, {created[0].pk})
+
+    def test_list_editable_save_invalidates_once(self):
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+        products = list(Product.objects.order_by("-created_at"))
+        data = {
+            "form-TOTAL_FORMS": len(products),
+            "form-INITIAL_FORMS": len(products),
+            "_save": "Save",
+        }
+        for index, product in enumerate(products):
+            data[f"form-{index}-id"] = product.pk
+            if not product.is_main:
+                data[f"form-{index}-is_main"] = "on"
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("admin:main_product_changelist"), data)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(self.received), 1)
+        self.assertEqual(self.received[0].pks, {p.pk for p in products})
+        flipped = {p.pk: not p.is_main for p in products}
+        self.assertEqual(dict(Product.objects.values_list("pk", "is_main")), flipped)
+
+
+def _without_csrf(content: bytes) -> bytes:
+    # Маскированный CSRF-токен меняется при каждом рендеринге.
+    return re.sub(rb'name="csrfmiddlewaretoken" value="[^"]*"', b"", content)
+
+
+@override_settings(HOMEPAGE_SNAPSHOT_BACKGROUND=False, **SOURCE_STATIC)
+class SiteContextCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        with translation.override("ru"):
+            self.category = Category.objects.create(slug="sofas", name="Диваны")
+            self.phone = ContactPhone.objects.create(phone="+7 700 000 00 00", label="Офис")
+            self.social = SocialMap.objects.create(telegram_url="https://t.me/old")
+        self.client.force_login(User.objects.create_superuser("admin", "admin@example.com", "password"))
+
+    def context(self):
+        with translation.override("ru"):
+            return {**categories(None), **global_contacts(None)}
+
+    def test_admin_edits_refresh_menu_and_footer_after_commit(self):
+        edits = [
+            # Меняется только перевод: parler сохраняет строку перевода, сама категория та же.
+            (
+                self.category,
+                {"name": "Мягкая мебель", "description": "", "slug": "sofas"},
+                lambda context: context["menu_categories"][0]["name"],
+                "Мягкая мебель",
+            ),
+            (
+                self.phone,
+                {"label": "Склад", "phone": "+7 700 000 00 00", "order": 0, "is_active": "on"},
+                lambda context: context["footer_phones"][0]["label"],
+                "Склад",
+            ),
+            (
+                self.social,
+                {
+                    **{name: "" for name in ("instagram_url", "facebook_url", "youtube_url", "tiktok_url")},
+                    "telegram_url": "https://t.me/new",
+                    "map_embed": "",
+                    "map_url": "",
+                    "is_active": "on",
+                },
+                lambda context: context["footer_social"]["telegram_url"],
+                "https://t.me/new",
+            ),
+        ]
+        for obj, data, read, expected in edits:
+            with self.subTest(type(obj).__name__):
+                before = read(self.context())
+                url = reverse(f"admin:main_{obj._meta.model_name}_change", args=[obj.pk])
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post(f"{url}?language=ru", data)
+                    self.assertEqual(response.status_code, 302)
+                    # До коммита кеш отдаёт прежние данные: транзакция ещё может откатиться.
+                    self.assertEqual(read(self.context()), before)
+                self.assertEqual(read(self.context()), expected)
+
+
+class ImageVariantTests(SeededCatalogTestCase):
+    products = 1
+
+    def setUp(self):
+        super().setUp()
+        override = override_settings(MEDIA_ROOT=self.media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def upload(self):
+        buffer = BytesIO()
+        Image.new("RGB", (800, 600), color="teal").save(buffer, format="JPEG")
+        product = Product.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            image = ProductImage.objects.create(
+                product=product, image=SimpleUploadedFile("photo.jpg", buffer.getvalue()), ordering=5
+            )
+            # Сохранение не ждёт кодирования: варианты появляются после коммита.
+            self.assertEqual(image.image_variants, {})
+            self.assertFalse(default_storage.exists(variant_name(image.image.name, 320, "jpeg")))
+        image.refresh_from_db()
+        return image
+
+    def test_variants_are_written_after_commit(self):
+        image = self.upload()
+        variants = image.image_variants
+        self.assertEqual((variants["source"], variants["width"], variants["height"]), (image.image.name, 800, 600))
+        self.assertEqual(set(variants["formats"]), set(available_formats()))
+        for fmt, entries in variants["formats"].items():
+            self.assertEqual([width for width, _name in entries], [320, 640, 800])
+            for width, name in entries:
+                self.assertEqual(name, variant_name(image.image.name, width, fmt))
+                with default_storage.open(name) as variant, Image.open(variant) as decoded:
+                    self.assertEqual(decoded.size, (width, round(600 * width / 800)))
+
+    def test_picture_and_srcset_markup(self):
+        image = self.upload()
+        variants = image.image_variants
+
+        def expected(fmt):
+            return ", ".join(f"{default_storage.url(name)} {width}w" for width, name in variants["formats"][fmt])
+
+        html = Template(
+            '{% load responsive_images %}{% picture src variants alt="Диван" sizes="50vw" %}'
+        ).render(Context({"src": image.image.url, "variants": variants}))
+        self.assertIn(
+            f'<img src="{image.image.url}" srcset="{expected("jpeg")}" sizes="50vw" alt="Диван"'
+            ' width="800" height="600" loading="lazy">',
+            html,
+        )
+        for fmt in ("avif", "webp"):
+            if fmt in variants["formats"]:
+                self.assertIn(f'<source type="image/{fmt}" srcset="{expected(fmt)}" sizes="50vw">', html)
+        self.assertEqual(
+            Template("{% load responsive_images %}{{ variants|srcset:'jpeg' }}").render(
+                Context({"variants": variants})
+            ),
+            expected("jpeg"),
+        )
+
+
+class HomepageSnapshotTests(SeededCatalogTestCase):
+    products = 4
+
+    def test_snapshot_is_cached_and_invalidated_by_changes(self):
+        product = Product.objects.filter(is_main=True).order_by("-created_at").first()
+        with translation.override("ru"):
+            snapshot = get_homepage_snapshot()
+            self.assertEqual(set(snapshot), set(HOMEPAGE_SECTIONS))
+            self.assertEqual(snapshot["main_products"][0]["name"], product.name)
+            with self.assertNumQueries(0):
+                self.assertEqual(get_homepage_snapshot(), snapshot)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                product.name = "Новое имя"
+                product.save()
+            self.assertEqual(get_homepage_snapshot()["main_products"][0]["name"], "Новое имя")
+
+    def test_rebuild_fills_every_language(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.update(is_main=False)
+        # Вне теста поток пересборки закрывает своё соединение; здесь оно общее с транзакцией теста.
+        with mock.patch.object(snapshots, "close_old_connections"):
+            rebuild_homepage_snapshots()
+        for code, _name in settings.LANGUAGES:
+            with translation.override(code), self.assertNumQueries(0):
+                self.assertEqual(get_homepage_snapshot()["main_products"], [])
+
+    @override_settings(HOMEPAGE_SNAPSHOT_BACKGROUND=True)
+    def test_background_rebuilds_are_coalesced_per_process(self):
+        for name in ("_executor", "_executor_pid", "_queued"):
+            self.addCleanup(setattr, snapshots, name, getattr(snapshots, name))
+        with mock.patch.object(snapshots, "ThreadPoolExecutor") as executor_class:
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_homepage_rebuild()
+                schedule_homepage_rebuild()
+            executor_class.return_value.submit.assert_called_once_with(rebuild_homepage_snapshots)
+
+            # Дочерний процесс после fork заводит свой пул.
+            snapshots._executor_pid = -1
+            with self.captureOnCommitCallbacks(execute=True):
+                schedule_homepage_rebuild()
+            self.assertEqual(executor_class.call_count, 2)
+            self.assertEqual(executor_class.return_value.submit.call_count, 2)
+
+
+@override_settings(ASYNC_SECTION_THREADS=0)
+class AsyncPageTests(SeededCatalogTestCase):
+    products = 6
+
+    def setUp(self):
+        super().setUp()
+        self.product = Product.objects.filter(is_active=True).order_by("-created_at").first()
+        self.urls = {
+            "index": "/",
+            "catalog": "/catalog/",
+            "catalog_partial": "/catalog/?partial=1",
+            "product_detail": f"/product/{self.product.slug}/",
+            "about": "/about/",
+        }
+
+    def test_async_views_render_the_same_pages(self):
+        with page_views(asynchronous=False):
+            expected = {name: self.client.get(url) for name, url in self.urls.items()}
+        cache.clear()
+        with page_views(asynchronous=True):
+            for name, url in self.urls.items():
+                with self.subTest(name):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertTrue(response.resolver_match.func.__name__.endswith("_async"))
+                    self.assertEqual(
+                        _without_csrf(response.content), _without_csrf(expected[name].content)
+                    )
+
+    def test_async_views_answer_not_found_and_not_modified(self):
+        with page_views(asynchronous=True):
+            self.assertEqual(self.client.get("/product/missing/").status_code, 404)
+
+            url = self.urls["product_detail"]
+            self.client.get(url)
+            etag = self.client.get(url)["ETag"]
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertIn("no-cache", response["Cache-Control"])
+
+
+@override_settings(ASYNC_SECTION_THREADS=2, HOMEPAGE_SNAPSHOT_BACKGROUND=False)
+class ConcurrentSectionTests(TransactionTestCase):
+    # Секции читают БД из своих потоков и соединений: данные должны быть закоммичены.
+
+    def test_sections_run_in_worker_threads_with_the_request_language(self):
+        category = Category(slug="tables")
+        category.set_current_language("ru")
+        category.name = "Столы"
+        category.save()
+
+        def section():
+            return threading.get_ident(), get_language(), Category.objects.get().name
+
+        with translation.override("ru"):
+            results = asyncio.run(gather_sections({"first": section, "second": section}))
+
+        for ident, language, name in results.values():
+            self.assertNotEqual(ident, threading.get_ident())
+            self.assertEqual((language, name), ("ru", "Столы"))
+
+
+class StaticPipelineTests(SimpleTestCase):
+
+    def test_minifiers_keep_strings_and_statement_breaks(self):
+        self.assertEqual(
+            minify_css("a :hover , .b > .c { margin: calc(1px + 2px) 0 ; content: ' ; } ' ; }"),
+            "a :hover,.b>.c{margin:calc(1px + 2px) 0;content:' ; } '}",
+        )
+        source = "let a = b // comment\n++c\nreturn /[/]x/g.test('a // b') + + d\n"
+        self.assertEqual(minify_js(source), "let a=b\n++c\nreturn/[/]x/g.test('a // b')+ +d")
+
+    def test_missing_manifest_fails_unless_not_strict(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        with override_settings(STATIC_ROOT=root.name, WHITENOISE_MANIFEST_STRICT=True):
+            with self.assertRaises(ValueError):
+                OptimizedStaticFilesStorage().stored_name("styles/main.css")
+        with override_settings(STATIC_ROOT=root.name, WHITENOISE_MANIFEST_STRICT=False):
+            self.assertEqual(OptimizedStaticFilesStorage().stored_name("styles/main.css"), "styles/main.css")
+
+    def test_collectstatic_minifies_precompresses_and_reports_savings(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        with override_settings(
+            STATIC_ROOT=root.name,
+            STATICFILES_FINDERS=["django.contrib.staticfiles.finders.FileSystemFinder"],
+        ):
+            call_command("collectstatic", interactive=False, verbosity=0)
+            report = json.loads(Path(root.name, REPORT_NAME).read_text())
+            css = report["assets"]["styles/main.css"]
+            self.assertLess(css["minified"], css["original"])
+            self.assertLess(css["gzip"], css["minified"])
+            self.assertEqual(css["saved"], css["original"] - min(css["gzip"], css.get("br", css["gzip"])))
+
+            url = static("styles/main.css")
+            self.assertIn(css["hashed_name"], url)
+            # Новый клиент — новый WhiteNoise, который видит собранные файлы.
+            client = Client()
+            response = client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertIn("immutable", response["Cache-Control"])
+            self.assertNotIn("immutable", client.get("/static/styles/main.css")["Cache-Control"])
+            if compress_zstd(b"") is not None:
+                response = client.get(url, HTTP_ACCEPT_ENCODING="zstd")
+                self.assertEqual(response["Content-Encoding"], "zstd")
+                self.assertEqual(int(response["Content-Length"]), css["zstd"])
+
+
+class CriticalCssTests(SeededCatalogTestCase):
+
+    def test_keeps_rules_of_the_first_sections_only(self):
+        html = (
+            '<html><body><header class="header"><a class="logo">S</a></header>'
+            '<section class="hero"><section class="nested"></section></section>'
+            '<section class="second"></section><section class="third"></section>'
+            '<footer class="footer"></footer></body></html>'
+        )
+        css = """
+            /* reset */ * { margin: 0 } body { color: red }
+            .header .logo, .footer a { display: flex }
+            .logo:hover { color: blue }
+            .hero::before { background: url(../img/bg.png); animation: fade 1s }
+            .third, .footer { display: none }
+            @media (max-width: 600px) { .second { margin: 0 } .third { margin: 1px } }
+            @media print { .footer { display: none } }
+            @keyframes fade { from { opacity: 0 } } @keyframes spin { to { rotate: 1turn } }
+        """
+        self.assertEqual(
+            critical_css(css, html, base_url="/static/styles/"),
+            "*{margin:0}body{color:red}.header .logo{display:flex}"
+            '.hero::before{background:url("/static/img/bg.png");animation:fade 1s}'
+            "@media (max-width:600px){.second{margin:0}}@keyframes fade{from{opacity:0}}",
+        )
+
+    def test_committed_critical_css_is_up_to_date(self):
+        output = tempfile.TemporaryDirectory()
+        self.addCleanup(output.cleanup)
+        # Как в настройках проекта: testserver клиента в ALLOWED_HOSTS нет.
+        with override_settings(ALLOWED_HOSTS=["shop.example"]):
+            call_command("extract_critical_css", output_dir=output.name, stdout=StringIO())
+        for generated in sorted(Path(output.name).iterdir()):
+            committed = Path(settings.BASE_DIR, "static", CRITICAL_DIR, generated.name)
+            self.assertEqual(
+                committed.read_text(encoding="utf-8") if committed.exists() else "",
+                generated.read_text(encoding="utf-8"),
+                f"{committed} is stale: run manage.py extract_critical_css --seed 40",
+            )
+
+    def test_pages_inline_critical_css_and_load_stylesheet_without_blocking(self):
+        href = static("styles/main.css")
+        html = self.client.get(reverse("main:catalog")).content.decode()
+        head = html.split("</head>", 1)[0]
+        self.assertRegex(head, r"<style>.*\.page-hero\{.*</style>")
+        self.assertIn(f'<link rel="preload" href="{href}" as="style"', head)
+        self.assertIn(f'<noscript><link rel="stylesheet" href="{href}"></noscript>', head)
+
+        # Страница без файла критического CSS подключает стили как раньше.
+        rendered = Template('{% load critical_css %}{% page_styles "missing" %}').render(Context())
+        self.assertEqual(rendered, f'<link rel="stylesheet" href="{href}">')
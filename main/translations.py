@@ -0,0 +1,239 @@
+"""Load parler translations in bulk: only what a page shows, or from the shared cache.
+
+``prefetch_related("translations")`` loads every language. :class:`TranslationsPrefetch`
+restricts the query to the active language and its parler fallbacks; the
+field paths given by the caller pick the models whose translations are loaded::
+
+    Product.objects.prefetch_translations("name", "category__name")
+
+The rows go straight into parler's per-object cache, so reading a translated
+field costs no further queries; languages that were not found are marked missing
+and fall back as usual. A row carries every editable translated column, never
+derived ones such as ``search_vector``: parler snapshots all fields of a
+translation for ``is_modified``, which rules out ``defer()``, so the columns are
+read with ``.values()`` and the translations built from them, as parler's cache
+does.
+
+:func:`load_translations` fills the same per-object cache from parler's cache
+with one ``get_many`` (and one query for the misses), where parler would read or
+query each object separately; :func:`cache_translations` warms that cache.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.db.models.query import ModelIterable
+from django.db.models.constants import LOOKUP_SEP
+from django.utils.translation import get_language
+from parler import appsettings
+from parler.cache import MISSING, get_translation_cache_key, is_missing
+
+from .cache import DEFAULT_TIMEOUT
+
+TO_ATTR = "active_translations"
+# Так parler помечает в кеше язык без перевода: читать нужно запасной.
+FALLBACK = {"__FALLBACK__": True}
+
+
+def active_languages(language_code: str | None = None) -> list[str]:
+    """``language_code`` (the active language by default) followed by its parler fallbacks."""
+    return list(appsettings.PARLER_LANGUAGES.get_active_choices(language_code or get_language()))
+
+
+class _ActiveTranslations:
+    """``to_attr`` target of :class:`TranslationsPrefetch`.
+
+    Prefetching through the ``translations`` manager would hand the rows to parler
+    via ``_prefetched_objects_cache``; parler then copies every row it reads into
+    its shared cache.
+    """
+
+    def __init__(self, translations_model):
+        self.translations_model = translations_model
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return instance.__dict__[TO_ATTR]
+        except KeyError:
+            # hasattr() == False: Django ещё не выполнил prefetch для этого объекта.
+            raise AttributeError(TO_ATTR) from None
+
+    def __set__(self, instance, translations):
+        instance.__dict__[TO_ATTR] = translations
+        local_cache = instance._translations_cache[self.translations_model]
+        for translation in translations:
+            if is_missing(local_cache.get(translation.language_code, MISSING)):
+                local_cache[translation.language_code] = translation
+        for code in active_languages():
+            # Отметка "перевода нет": parler сразу перейдёт к запасному языку без запроса.
+            local_cache.setdefault(code, MISSING)
+
+
+def content_fields(translations_model) -> list[str]:
+    """Translated columns a translation row is loaded with: the editable ones."""
+    # search_vector и подобные пересчитываются после сохранения перевода, читать их незачем.
+    return [
+        name
+        for name in translations_model.get_translated_fields(include_m2m=False)
+        if translations_model._meta.get_field(name).editable
+    ]
+
+
+class _ContentRows(ModelIterable):
+    """Translations built from ``.values()`` rows of :func:`content_fields`."""
+
+    def __iter__(self):
+        queryset = self.queryset
+        model = queryset.model
+        for row in queryset.values("id", "master_id", "language_code", *content_fields(model)):
+            translation = model(**row)
+            translation._state.adding = False
+            translation._state.db = queryset.db
+            yield translation
+
+
+def _install(model) -> None:
+    meta = model._parler_meta.root
+    if not isinstance(model.__dict__.get(TO_ATTR), _ActiveTranslations):
+        setattr(model, TO_ATTR, _ActiveTranslations(meta.model))
+
+
+class TranslationsPrefetch(Prefetch):
+    """Translations of ``model`` (reached through ``prefix``) in the active languages only.
+
+    The language is resolved when the query runs, so the prefetch can live in a
+    class-level queryset.
+    """
+
+    def __init__(self, model, prefix: str = ""):
+        meta = model._parler_meta.root
+        _install(model)
+        queryset = meta.model._default_manager.all()
+        queryset._iterable_class = _ContentRows
+        super().__init__(f"{prefix}{meta.rel_name}", queryset=queryset, to_attr=TO_ATTR)
+
+    def get_current_querysets(self, level):
+        querysets = super().get_current_querysets(level)
+        if querysets is None:
+            return None
+        return [querysets[0].filter(language_code__in=active_languages())]
+
+
+def translation_prefetches(model, fields=()) -> list[TranslationsPrefetch]:
+    """One :class:`TranslationsPrefetch` per model reached by ``fields``.
+
+    ``"name"`` is a translated field of ``model`` itself, ``"category__name"`` one
+    of the related category; only the path matters, each row is loaded with
+    :func:`content_fields`. No fields means the translations of ``model`` only.
+    """
+    targets: dict[str, type] = {}
+    for path in fields or ("",):
+        *relations, _name = path.split(LOOKUP_SEP)
+        target = model
+        for relation in relations:
+            target = target._meta.get_field(relation).related_model
+        targets.setdefault("".join(f"{relation}{LOOKUP_SEP}" for relation in relations), target)
+    return [TranslationsPrefetch(target, prefix) for prefix, target in targets.items()]
+
+
+def _read_rows(translations_model, master_ids, languages) -> dict[str, dict]:
+    """parler cache entries for ``master_ids`` x ``languages``, read in one query and stored."""
+    fields = content_fields(translations_model)
+    entries = {
+        get_translation_cache_key(translations_model, pk, code): FALLBACK
+        for pk in master_ids
+        for code in languages
+    }
+    rows = translations_model._default_manager.filter(
+        master_id__in=master_ids, language_code__in=languages
+    ).values("id", "master_id", "language_code", *fields)
+    for row in rows:
+        master_id, code = row.pop("master_id"), row.pop("language_code")
+        entries[get_translation_cache_key(translations_model, master_id, code)] = row
+    if appsettings.PARLER_ENABLE_CACHING:
+        cache.set_many(entries, timeout=DEFAULT_TIMEOUT)
+    return entries
+
+
+def cache_translations(model, master_ids, languages=None) -> int:
+    """Store translations of ``model`` rows ``master_ids`` in parler's cache; returns the entry count.
+
+    All site languages by default; languages without a translation get parler's
+    fallback marker, so reading them costs no query either.
+    """
+    languages = languages or [code for code, _name in settings.LANGUAGES]
+    return len(_read_rows(model._parler_meta.root_model, list(master_ids), languages))
+
+
+def forget_translations(model, master_ids) -> None:
+    """Drop cached translations of ``model`` rows ``master_ids`` in every site language."""
+    translations_model = model._parler_meta.root_model
+    cache.delete_many(
+        [
+            get_translation_cache_key(translations_model, pk, code)
+            for pk in master_ids
+            for code, _name in settings.LANGUAGES
+        ]
+    )
+
+
+def _follow(obj, path: str):
+    for name in path.split(LOOKUP_SEP):
+        obj = getattr(obj, name, None)
+        if obj is None:
+            return None
+    return obj
+
+
+def load_translations(objects, *related: str) -> list:
+    """Fill parler's per-object cache of ``objects`` and their ``related`` FK objects in bulk.
+
+    Each object's current language and its fallbacks are read from parler's cache
+    with one ``get_many`` per model; objects missing there are queried together
+    and cached for the next time.
+    """
+    objects = list(objects)
+    # (модель, языки) -> pk -> экземпляры: у админки язык объектов может отличаться от активного.
+    groups: dict[tuple, dict] = defaultdict(lambda: defaultdict(list))
+    for obj in objects:
+        for target in [obj, *(_follow(obj, path) for path in related)]:
+            if target is not None and target.pk is not None and getattr(target, "_parler_meta", None):
+                languages = tuple(active_languages(target.get_current_language()))
+                groups[type(target), languages][target.pk].append(target)
+
+    for (model, languages), instances in groups.items():
+        translations_model = model._parler_meta.root_model
+        keys = {
+            get_translation_cache_key(translations_model, pk, code): (pk, code)
+            for pk in instances
+            for code in languages
+        }
+        entries = cache.get_many(list(keys)) if appsettings.PARLER_ENABLE_CACHING else {}
+        missing = {pk for key, (pk, _code) in keys.items() if key not in entries}
+        if missing:
+            entries.update(_read_rows(translations_model, missing, languages))
+
+        for key, (pk, code) in keys.items():
+            values = entries[key]
+            for obj in instances[pk]:
+                local_cache = obj._translations_cache[translations_model]
+                if code in local_cache:
+                    continue
+                if values.get("__FALLBACK__"):
+                    local_cache[code] = MISSING
+                    continue
+                # Как parler.cache.get_cached_translation: объект перевода из словаря значений.
+                try:
+                    translation = translations_model(master=obj, language_code=code, **values)
+                except TypeError:
+                    # Запись от старой схемы модели — пусть parler прочитает перевод сам.
+                    continue
+                translation._state.adding = False
+                local_cache[code] = translation
+    return objects
@@ -1,13 +1,21 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
 app_name = "main"
 
+# Под ASGI — асинхронные варианты страниц (settings.ASYNC_VIEWS).
+_async = settings.ASYNC_VIEWS
+
 urlpatterns = [
-    path("", views.index, name="index"),
-    path("catalog/", views.catalog_view, name="catalog"),
-    path("product/<slug:slug>/", views.product_detail, name="product_detail"),
-    path("about/", views.about, name="about"),
+    path("", views.index_async if _async else views.index, name="index"),
+    path("catalog/", views.catalog_view_async if _async else views.catalog_view, name="catalog"),
+    path(
+        "product/<slug:slug>/",
+        views.product_detail_async if _async else views.product_detail,
+        name="product_detail",
+    ),
+    path("about/", views.about_async if _async else views.about, name="about"),
     path("contact/", views.contact_view, name="contact"),
 ]
@@ -1,17 +1,30 @@
 from __future__ import annotations
-from django.shortcuts import render, get_object_or_404
-from django.core.paginator import Paginator
-from django.db.models import Count, Q, Prefetch
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import render
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.functional import cached_property
 from django.utils import timezone
 from django.utils.html import escape
 from django.utils.translation import gettext as _, get_language
 
 from rest_framework import viewsets, serializers
+from rest_framework.filters import OrderingFilter, SearchFilter
 from django_filters import rest_framework as filters
 
-from utils.telegram import send_telegram_message
+from .conditional import ABOUT_NAMESPACE, CATALOG_NAMESPACE, ConditionalGetMixin, conditional_page
+from .context_processors import FOOTER_NAMESPACE, MENU_NAMESPACE
+from .notifications import enqueue_telegram_message
+from .pagination import CATALOG_ORDERING, ProductCursorPagination, paginate_keyset
+from .product_pages import aget_product_page, get_product_page
+from .product_rows import parse_fields, product_rows
+from .search import SEARCH_ORDERING, search_products
+from .sections import gather_sections
+from .snapshots import HOMEPAGE_NAMESPACE, aget_homepage_snapshot, get_homepage_snapshot
 
 from .models import (
     CarouselItem,
@@ -38,14 +51,37 @@ from .models import (
 # ----------------- Serializers -----------------
 
 
+class ImageVariantsField(serializers.Field):
+    """Read-only ``{format: srcset}`` built from a ``*_variants`` JSON field."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        result = {}
+        for fmt, entries in (value or {}).get("formats", {}).items():
+            urls = []
+            for width, name in entries:
+                url = default_storage.url(name)
+                if request is not None:
+                    url = request.build_absolute_uri(url)
+                urls.append(f"{url} {width}w")
+            result[fmt] = ", ".join(urls)
+        return result
+
+
 class CarouselItemSerializer(serializers.ModelSerializer):
+    srcset = ImageVariantsField(source="image_variants")
+
     class Meta:
         model = CarouselItem
-        fields = ["id", "title", "subtitle", "image", "link_url", "ordering"]
+        fields = ["id", "title", "subtitle", "image", "srcset", "link_url", "ordering"]
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    products_count = serializers.IntegerField(read_only=True)
+    products_count = serializers.IntegerField(source="active_products_count", read_only=True)
 
     class Meta:
         model = Category
@@ -53,9 +89,11 @@ class CategorySerializer(serializers.ModelSerializer):
 
 
 class ProductImageSerializer(serializers.ModelSerializer):
+    srcset = ImageVariantsField(source="image_variants")
+
     class Meta:
         model = ProductImage
-        fields = ["image", "alt_text", "ordering", "is_primary"]
+        fields = ["image", "srcset", "alt_text", "ordering", "is_primary"]
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -76,6 +114,80 @@ class ProductSerializer(serializers.ModelSerializer):
         ]
 
 
+class ProductListSerializer(ProductSerializer):
+    primary_image = ProductImageSerializer(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = [
+            "id",
+            "name",
+            "slug",
+            "description",
+            "price",
+            "category",
+            "primary_image",
+            "created_at",
+        ]
+
+
+class StorageURLField(serializers.Field):
+    """Read-only absolute URL of a file name stored in ``default_storage``."""
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = default_storage.url(value)
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+class CategoryRowSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source="category_id")
+    name = serializers.CharField(source="category_name")
+    slug = serializers.CharField(source="category_slug")
+    description = serializers.CharField(source="category_description")
+    products_count = serializers.IntegerField(source="category_products_count")
+
+
+class PrimaryImageRowSerializer(serializers.Serializer):
+    image = StorageURLField(source="primary_image_name")
+    srcset = ImageVariantsField(source="primary_image_variants")
+    alt_text = serializers.CharField(source="primary_image_alt_text")
+    ordering = serializers.IntegerField(source="primary_image_ordering")
+    is_primary = serializers.BooleanField(source="primary_image_is_primary")
+
+    def to_representation(self, instance):
+        if instance["primary_image_id"] is None:
+            return None
+        return super().to_representation(instance)
+
+
+class ProductRowSerializer(serializers.Serializer):
+    """List item built from a ``product_rows`` dict; same shape as ``ProductListSerializer``.
+
+    ``fields`` limits the output to the ``?fields=`` sparse fieldset.
+    """
+
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    slug = serializers.CharField()
+    description = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    category = CategoryRowSerializer(source="*")
+    primary_image = PrimaryImageRowSerializer(source="*", allow_null=True)
+    created_at = serializers.DateTimeField()
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class AdvantageSerializer(serializers.ModelSerializer):
     class Meta:
         model = Advantage
@@ -119,187 +231,196 @@ class ProductFilter(filters.FilterSet):
         fields = ["category", "price__gte", "price__lte"]
 
 
+class ProductSearchFilter(SearchFilter):
+    """``?search=`` backed by the product full-text index instead of ``icontains`` joins."""
+
+    def filter_queryset(self, request, queryset, view):
+        text = " ".join(self.get_search_terms(request))
+        return search_products(queryset, text, get_language())
+
+
 # ----------------- HTML Views -----------------
 
+CATALOG_PAGE_SIZE = 12
 
+
+@conditional_page(HOMEPAGE_NAMESPACE, MENU_NAMESPACE, FOOTER_NAMESPACE)
 def index(request):
-    carousel = (
-        CarouselItem.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("ordering")
-    )
-    images_prefetch = Prefetch(
-        "images",
-        queryset=ProductImage.objects.prefetch_related("translations").order_by(
-            "-is_primary", "ordering", "id"
-        ),
-    )
-    main_products = (
-        Product.objects.filter(is_active=True, is_main=True)
-        .select_related("category")
-        .prefetch_related("translations", "category__translations", images_prefetch)
-        .order_by("-created_at")[:8]
-    )
-    metrics = (
-        Metric.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("ordering")[:3]
-    )
-    home_video = (
-        Video.objects.filter(page=Video.Page.HOME, is_active=True)
-        .prefetch_related("translations")
-        .order_by("order", "-created_at")
-        .first()
-    )
-    company = CompanyInfo.objects.prefetch_related("translations").first()
-    contacts = company
+    return _render_index(request, get_homepage_snapshot())
+
+
+def _render_index(request, snapshot):
     context = {
-        "carousel": carousel,
-        "main_products": main_products,
-        "metrics": metrics,
-        "home_video": home_video,
-        "company": company,
-        "contacts": contacts,
+        **snapshot,
+        "contacts": snapshot["company"],
         "active_page": "home",
     }
     return render(request, "index.html", context)
 
 
-def catalog_view(request):
-    cat_slug = request.GET.get("category")
-    search_query = request.GET.get("q")
-    language_code = getattr(request, "LANGUAGE_CODE", None) or get_language()
+def _catalog_products(params, language_code):
+    cat_slug = params.get("category")
+    search_query = params.get("q")
 
-    images_prefetch = Prefetch(
-        "images",
-        queryset=ProductImage.objects.prefetch_related("translations").order_by(
-            "-is_primary", "ordering", "id"
-        ),
-    )
     qs = Product.objects.filter(is_active=True)
     if cat_slug and cat_slug != "all":
         qs = qs.filter(category__slug=cat_slug)
-    if search_query:
-        translation_q = Q(translations__name__icontains=search_query) | Q(
-            translations__description__icontains=search_query
-        )
-        if language_code:
-            translation_q = translation_q & Q(translations__language_code=language_code)
-        qs = qs.filter(translation_q).distinct()
-
-    qs = (
-        qs.select_related("category")
-        .prefetch_related("translations", "category__translations", images_prefetch)
-        .order_by("-created_at")
+    # Сетке нужны только названия товара и категории, без HTML-описаний.
+    qs = qs.select_related("category", "primary_image").prefetch_translations(
+        "name", "category__name"
     )
+    ordering = CATALOG_ORDERING
+    if search_query:
+        qs = search_products(qs, search_query, language_code)
+        if "search_rank" in qs.query.annotations:
+            ordering = SEARCH_ORDERING
 
-    paginator = Paginator(qs, 12)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    return paginate_keyset(qs, params.get("cursor"), CATALOG_PAGE_SIZE, ordering)
 
-    if request.GET.get("partial") == "1":
-        return render(request, "partials/_products_grid.html", {"products": page_obj.object_list})
+
+# Секции каталога вокруг сетки товаров; друг от друга не зависят.
+CATALOG_SECTIONS = {
+    "categories": lambda: list(Category.objects.all().prefetch_translations("name")),
+    "contacts": lambda: CompanyInfo.objects.prefetch_translations().first(),
+    "header": lambda: (
+        SectionHeader.objects.filter(slug="catalog", is_active=True)
+        .prefetch_translations()
+        .first()
+    ),
+}
+
+
+def _render_catalog(request, page, sections=None):
+    if sections is None:
+        response = render(
+            request,
+            "partials/_products_grid.html",
+            {"products": page.object_list, "next_cursor": page.next_cursor},
+        )
+        response["X-Next-Cursor"] = page.next_cursor or ""
+        return response
 
     query_params = request.GET.copy()
+    query_params.pop("cursor", None)
     query_params.pop("page", None)
     query_string = query_params.urlencode()
 
-    categories = Category.objects.all().prefetch_related("translations")
-    contacts = CompanyInfo.objects.prefetch_related("translations").first()
-    header = (
-        SectionHeader.objects.filter(slug="catalog", is_active=True)
-        .prefetch_related("translations")
-        .first()
-    )
-    active_cat = cat_slug or "all"
-
     context = {
-        "categories": categories,
-        "page_obj": page_obj,
-        "products": page_obj.object_list,
+        **sections,
+        "products": page.object_list,
+        "next_cursor": page.next_cursor,
         "active_page": "catalog",
-        "active_cat": active_cat,
-        "q": search_query,
+        "active_cat": request.GET.get("category") or "all",
+        "q": request.GET.get("q"),
         "query_string": query_string,
-        "contacts": contacts,
-        "header": header,
     }
     return render(request, "catalog.html", context)
 
 
-def product_detail(request, slug: str):
-    product = get_object_or_404(
-        Product.objects.select_related("category")
-        .prefetch_related("translations", "category__translations", "images__translations"),
-        slug=slug,
-        is_active=True,
-    )
-    images = (
-        product.images.all()
-        .prefetch_related("translations")
-        .order_by("-is_primary", "ordering", "id")
-    )
-    contacts = CompanyInfo.objects.prefetch_related("translations").first()
+@conditional_page(CATALOG_NAMESPACE, MENU_NAMESPACE, FOOTER_NAMESPACE)
+def catalog_view(request):
+    language_code = getattr(request, "LANGUAGE_CODE", None) or get_language()
+    page = _catalog_products(request.GET, language_code)
+    if request.GET.get("partial") == "1":
+        return _render_catalog(request, page)
+    sections = {name: build() for name, build in CATALOG_SECTIONS.items()}
+    return _render_catalog(request, page, sections)
+
+
+def _render_product(request, page, snapshot):
+    if page["html"] is None:
+        raise Http404("No Product matches the given query.")
     return render(
         request,
         "product_detail.html",
         {
-            "product": product,
-            "images": images,
+            "page": page,
             "active_page": "catalog",
-            "contacts": contacts,
+            "contacts": snapshot["company"],
         },
     )
 
 
-def about(request):
-    advantages = (
-        Advantage.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("ordering")
-    )
-    metrics = (
-        Metric.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("ordering")
-    )
-    team = (
-        TeamMember.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("ordering")
-    )
-    values = (
-        Value.objects.filter(is_active=True)
-        .prefetch_related("translations")
-        .order_by("ordering")
+@conditional_page(CATALOG_NAMESPACE, MENU_NAMESPACE, FOOTER_NAMESPACE)
+def product_detail(request, slug: str):
+    return _render_product(request, get_product_page(slug), get_homepage_snapshot())
+
+
+def _active(model, *ordering):
+    return lambda: list(
+        model.objects.filter(is_active=True).prefetch_translations().order_by(*ordering)
     )
-    about_video = (
+
+
+# Секции страницы «О нас»; друг от друга не зависят.
+ABOUT_SECTIONS = {
+    "advantages": _active(Advantage, "ordering"),
+    "metrics": _active(Metric, "ordering"),
+    "team": _active(TeamMember, "ordering"),
+    "values": _active(Value, "ordering"),
+    "about_video": lambda: (
         Video.objects.filter(page=Video.Page.ABOUT, is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("order", "-created_at")
         .first()
-    )
-    company = CompanyInfo.objects.prefetch_related("translations").first()
-    contacts = company
-    header = (
+    ),
+    "company": lambda: CompanyInfo.objects.prefetch_translations().first(),
+    "header": lambda: (
         SectionHeader.objects.filter(slug="about", is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .first()
-    )
+    ),
+}
+
+
+def _render_about(request, sections):
     context = {
-        "advantages": advantages,
-        "metrics": metrics,
-        "team": team,
-        "values": values,
-        "about_video": about_video,
-        "company": company,
-        "contacts": contacts,
+        **sections,
+        "contacts": sections["company"],
         "active_page": "about",
-        "header": header,
     }
     return render(request, "about.html", context)
 
 
+def about(request):
+    return _render_about(request, {name: build() for name, build in ABOUT_SECTIONS.items()})
+
+
+# ----------------- Async HTML Views -----------------
+# Под ASGI (settings.ASYNC_VIEWS): те же страницы, но независимые секции
+# собираются параллельно (main/sections.py), а шаблон с контекст-процессорами,
+# которые тоже читают БД, рендерится в синхронном потоке запроса.
+
+
+@conditional_page(HOMEPAGE_NAMESPACE, MENU_NAMESPACE, FOOTER_NAMESPACE)
+async def index_async(request):
+    snapshot = await aget_homepage_snapshot()
+    return await sync_to_async(_render_index)(request, snapshot)
+
+
+@conditional_page(CATALOG_NAMESPACE, MENU_NAMESPACE, FOOTER_NAMESPACE)
+async def catalog_view_async(request):
+    language_code = getattr(request, "LANGUAGE_CODE", None) or get_language()
+    products = {"page": lambda: _catalog_products(request.GET, language_code)}
+    if request.GET.get("partial") == "1":
+        sections = await gather_sections(products)
+        return await sync_to_async(_render_catalog)(request, sections["page"])
+    sections = await gather_sections({**products, **CATALOG_SECTIONS})
+    page = sections.pop("page")
+    return await sync_to_async(_render_catalog)(request, page, sections)
+
+
+@conditional_page(CATALOG_NAMESPACE, MENU_NAMESPACE, FOOTER_NAMESPACE)
+async def product_detail_async(request, slug: str):
+    page, snapshot = await asyncio.gather(aget_product_page(slug), aget_homepage_snapshot())
+    return await sync_to_async(_render_product)(request, page, snapshot)
+
+
+async def about_async(request):
+    sections = await gather_sections(ABOUT_SECTIONS)
+    return await sync_to_async(_render_about)(request, sections)
+
+
 def _get_client_ip(request):
     forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
     if forwarded:
@@ -310,27 +431,27 @@ def _get_client_ip(request):
 def contact_view(request):
     addresses = (
         ContactAddress.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("order", "id")
     )
     phones = (
         ContactPhone.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("order", "id")
     )
     emails = (
         ContactEmail.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("order", "id")
     )
     hours = (
         ContactWorkingHours.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .first()
     )
     topics = (
         ContactTopic.objects.all()
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("slug")
     )
     social = (
@@ -392,45 +513,46 @@ def contact_view(request):
         if topic_value:
             topic = (
                 ContactTopic.objects.filter(slug=topic_value)
-                .prefetch_related("translations")
+                .prefetch_translations()
                 .first()
             )
             if topic is None:
                 topic = (
                     ContactTopic.objects.filter(pk=topic_value)
-                    .prefetch_related("translations")
+                    .prefetch_translations()
                     .first()
                 )
 
         if not form_errors:
-            contact_request = ContactRequest.objects.create(
-                name=name,
-                phone=phone,
-                email=email,
-                topic=topic,
-                message=message_text,
-                consent=bool(consent_value),
-                ip=_get_client_ip(request),
-                user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            )
+            with transaction.atomic():
+                contact_request = ContactRequest.objects.create(
+                    name=name,
+                    phone=phone,
+                    email=email,
+                    topic=topic,
+                    message=message_text,
+                    consent=bool(consent_value),
+                    ip=_get_client_ip(request),
+                    user_agent=request.META.get("HTTP_USER_AGENT", ""),
+                )
 
-            timestamp = timezone.localtime(contact_request.created_at).strftime("%d.%m.%Y %H:%M")
-            topic_name = (
-                topic.safe_translation_getter("name", any_language=True) if topic else _("Не выбрана")
-            )
-            email_display = email or "—"
-            telegram_text = "\n".join(
-                [
-                    _("<b>Новая заявка</b>"),
-                    _("Имя: {name}").format(name=escape(name)),
-                    _("Телефон: {phone}").format(phone=escape(phone)),
-                    _("Email: {email}").format(email=escape(email_display)),
-                    _("Тема: {topic}").format(topic=escape(topic_name)),
-                    _("Сообщение: {message}").format(message=escape(message_text)),
-                    _("Время: {timestamp}").format(timestamp=timestamp),
-                ]
-            )
-            send_telegram_message(telegram_text)
+                timestamp = timezone.localtime(contact_request.created_at).strftime("%d.%m.%Y %H:%M")
+                topic_name = (
+                    topic.safe_translation_getter("name", any_language=True) if topic else _("Не выбрана")
+                )
+                email_display = email or "—"
+                telegram_text = "\n".join(
+                    [
+                        _("<b>Новая заявка</b>"),
+                        _("Имя: {name}").format(name=escape(name)),
+                        _("Телефон: {phone}").format(phone=escape(phone)),
+                        _("Email: {email}").format(email=escape(email_display)),
+                        _("Тема: {topic}").format(topic=escape(topic_name)),
+                        _("Сообщение: {message}").format(message=escape(message_text)),
+                        _("Время: {timestamp}").format(timestamp=timestamp),
+                    ]
+                )
+                enqueue_telegram_message(telegram_text)
 
             form_success = True
             form_data = {
@@ -442,10 +564,10 @@ def contact_view(request):
                 "consent": False,
             }
 
-    contacts = CompanyInfo.objects.prefetch_related("translations").first()
+    contacts = CompanyInfo.objects.prefetch_translations().first()
     header = (
         SectionHeader.objects.filter(slug="contact", is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .first()
     )
     context = {
@@ -468,81 +590,111 @@ def contact_view(request):
 # ----------------- API ViewSets -----------------
 
 
-@method_decorator(cache_page(60 * 5), name="list")
-class CarouselViewSet(viewsets.ReadOnlyModelViewSet):
+class CarouselViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    conditional_namespaces = (HOMEPAGE_NAMESPACE,)
     serializer_class = CarouselItemSerializer
     queryset = (
         CarouselItem.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("ordering")
     )
 
 
-@method_decorator(cache_page(60 * 5), name="list")
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    # Счётчики хранятся в категории, поэтому список дешёвый и не кешируется целиком.
+    conditional_namespaces = (CATALOG_NAMESPACE,)
     serializer_class = CategorySerializer
-    queryset = (
-        Category.objects.all()
-        .prefetch_related("translations")
-        .annotate(products_count=Count("products", filter=Q(products__is_active=True)))
-    )
+    queryset = Category.objects.all().prefetch_translations()
 
 
-class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+class ProductViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    conditional_namespaces = (CATALOG_NAMESPACE,)
     serializer_class = ProductSerializer
+    pagination_class = ProductCursorPagination
     lookup_field = "slug"
     filterset_class = ProductFilter
-    search_fields = ["translations__name", "slug", "translations__description"]
+    filter_backends = [filters.DjangoFilterBackend, ProductSearchFilter, OrderingFilter]
     ordering_fields = ["price", "created_at"]
 
+    def get_serializer_class(self):
+        if self.action == "list":
+            return ProductRowSerializer
+        return ProductSerializer
+
     def get_queryset(self):
+        if self.action == "list":
+            # Список собирается из .values() с переводами через JOIN — см. product_rows.
+            return Product.objects.filter(is_active=True)
         return (
             Product.objects.filter(is_active=True)
-            .select_related("category")
-            .prefetch_related(
-                "translations",
-                "category__translations",
-                "images__translations",
+            .select_related("category", "primary_image")
+            .prefetch_translations(
+                "name",
+                "description",
+                "category__name",
+                "category__description",
+                "images__alt_text",
             )
         )
 
+    @cached_property
+    def list_fields(self):
+        return parse_fields(self.request.query_params.get("fields"))
+
+    def paginate_queryset(self, queryset):
+        # Колонки сортировки нужны курсору пагинации, даже если их не запросили.
+        ordering = self.paginator.get_ordering(self.request, queryset, self)
+        extra = ("id", *(name.lstrip("-") for name in ordering))
+        rows = product_rows(queryset, self.list_fields, get_language(), extra=extra)
+        return super().paginate_queryset(rows)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action == "list":
+            kwargs["fields"] = self.list_fields
+        return super().get_serializer(*args, **kwargs)
+
 
-class AdvantageViewSet(viewsets.ReadOnlyModelViewSet):
+class AdvantageViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    conditional_namespaces = (ABOUT_NAMESPACE,)
     serializer_class = AdvantageSerializer
     queryset = (
         Advantage.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("ordering")
     )
 
 
-class MetricViewSet(viewsets.ReadOnlyModelViewSet):
+class MetricViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    conditional_namespaces = (ABOUT_NAMESPACE,)
     serializer_class = MetricSerializer
     queryset = (
         Metric.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("ordering")
     )
 
 
-class TeamMemberViewSet(viewsets.ReadOnlyModelViewSet):
+class TeamMemberViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    conditional_namespaces = (ABOUT_NAMESPACE,)
     serializer_class = TeamMemberSerializer
     queryset = (
         TeamMember.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("ordering")
     )
 
 
-class ValueViewSet(viewsets.ReadOnlyModelViewSet):
+class ValueViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    conditional_namespaces = (ABOUT_NAMESPACE,)
     serializer_class = ValueSerializer
     queryset = (
         Value.objects.filter(is_active=True)
-        .prefetch_related("translations")
+        .prefetch_translations()
         .order_by("ordering")
     )
 
 
-class CompanyInfoViewSet(viewsets.ReadOnlyModelViewSet):
+class CompanyInfoViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    conditional_namespaces = (ABOUT_NAMESPACE,)
     serializer_class = CompanyInfoSerializer
-    queryset = CompanyInfo.objects.all().prefetch_related("translations")
+    queryset = CompanyInfo.objects.all().prefetch_translations()
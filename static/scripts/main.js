@@ -192,16 +192,18 @@ function submitForm(event) {
 }
 
 // Product detail gallery functionality
-function changeMainImage(src) {
+function changeMainImage(src, srcset) {
     const mainImage = document.getElementById('mainImage');
     if (mainImage) {
+        // srcset главного изображения важнее src, поэтому меняем оба
+        mainImage.srcset = srcset || '';
         mainImage.src = src;
     }
     
     // Update active thumbnail
     const thumbnails = document.querySelectorAll('.thumbnail');
     thumbnails.forEach(thumb => {
-        thumb.classList.toggle('active', thumb.src === src);
+        thumb.classList.toggle('active', thumb.getAttribute('src') === src);
     });
 }
 
@@ -269,6 +271,61 @@ document.addEventListener('DOMContentLoaded', function() {
     const grid = document.getElementById("productsGrid");
     if (!grid) return;
 
+    // Бесконечная прокрутка: partial=1&cursor=... возвращает следующую порцию карточек,
+    // курсор следующей порции приходит в data-next-cursor грида (и в заголовке X-Next-Cursor).
+    const loadMore = document.getElementById("loadMore");
+    const loadMoreLink = document.getElementById("loadMoreLink");
+    let loading = false;
+
+    function currentCursor() {
+      return grid.querySelector(".products-grid")?.dataset.nextCursor || "";
+    }
+
+    function updateLoadMore() {
+      if (!loadMore) return;
+      loadMore.hidden = !currentCursor();
+    }
+
+    async function loadNextPage() {
+      const cursor = currentCursor();
+      if (loading || !cursor) return;
+      loading = true;
+
+      const params = new URLSearchParams(window.location.search);
+      params.set("cursor", cursor);
+      params.set("partial", "1");
+
+      try {
+        const resp = await fetch(`${window.location.pathname}?${params.toString()}`, {
+          headers: {"X-Requested-With": "fetch"}
+        });
+        const page = document.createElement("template");
+        page.innerHTML = await resp.text();
+        const nextGrid = page.content.querySelector(".products-grid");
+        const currentGrid = grid.querySelector(".products-grid");
+        if (nextGrid && currentGrid) {
+          nextGrid.querySelectorAll(".product-card").forEach(card => currentGrid.appendChild(card));
+          currentGrid.dataset.nextCursor = nextGrid.dataset.nextCursor || "";
+        }
+      } finally {
+        loading = false;
+        updateLoadMore();
+      }
+    }
+
+    if (loadMoreLink) {
+      loadMoreLink.addEventListener("click", (e) => {
+        e.preventDefault();
+        loadNextPage();
+      });
+    }
+
+    if (loadMore && "IntersectionObserver" in window) {
+      new IntersectionObserver((entries) => {
+        if (entries.some(entry => entry.isIntersecting)) loadNextPage();
+      }, {rootMargin: "400px 0px"}).observe(loadMore);
+    }
+
     // делегирование кликов
     document.addEventListener("click", async (e) => {
       const btn = e.target.closest(".filter-btn");
@@ -289,6 +346,7 @@ document.addEventListener('DOMContentLoaded', function() {
       const params = new URLSearchParams(window.location.search);
       params.set("category", slug);
       params.delete("page");
+      params.delete("cursor");
       params.set("partial", "1");
 
       try {
@@ -298,6 +356,7 @@ document.addEventListener('DOMContentLoaded', function() {
         const html = await resp.text();
         grid.innerHTML = html;
         grid.style.opacity = "1";
+        updateLoadMore();
 
         // обновляем URL (без перезагрузки)
         params.delete("partial");
@@ -337,10 +396,11 @@ document.addEventListener('DOMContentLoaded', function() {
       const fetchParams = new URLSearchParams(params.toString());
       fetchParams.set("category", slug);
       fetchParams.delete("page");
+      fetchParams.delete("cursor");
       fetchParams.set("partial", "1");
       fetch(`${window.location.pathname}?${fetchParams.toString()}`)
         .then(r => r.text())
-        .then(html => { grid.innerHTML = html; });
+        .then(html => { grid.innerHTML = html; updateLoadMore(); });
     });
 
     // если мы зашли с #grid — прокрутим к нему
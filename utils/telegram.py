@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import logging
 from typing import Any
 
@@ -10,21 +12,41 @@ from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Telegram ограничивает длину одного сообщения.
+MAX_MESSAGE_LENGTH = 4096
 
-def send_telegram_message(text: str) -> None:
-    """Send a message to the configured Telegram chat."""
-    token = '8281238479:AAFpptxxRGeOUs3YO3hQRdqF5cGzdpimQpM'
-    chat_id = '758761122'
+
+class TelegramError(Exception):
+    """Raised when a message could not be delivered; retried unless ``permanent``."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+    @property
+    def permanent(self) -> bool:
+        # 4xx — Telegram отверг сам запрос (разметка, чат), повтор не поможет; 429 — просьба подождать.
+        return self.status_code is not None and 400 <= self.status_code < 500 and self.status_code != 429
+
+
+def _credentials() -> tuple[str, str]:
+    token = getattr(settings, "TELEGRAM_BOT_TOKEN", "") or '8281238479:AAFpptxxRGeOUs3YO3hQRdqF5cGzdpimQpM'
+    chat_id = getattr(settings, "TELEGRAM_CHAT_ID", "") or '758761122'
+    return token, chat_id
+
+
+def post_message(text: str) -> None:
+    """Send ``text`` to the configured chat, raising ``TelegramError`` on any failure."""
+    token, chat_id = _credentials()
 
     if not token or not chat_id:
-        logger.warning("Telegram credentials are not configured; message not sent.")
-        return
+        raise TelegramError("Telegram credentials are not configured.")
 
     if requests is None:
-        logger.warning("Requests library is unavailable; Telegram message not sent.")
-        return
+        raise TelegramError("Requests library is unavailable.")
 
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    api_url = getattr(settings, "TELEGRAM_API_URL", "https://api.telegram.org").rstrip("/")
+    url = f"{api_url}/bot{token}/sendMessage"
     payload: dict[str, Any] = {
         "chat_id": chat_id,
         "text": text,
@@ -32,9 +54,19 @@ def send_telegram_message(text: str) -> None:
     }
 
     try:
-        response = requests.post(url, data=payload, timeout=10)
+        response = requests.post(url, data=payload, timeout=getattr(settings, "TELEGRAM_TIMEOUT", 10))
         response.raise_for_status()
-    except requests.RequestException:
+    except requests.RequestException as exc:
+        # URL запроса содержит токен бота — не даём ему попасть в логи и БД.
+        status_code = exc.response.status_code if exc.response is not None else None
+        raise TelegramError(str(exc).replace(token, "***"), status_code) from exc
+
+
+def send_telegram_message(text: str) -> None:
+    """Send a message to the configured Telegram chat."""
+    try:
+        post_message(text)
+    except TelegramError:
         logger.exception("Failed to send Telegram message.")
     except Exception:
         logger.exception("Unexpected error while sending Telegram message.")